@@ -0,0 +1,87 @@
+"""
+Startup time benchmark: package imports, CLI and GUI first paint.
+
+Every case runs in a fresh interpreter, reported time is the median
+wall time of the whole process (interpreter startup included, see the
+"python" baseline).
+
+Usage: python benchmarks/startup.py [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GUI_FIRST_PAINT = """
+import sys
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+from cvrp.ui.main import MainWindow
+
+app = QApplication(sys.argv)
+window = MainWindow()
+window.show()
+QTimer.singleShot(0, app.quit)
+app.exec()
+"""
+
+# Full launch_ui path, quit once the solver check (deferred until after first paint) has run
+GUI_LAUNCH = """
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+from cvrp.ui.main import launch_ui
+
+exec_ = QApplication.exec
+
+
+def exec_and_quit():
+    QTimer.singleShot(0, QApplication.quit)
+    return exec_()
+
+
+QApplication.exec = staticmethod(exec_and_quit)
+launch_ui()
+"""
+
+CASES = [
+    ("python", ["-c", "pass"]),
+    ("import cvrp", ["-c", "import cvrp"]),
+    ("import cvrp.data", ["-c", "import cvrp.data"]),
+    ("import cvrp.report", ["-c", "import cvrp.report"]),
+    ("import cvrp.storage", ["-c", "import cvrp.storage"]),
+    ("import cvrp.model", ["-c", "import cvrp.model"]),
+    ("cli --help", ["-m", "cvrp", "--help"]),
+    ("gui first paint", ["-c", GUI_FIRST_PAINT]),
+    ("gui launch", ["-c", GUI_LAUNCH]),
+]
+
+
+def measure(args: [str], runs: int) -> float:
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    times = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, case_args in CASES:
+        print(f"{name:<24}{measure(case_args, args.runs) * 1000:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import time
+
+from numpy import ndarray, zeros
+from pyomo.environ import *
+from pyomo.opt import SolverFactory, check_optimal_termination
+
+from cvrp.cuts import TAILING_OFF, separate_cuts
+from cvrp.data import Network
+from cvrp.exceptions import CVRPException
+from cvrp.feasibility import vehicle_bounds
+from cvrp.model import CVRPModel
+from cvrp.solver import get_solvers
+
+
+class RelaxedCVRPModel(CVRPModel):
+    """
+    LP relaxation of CVRPModel with arcs aggregated over vehicles.
+
+    For a fleet of equal vehicles, routes of the relaxation can be split
+    among vehicles evenly, so it gives the same bound as relaxing CVRPModel
+    itself while being as many times smaller as there are vehicles. For
+    mixed fleets it is a relaxation of CVRPModel as well. Vehicles may stay
+    unused and subtour elimination constraints are added as cuts (con_cuts).
+    """
+
+    def _init_variables(self):
+        self.x = Var(
+            self.places, self.places,
+            bounds=lambda m, i, j: (0.0, 0.0 if i == j else 1.0),
+            doc="Share of vehicles going from i-th to j-th place"
+        )
+
+    def _init_objective(self):
+        self.obj_total_cost = Objective(
+            sense=minimize,
+            expr=sum(self.c[i, j] * self.x[i, j] for i in self.places for j in self.places if j != i),
+            doc="Minimize total cost of routes taken by vehicles"
+        )
+
+    def _init_constraints(self, progress: callable = None):
+        _dpt = self.network.depot.slug_name
+
+        self.con_cl_in = Constraint(
+            self.clients,
+            rule=lambda m, j: sum(m.x[i, j] for i in m.places) == 1,
+            doc="Each client must be entered exactly once"
+        )
+
+        self.con_cl_out = Constraint(
+            self.clients,
+            rule=lambda m, i: sum(m.x[i, j] for j in m.places) == 1,
+            doc="Each client must be left exactly once"
+        )
+
+        self.con_depot_cycle = Constraint(
+            expr=sum(self.x[_dpt, j] for j in self.clients) == sum(self.x[i, _dpt] for i in self.clients),
+            doc="As many vehicles return to depot as leave it"
+        )
+
+        self.min_vehicles, _ = vehicle_bounds(self.network.client_demands, self.network.vehicle_capacities)
+
+        self.con_vehicles = Constraint(
+            expr=inequality(
+                self.min_vehicles,
+                sum(self.x[_dpt, j] for j in self.clients),
+                len(self.network.vehicles)
+            ),
+            doc="Number of vehicles leaving depot is between bin-packing lower bound and fleet size"
+        )
+
+        self.con_cuts = ConstraintList(doc="Subtour elimination and rounded capacity cuts")
+
+    def add_cut(self, clients: [str], rhs: float):
+        """
+        Limit number of arcs between clients (slug names) to rhs.
+
+        Every client is left exactly once, so the same cut can be written as
+        at least len(clients) - rhs arcs leaving the set, which has fewer
+        terms for large sets.
+        """
+
+        inside = set(clients)
+        outside = [j for j in self.places if j not in inside]
+
+        if len(clients) - 1 <= len(outside):
+            self.con_cuts.add(quicksum(self.x[i, j] for i in clients for j in clients if j != i) <= rhs)
+        else:
+            self.con_cuts.add(quicksum(self.x[i, j] for i in clients for j in outside) >= len(clients) - rhs)
+
+    def arc_values(self) -> ndarray:
+        """
+        Arc values (places indexed as in Network.all_places).
+        """
+
+        index = {p.slug_name: i for i, p in enumerate(self.network.all_places)}
+        values = zeros((len(index), len(index)))
+
+        for (i, j), value in self.x.extract_values().items():
+            if value:
+                values[index[i], index[j]] = value
+
+        return values
+
+    def vehicle_routes(self):
+        raise NotImplementedError("Relaxed model has no routes")
+
+
+def lower_bound(network: Network, solvers_tried: [str] = None, max_rounds: int = 50,
+                time_limit: float = None) -> (float, RelaxedCVRPModel):
+    """
+    Lower bound on the total cost of any solution of the network.
+
+    The LP relaxation (see RelaxedCVRPModel) is solved repeatedly, violated
+    subtour and rounded capacity cuts (see separate_cuts) are added to it
+    after every solve, until no violated cuts are found or the bound stops
+    improving (see TAILING_OFF). The value of every solved relaxation is a
+    valid bound, the last (and best) one is returned.
+
+    :param network: Network
+    :param solvers_tried: Solvers as in solve_model
+    :param max_rounds: Maximum number of cut rounds
+    :param time_limit: Seconds after which no more cut rounds are started
+    :returns: Tuple (lower bound, relaxed model with cuts as solved last)
+    """
+
+    network.check_solvability()
+
+    solver = SolverFactory(get_solvers(solvers_tried)[0])
+    deadline = time.time() + time_limit if time_limit is not None else None
+
+    model = RelaxedCVRPModel(network)
+    demands = zeros(len(network.all_places))
+    demands[1:] = network.client_demands
+    capacity = network.vehicle_capacities.max()
+    places = [p.slug_name for p in network.all_places]
+    history = []
+
+    for _ in range(max_rounds):
+        result = solver.solve(model)
+
+        if not check_optimal_termination(result):
+            raise CVRPException()
+
+        history.append(value(model.obj_total_cost))
+        rounds, improvement = TAILING_OFF
+
+        if len(history) > rounds and history[-1] - history[-1 - rounds] < improvement * abs(history[-1]):
+            break
+
+        if deadline is not None and time.time() > deadline:
+            break
+
+        cuts = separate_cuts(model.arc_values(), demands, capacity)
+
+        if not cuts:
+            break
+
+        for clients, rhs in cuts:
+            model.add_cut([places[i] for i in clients], rhs)
+
+    model.lower_bound = value(model.obj_total_cost)
+
+    return model.lower_bound, model
@@ -0,0 +1,322 @@
+import argparse
+import sys
+
+from cvrp.exceptions import CVRPException
+
+
+def command_info(args) -> int:
+    from cvrp.storage import load
+
+    file = load(args.file)
+
+    print(f"Format version: {file.version}")
+    print(f"Clients: {len(file.latitudes) - 1}")
+    print(f"Vehicles: {len(file.capacities)}")
+    print(f"Total demand: {file.demands.sum():.2f}")
+    print(f"Total capacity: {file.capacities.sum():.2f}")
+    print(f"Time windows: {'yes' if file.has_time_constraints else 'no'}")
+    print(f"Solution: {'yes' if file.routes() is not None else 'no'}")
+
+    for key, value in file.metadata.items():
+        print(f"{key}: {value}")
+
+    return 0
+
+
+def _solve(network, args, progress: callable, initial: dict = None, checkpoint: callable = None):
+    from cvrp.pipeline import solve
+
+    return solve(
+        network, args.method, args.solver or None, time_limit=args.time_limit, seed=args.seed, progress=progress,
+        preprocess=not args.no_preprocess, initial_routes=initial, checkpoint=checkpoint, cuts=not args.no_cuts
+    )
+
+
+def command_solve(args) -> int:
+    from cvrp.storage import load_network, save
+
+    network = load_network(args.file)
+
+    def on_progress(state):
+        if args.verbose:
+            print(state, file=sys.stderr)
+
+    solution = _solve(network, args, on_progress)
+
+    print(f"Status: {solution.status}")
+    print(f"Total distance: {solution.obj_total_cost():.2f} km")
+
+    if args.output:
+        save(args.output, network, solution)
+
+    if args.report:
+        from cvrp.report import write_report
+
+        write_report(solution, solution.result, args.report)
+
+    return 0
+
+
+def command_batch(args) -> int:
+    import os
+    from cvrp.journal import Checkpointer, Journal, network_fingerprint
+    from cvrp.storage import load_network, save
+
+    journal = Journal(args.journal)
+    journal.compact()
+    os.makedirs(args.output_dir, exist_ok=True)
+    failed = 0
+
+    for file in args.files:
+        job = os.path.abspath(file)
+        state = journal.state(job)
+
+        if state is not None and state.finished:
+            print(f"{file}: {state.status} (finished before)")
+            continue
+
+        network = load_network(file)
+        initial = journal.warm_start(job, network)
+        checkpoint = Checkpointer(journal, job, network_fingerprint(network), args.checkpoint_interval)
+
+        if initial is not None:
+            print(f"{file}: resuming from {state.cost:.2f} km")
+
+        try:
+            solution = _solve(network, args, lambda progress: None, initial, checkpoint)
+        except CVRPException as exc:
+            solution, message = None, exc.message
+        finally:
+            # Interrupted batches keep the latest incumbent
+            checkpoint.flush()
+
+        if solution is None:
+            journal.finish(job, "failed", message=message)
+            print(f"{file}: failed: {message}")
+            failed += 1
+            continue
+
+        save(os.path.join(args.output_dir, os.path.basename(file)), network, solution)
+        journal.finish(job, solution.status, solution.routes, solution.cost, solution.bound)
+        print(f"{file}: {solution.status}, {solution.cost:.2f} km")
+
+    return 1 if failed else 0
+
+
+def command_serve(args) -> int:
+    import asyncio
+    from cvrp.service import serve
+
+    try:
+        asyncio.run(serve(
+            args.host, args.port, workers=args.workers, time_budget=args.time_budget, max_queue=args.max_queue,
+            solvers_tried=args.solver or None
+        ))
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+def command_sweep(args) -> int:
+    from cvrp.storage import load_network
+    from cvrp.sweep import fleet_sweep, pareto_front
+
+    network = load_network(args.file)
+    capacities = args.capacity or [float(network.vehicle_capacities.max())]
+    low, high = args.vehicles
+
+    points = fleet_sweep(
+        network, range(low, high + 1), capacities, iterations=args.iterations, workers=args.workers, seed=args.seed
+    )
+    front = set(id(point) for point in pareto_front(points))
+
+    print(f"{'Vehicles':>8} {'Capacity':>10} {'Distance [km]':>14}")
+
+    for point in points:
+        cost = f"{point.cost:.2f}" if point.feasible else "infeasible"
+        print(f"{point.vehicles:>8} {point.capacity:>10.2f} {cost:>14}{' *' if id(point) in front else ''}")
+
+    print("* Pareto-optimal (no other fleet is smaller and cheaper)")
+
+    return 0
+
+
+def command_bound(args) -> int:
+    from cvrp.bound import lower_bound
+    from cvrp.heuristics import solve_heuristic
+    from cvrp.pipeline import Solution
+    from cvrp.storage import load
+    from cvrp.validate import validate
+
+    file = load(args.file)
+    network = file.network()
+    routes = file.vehicle_routes(network)
+
+    if routes is None:
+        routes = solve_heuristic(network)
+
+    cost = validate(network, routes).total_distance
+    bound, _ = lower_bound(network, args.solver or None, time_limit=args.time_limit)
+
+    print(f"Total distance: {cost:.2f} km")
+    print(f"Lower bound: {bound:.2f} km")
+    print(f"Gap: {max(cost - bound, 0.0) / cost if cost > 0 else 0.0:.2%}")
+
+    if args.report:
+        from cvrp.report import write_report
+
+        write_report(Solution(network, routes, cost, "heuristic", bound=bound), None, args.report)
+
+    return 0
+
+
+def command_export_json(args) -> int:
+    from cvrp.storage import export_json, load
+
+    file = load(args.file)
+    network = file.network()
+    routes = file.vehicle_routes(network)
+    solution = None
+
+    if routes is not None:
+        from cvrp.pipeline import Solution
+
+        solution = Solution(network, routes, file.metadata.get("cost", 0.0), file.metadata.get("status", ""))
+
+    export_json(args.output, network, solution, metadata=file.metadata)
+
+    return 0
+
+
+def command_generate(args) -> int:
+    from cvrp.generate import generate
+    from cvrp.storage import save
+
+    network = generate(
+        args.clients, center=tuple(args.center), size=args.size, seed=args.seed, placement=args.placement,
+        depot=args.depot, demand=args.demand, route_size=args.route_size, capacity_spread=args.capacity_spread
+    )
+    save(args.output, network, metadata={"generator": {
+        key: value for key, value in vars(args).items() if key not in ("command", "handler", "output")
+    }})
+
+    print(f"Clients: {len(network.clients)}")
+    print(f"Vehicles: {len(network.vehicles)}")
+
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from cvrp.generate import CLIENT_PLACEMENTS, DEMAND_DISTRIBUTIONS, DEPOT_PLACEMENTS
+    from cvrp.pipeline import METHODS
+
+    parser = argparse.ArgumentParser(prog="cvrp", description="Capacitated vehicle routing")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    info = commands.add_parser("info", help="Show summary of a network file")
+    info.add_argument("file")
+    info.set_defaults(handler=command_info)
+
+    solve = commands.add_parser("solve", help="Solve network from a network file")
+    solve.add_argument("file")
+    solve.add_argument("--method", choices=METHODS, default="mip",
+                       help="Exact MIP model or hybrid genetic search")
+    solve.add_argument("--solver", action="append", help="Solver to try (may be repeated)")
+    solve.add_argument("--time-limit", type=float,
+                       help="Seconds of hybrid genetic search, or after which the MIP solve returns the best solution")
+    solve.add_argument("--seed", type=int, help="Random seed of hybrid genetic search")
+    solve.add_argument("--no-preprocess", action="store_true",
+                       help="Build the MIP over the network as given, without merging clients or dropping vehicles")
+    solve.add_argument("--no-cuts", action="store_true",
+                       help="Enumerate subtour elimination constraints of the MIP instead of separating cuts")
+    solve.add_argument("--output", help="Save network with solution into this file")
+    solve.add_argument("--report", help="Write HTML report into this file")
+    solve.add_argument("--verbose", action="store_true", help="Print progress to stderr")
+    solve.set_defaults(handler=command_solve)
+
+    batch = commands.add_parser(
+        "batch", help="Solve many network files, journaling progress so that an interrupted batch can be resumed"
+    )
+    batch.add_argument("files", nargs="+")
+    batch.add_argument("--journal", required=True,
+                       help="Journal file (finished files are skipped, unfinished ones resume from checkpoints)")
+    batch.add_argument("--output-dir", required=True, help="Directory of solved network files")
+    batch.add_argument("--method", choices=METHODS, default="mip",
+                       help="Exact MIP model or hybrid genetic search")
+    batch.add_argument("--solver", action="append", help="Solver to try (may be repeated)")
+    batch.add_argument("--time-limit", type=float,
+                       help="Seconds of hybrid genetic search, or after which the MIP solve returns the best solution")
+    batch.add_argument("--seed", type=int, help="Random seed of hybrid genetic search")
+    batch.add_argument("--no-preprocess", action="store_true",
+                       help="Build the MIP over the network as given, without merging clients or dropping vehicles")
+    batch.add_argument("--no-cuts", action="store_true",
+                       help="Enumerate subtour elimination constraints of the MIP instead of separating cuts")
+    batch.add_argument("--checkpoint-interval", type=float, default=30.0,
+                       help="Minimum seconds between checkpoints of a file")
+    batch.set_defaults(handler=command_batch)
+
+    serve = commands.add_parser("serve", help="Run local HTTP/JSON solve service")
+    serve.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    serve.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    serve.add_argument("--workers", type=int, default=2, help="Number of jobs solved at the same time")
+    serve.add_argument("--time-budget", type=float, default=300.0, help="Maximum seconds of a job")
+    serve.add_argument("--max-queue", type=int, default=100, help="Maximum number of queued jobs")
+    serve.add_argument("--solver", action="append", help="Solver to try (may be repeated)")
+    serve.set_defaults(handler=command_serve)
+
+    sweep = commands.add_parser("sweep", help="Compare costs of fleets of equal vehicles")
+    sweep.add_argument("file")
+    sweep.add_argument("--vehicles", type=int, nargs=2, required=True, metavar=("MIN", "MAX"),
+                       help="Range of numbers of vehicles")
+    sweep.add_argument("--capacity", type=float, action="append",
+                       help="Vehicle capacity (may be repeated, the largest capacity of the network if not given)")
+    sweep.add_argument("--iterations", type=int, default=50, help="Ruin-and-recreate iterations of every fleet")
+    sweep.add_argument("--workers", type=int, help="Number of worker processes (all cores if not given)")
+    sweep.add_argument("--seed", type=int, default=0, help="Random seed")
+    sweep.set_defaults(handler=command_sweep)
+
+    bound = commands.add_parser(
+        "bound", help="Compare stored (or heuristic) solution with lower bound from LP relaxation"
+    )
+    bound.add_argument("file")
+    bound.add_argument("--solver", action="append", help="LP solver to try (may be repeated)")
+    bound.add_argument("--time-limit", type=float, help="Seconds after which no more cuts are added")
+    bound.add_argument("--report", help="Write HTML report into this file")
+    bound.set_defaults(handler=command_bound)
+
+    export = commands.add_parser("export-json", help="Export network file as JSON")
+    export.add_argument("file")
+    export.add_argument("output")
+    export.set_defaults(handler=command_export_json)
+
+    generate = commands.add_parser("generate", help="Generate random network into a network file")
+    generate.add_argument("output")
+    generate.add_argument("--clients", type=int, default=100, help="Number of clients")
+    generate.add_argument("--placement", choices=CLIENT_PLACEMENTS, default="uniform", help="Client placement")
+    generate.add_argument("--depot", choices=DEPOT_PLACEMENTS, default="center", help="Depot placement")
+    generate.add_argument("--demand", choices=list(DEMAND_DISTRIBUTIONS), default="small",
+                          help="Demand distribution")
+    generate.add_argument("--route-size", type=float, default=10.0, help="Average number of clients per route")
+    generate.add_argument("--capacity-spread", type=float, default=0.0,
+                          help="Relative spread of vehicle capacities (0 for equal vehicles)")
+    generate.add_argument("--size", type=float, default=100.0, help="Side of the square area in km")
+    generate.add_argument("--center", type=float, nargs=2, default=(52.0, 20.0), metavar=("LAT", "LON"),
+                          help="Center of the area")
+    generate.add_argument("--seed", type=int, help="Random seed")
+    generate.set_defaults(handler=command_generate)
+
+    return parser
+
+
+def main(argv: [str] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    try:
+        return args.handler(args)
+    except CVRPException as exc:
+        print(f"Error: {exc.message}", file=sys.stderr)
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+
+    return 1
@@ -0,0 +1,374 @@
+from bisect import bisect_left, bisect_right
+from heapq import heappop, heappush
+
+from pyomo.environ import *
+from pyomo.opt import SolverFactory, check_optimal_termination
+
+from cvrp.data import Network
+from cvrp.exceptions import CVRPException, InsufficientVehiclesException, TimeConstraintsUnsupportedException
+from cvrp.heuristics import (
+    EPSILON, nearest_neighbours, network_arrays, route_length, savings_routes, local_search, to_vehicle_routes
+)
+from cvrp.solver import get_solvers
+
+
+class RoutePool:
+    """
+    Set of feasible routes (index lists without depot), only the cheapest
+    sequence is kept for every set of clients.
+    """
+
+    def __init__(self, dist, demands):
+        self.dist = dist
+        self.demands = demands
+        self.__routes = {}
+
+    def __len__(self):
+        return len(self.__routes)
+
+    def __iter__(self):
+        return iter(self.__routes.values())
+
+    def add(self, route) -> bool:
+        """
+        Add route to the pool.
+
+        :returns: True if route is new or cheaper than the one with the same clients
+        """
+
+        route = tuple(route)
+
+        if not route:
+            return False
+
+        key = frozenset(route)
+        cost = route_length(self.dist, route)
+
+        if key in self.__routes and self.__routes[key][0] <= cost + EPSILON:
+            return False
+
+        self.__routes[key] = (cost, sum(self.demands[i] for i in route), route)
+
+        return True
+
+    @property
+    def routes(self) -> [(float, float, tuple)]:
+        """
+        List of routes as tuples (cost, load, client indices).
+        """
+
+        return list(self.__routes.values())
+
+
+def vehicle_types(network: Network) -> [(float, int)]:
+    """
+    Distinct vehicle capacities with number of vehicles of each capacity.
+    """
+
+    capacities = sorted({v.max_capacity for v in network.vehicles})
+
+    return [(q, sum(1 for v in network.vehicles if v.max_capacity == q)) for q in capacities]
+
+
+class SetPartitioningModel(ConcreteModel):
+    """
+    Route-based model: choose routes from the pool so that every client is
+    served by exactly one route, with no more routes of every vehicle type
+    than there are vehicles of that type. Vehicles may stay unused.
+    """
+
+    def __init__(self, network: Network, pool: RoutePool, relax=False):
+        super(SetPartitioningModel, self).__init__()
+        self.network = network
+        self.pool_routes = pool.routes
+        self.types_data = vehicle_types(network)
+
+        self._init_sets()
+        self._init_variables(relax)
+        self._init_constraints()
+        self._init_objective()
+
+        if relax:
+            self.dual = Suffix(direction=Suffix.IMPORT)
+
+    def _init_sets(self):
+        self.clients = Set(initialize=range(1, len(self.network.all_places)), doc="Client indices")
+        self.routes = Set(initialize=range(len(self.pool_routes)), doc="Routes in the pool")
+        self.types = Set(initialize=range(len(self.types_data)), doc="Vehicle types (distinct capacities)")
+        self.fits = Set(
+            dimen=2,
+            initialize=[
+                (r, t)
+                for r, (_, load, _) in enumerate(self.pool_routes)
+                for t, (q, _) in enumerate(self.types_data) if load <= q + EPSILON
+            ],
+            doc="Route and vehicle type pairs where route load fits in vehicle capacity"
+        )
+
+    def _init_variables(self, relax):
+        self.y = Var(
+            self.fits,
+            within=NonNegativeReals if relax else Binary,
+            doc="1 if r-th route is driven by vehicle of t-th type, 0 otherwise"
+        )
+
+    def _init_constraints(self):
+        visits = {i: [] for i in self.clients}
+
+        for r, t in self.fits:
+            for i in self.pool_routes[r][2]:
+                visits[i].append((r, t))
+
+        self.con_cover = Constraint(
+            self.clients,
+            rule=lambda m, i: sum(m.y[r, t] for r, t in visits[i]) == 1,
+            doc="Each client must be served by exactly one route"
+        )
+
+        self.con_fleet = Constraint(
+            self.types,
+            rule=lambda m, t: sum(m.y[r, s] for r, s in m.fits if s == t) <= self.types_data[t][1],
+            doc="Number of routes of each vehicle type is limited by number of vehicles"
+        )
+
+    def _init_objective(self):
+        self.obj_total_cost = Objective(
+            sense=minimize,
+            expr=sum(self.pool_routes[r][0] * self.y[r, t] for r, t in self.fits),
+            doc="Minimize total cost of selected routes"
+        )
+
+    def duals(self) -> ([float], [float]):
+        """
+        Dual values of client cover constraints (indexed by place, 0 for depot)
+        and of fleet constraints (indexed by vehicle type).
+        """
+
+        cover = [0.0] + [self.dual[self.con_cover[i]] for i in self.clients]
+        fleet = [self.dual[self.con_fleet[t]] for t in self.types]
+
+        return cover, fleet
+
+    def vehicle_routes(self):
+        free = {
+            t: [k for k, v in enumerate(self.network.vehicles) if v.max_capacity == q]
+            for t, (q, _) in enumerate(self.types_data)
+        }
+
+        routes = [[] for _ in self.network.vehicles]
+
+        for r, t in self.fits:
+            if self.y[r, t].value is not None and self.y[r, t].value > 0.5:
+                routes[free[t].pop(0)] = list(self.pool_routes[r][2])
+
+        return to_vehicle_routes(self.network, routes)
+
+
+def price_routes(dist, demands, capacity: float, duals: [float], fleet_dual: float = 0.0,
+                 neighbours: [[int]] = None, bucket_size: int = None, max_labels: int = 20000,
+                 max_columns: int = 50):
+    """
+    Pricing by labeling algorithm for the elementary shortest path problem with
+    capacity resource (ESPPRC).
+
+    Labels are extended from the depot in order of increasing load over arcs
+    with reduced costs dist[i][j] - duals[j]; a label dominates another at the
+    same place if it has lower cost, lower load and a subset of visited clients.
+
+    :param dist: Distance matrix
+    :param demands: Demands (depot at index 0)
+    :param capacity: Vehicle capacity
+    :param duals: Client cover duals (indexed by place, 0 for depot)
+    :param fleet_dual: Fleet constraint dual of the vehicle type
+    :param neighbours: If given, labels are only extended to neighbouring
+        clients (heuristic pricing)
+    :param bucket_size: If given, at most this many cheapest labels are kept
+        at every place (heuristic pricing)
+    :param max_labels: Maximum number of labels processed
+    :param max_columns: Maximum number of returned routes
+    :returns: Tuple (list of (reduced cost, route) with negative reduced cost,
+        True if pricing was exact and complete)
+    """
+
+    n = len(dist)
+    buckets = [[] for _ in range(n)]
+    # Costs of labels in every bucket (bisected instead of buckets)
+    costs = [[] for _ in range(n)]
+    heap = []
+    columns = {}
+    complete = neighbours is None and bucket_size is None
+
+    # Buckets are sorted by cost, so only cheaper labels can dominate a new one
+    # and only more expensive labels can be dominated by it
+    def push(cost, load, visited, path):
+        bucket = buckets[path[-1]]
+        pos = bisect_right(costs[path[-1]], cost + EPSILON)
+
+        for other in bucket[:pos]:
+            if other[1] <= load + EPSILON and other[2] & ~visited == 0:
+                return
+
+        if bucket_size is not None and pos >= bucket_size:
+            return
+
+        label = [cost, load, visited, path, True]
+        pos = bisect_left(costs[path[-1]], cost - EPSILON)
+        kept = bucket[:pos]
+        kept.append(label)
+
+        for other in bucket[pos:]:
+            if load <= other[1] + EPSILON and visited & ~other[2] == 0:
+                other[4] = False
+            else:
+                kept.append(other)
+
+        if bucket_size is not None:
+            for other in kept[bucket_size:]:
+                other[4] = False
+
+            del kept[bucket_size:]
+
+        buckets[path[-1]] = kept
+        costs[path[-1]] = [other[0] for other in kept]
+        heappush(heap, (load, cost, len(path), path, label))
+
+    for j in range(1, n):
+        if demands[j] <= capacity + EPSILON:
+            push(dist[0][j] - duals[j], demands[j], 1 << j, (j,))
+
+    processed = 0
+
+    while heap:
+        *_, label = heappop(heap)
+        cost, load, visited, path, alive = label
+
+        if not alive:
+            continue
+
+        processed += 1
+
+        if processed > max_labels:
+            complete = False
+            break
+
+        u = path[-1]
+        reduced_cost = cost + dist[u][0] - fleet_dual
+
+        if reduced_cost < -EPSILON:
+            key = frozenset(path)
+
+            if key not in columns or columns[key][0] > reduced_cost:
+                columns[key] = (reduced_cost, path)
+
+        for v in (neighbours[u] if neighbours is not None else range(1, n)):
+            if visited >> v & 1 or load + demands[v] > capacity + EPSILON:
+                continue
+
+            push(cost + dist[u][v] - duals[v], load + demands[v], visited | 1 << v, path + (v,))
+
+    return sorted(columns.values())[:max_columns], complete
+
+
+def initial_pool(network: Network, dist, demands, capacities) -> RoutePool:
+    """
+    Route pool seeded with single-client routes and a heuristic solution.
+    """
+
+    pool = RoutePool(dist, demands)
+
+    for i in range(1, len(dist)):
+        pool.add([i])
+
+    neighbours = nearest_neighbours(dist)
+
+    try:
+        routes = savings_routes(dist, demands, capacities, neighbours)
+    except InsufficientVehiclesException:
+        return pool
+
+    for route in routes:
+        pool.add(route)
+
+    for route in local_search(dist, demands, capacities, routes, neighbours):
+        pool.add(route)
+
+    return pool
+
+
+def column_generation(network: Network, solvers_tried: [str] = None, max_iterations: int = 100,
+                      max_columns: int = 50, max_labels: int = 20000, pool: RoutePool = None):
+    """
+    Solve network with set-partitioning model over a route pool grown by column generation.
+
+    Restricted master LP is solved repeatedly, routes with negative reduced
+    costs are found by pricing (first heuristically over neighbour lists,
+    then exactly) and added to the pool. Final integer model is solved over
+    the whole pool.
+
+    :param network: Network
+    :param solvers_tried: Solvers as in solve_model
+    :param max_iterations: Maximum number of column generation iterations
+    :param max_columns: Maximum number of routes added per iteration and vehicle type
+    :param max_labels: Maximum number of labels in a single pricing run
+    :param pool: Initial route pool (seeded by heuristics if None)
+    :returns: Tuple (solved SetPartitioningModel, solver results). Model's
+        lower_bound is the master LP value if column generation converged
+        with exact pricing, None otherwise.
+    :raises TimeConstraintsUnsupportedException: Network has time constraints
+        (pricing does not schedule routes)
+    """
+
+    network.check_solvability()
+
+    if network.has_time_constraints:
+        raise TimeConstraintsUnsupportedException()
+
+    solver = SolverFactory(get_solvers(solvers_tried)[0])
+    dist, demands, capacities = network_arrays(network)
+    neighbours = nearest_neighbours(dist, 10)
+    dist, demands = dist.tolist(), demands.tolist()
+
+    if pool is None:
+        pool = initial_pool(network, dist, demands, capacities)
+
+    lower_bound = None
+
+    for _ in range(max_iterations):
+        master = SetPartitioningModel(network, pool, relax=True)
+        result = solver.solve(master)
+
+        if not check_optimal_termination(result):
+            raise CVRPException()
+
+        cover, fleet = master.duals()
+
+        # Cheap heuristic pricing first, exact labeling only when heuristics find nothing
+        for candidates, bucket_size in ((neighbours, 8), (None, 32), (None, None)):
+            added, exact = 0, True
+
+            for (q, _), fleet_dual in zip(master.types_data, fleet):
+                columns, complete = price_routes(
+                    dist, demands, q, cover, fleet_dual, neighbours=candidates, bucket_size=bucket_size,
+                    max_labels=max_labels, max_columns=max_columns
+                )
+                exact &= complete
+                added += sum(pool.add(route) for _, route in columns)
+
+            if added:
+                break
+
+        if not added:
+            if exact:
+                lower_bound = value(master.obj_total_cost)
+
+            break
+
+    model = SetPartitioningModel(network, pool)
+    result = solver.solve(model)
+
+    if not check_optimal_termination(result):
+        raise CVRPException()
+
+    model.lower_bound = lower_bound
+
+    return model, result
@@ -0,0 +1,431 @@
+import time
+from math import ceil
+
+from numpy import flatnonzero, inf, ndarray, zeros
+from pyomo.environ import *
+
+from cvrp.feasibility import min_vehicles_l2
+from cvrp.heuristics import EPSILON
+from cvrp.model import CVRPModel
+from cvrp.solver import solve_model
+
+# Support graph edges above these values are followed when looking for cut sets
+CUT_THRESHOLDS = (0.0, 0.25, 0.5, 0.75)
+
+# Minimal violation of a cut added to a model
+CUT_VIOLATION = 1e-4
+
+# Cut rounds stop when bound improved relatively less than TAILING_OFF[1] over last TAILING_OFF[0] rounds
+TAILING_OFF = (5, 1e-4)
+
+# Most violated cuts added to CVRPModel after a solve (every cut has a term per vehicle)
+MAX_CUTS = 50
+
+
+def _components(weights: ndarray, threshold: float) -> [[int]]:
+    """
+    Connected components of clients joined by edges heavier than threshold.
+    """
+
+    n = len(weights)
+    component = [-1] * n
+    components = []
+
+    for start in range(1, n):
+        if component[start] >= 0:
+            continue
+
+        component[start] = len(components)
+        members, stack = [start], [start]
+
+        while stack:
+            i = stack.pop()
+
+            for j in flatnonzero(weights[i] > threshold + EPSILON).tolist():
+                if j > 0 and component[j] < 0:
+                    component[j] = len(components)
+                    members.append(j)
+                    stack.append(j)
+
+        components.append(sorted(members))
+
+    return components
+
+
+def _shrunk_groups(weights: ndarray, demands: ndarray, capacity: float) -> [[int]]:
+    """
+    Clients joined by edges of value 1 (paths of the support graph every
+    solution near the relaxed one follows), as long as a group fits into
+    one vehicle. Single clients are groups of their own.
+    """
+
+    n = len(weights)
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+
+        return i
+
+    group_demand = demands.astype(float).copy()
+
+    for i in range(1, n):
+        for j in flatnonzero(weights[i, i + 1:] >= 1.0 - EPSILON).tolist():
+            a, b = find(i), find(i + 1 + j)
+
+            if a != b and group_demand[a] + group_demand[b] <= capacity + EPSILON:
+                parent[b] = a
+                group_demand[a] += group_demand[b]
+
+    groups = {}
+
+    for i in range(1, n):
+        groups.setdefault(find(i), []).append(i)
+
+    return sorted(groups.values())
+
+
+def _grown_sets(values: ndarray, weights: ndarray, demands: ndarray, capacity: float,
+                groups: [[int]] = None) -> [[int]]:
+    """
+    Client sets grown greedily from every group (every client by default) by
+    adding the group most connected to the set, the set with the most
+    violated cut is kept for every starting group.
+    """
+
+    groups = groups if groups is not None else [[i] for i in range(1, len(weights))]
+    g = len(groups)
+
+    # Support graph with groups shrunk into single nodes
+    shrunk = zeros((g, g))
+    inner = zeros(g)
+    group_demands = zeros(g)
+
+    for a, members in enumerate(groups):
+        rows = weights[members]
+        inner[a] = values[members][:, members].sum()
+        group_demands[a] = demands[members].sum()
+
+        for b, others in enumerate(groups):
+            if b != a:
+                shrunk[a, b] = rows[:, others].sum()
+
+    sizes = [len(members) for members in groups]
+    sets = []
+
+    for seed in range(g):
+        members = [seed]
+        # Weight of edges between every group and the set, -inf for the set
+        connection = shrunk[seed].copy()
+        connection[seed] = -inf
+        arcs, demand, size = inner[seed], group_demands[seed], sizes[seed]
+        best, best_violation = None, CUT_VIOLATION
+
+        while True:
+            if size > 1:
+                violation = arcs - (size - max(1, ceil(demand / capacity - EPSILON)))
+
+                if violation > best_violation:
+                    best, best_violation = list(members), violation
+
+            if len(members) == g:
+                break
+
+            b = int(connection.argmax())
+
+            if connection[b] <= EPSILON:
+                break
+
+            arcs += connection[b] + inner[b]
+            demand += group_demands[b]
+            size += sizes[b]
+            members.append(b)
+            connection += shrunk[b]
+            connection[b] = -inf
+
+        if best is not None:
+            sets.append(sorted(i for b in best for i in groups[b]))
+
+    return sets
+
+
+def separate_cuts(values: ndarray, demands: ndarray, capacity: float) -> [([int], int)]:
+    """
+    Find violated rounded capacity inequalities.
+
+    For a set S of clients, arcs inside S can be used at most |S| - r(S)
+    times, where r(S) = max(1, ceil(demand of S / capacity)) is the minimal
+    number of vehicles serving S (r(S) = 1 gives subtour elimination).
+    Candidate sets are connected components of the support graph restricted
+    to edges above every value of CUT_THRESHOLDS and sets grown greedily
+    from every client and from every group of clients joined by edges of
+    value 1 (the support graph with such paths shrunk).
+
+    :param values: Arc values (depot at index 0)
+    :param demands: Place demands (depot at index 0)
+    :param capacity: Largest vehicle capacity
+    :returns: List of violated cuts as tuples (clients of S, right-hand side)
+    """
+
+    weights = values + values.T
+    candidates = [c for threshold in CUT_THRESHOLDS for c in _components(weights, threshold)]
+    candidates += _grown_sets(values, weights, demands, capacity)
+
+    groups = _shrunk_groups(weights, demands, capacity)
+
+    if len(groups) < len(weights) - 1:
+        candidates += _grown_sets(values, weights, demands, capacity, groups)
+
+    cuts, seen = [], set()
+
+    for clients in candidates:
+        key = tuple(clients)
+
+        if len(clients) < 2 or key in seen:
+            continue
+
+        seen.add(key)
+
+        vehicles = max(1, ceil(demands[clients].sum() / capacity - EPSILON))
+        rhs = len(clients) - vehicles
+
+        if values[clients][:, clients].sum() > rhs + CUT_VIOLATION:
+            cuts.append((clients, rhs))
+
+    return cuts
+
+
+def _arcs_within(values: ndarray, sets: [[int]]) -> float:
+    return sum(values[s][:, s].sum() for s in sets)
+
+
+def framed_capacity_cuts(values: ndarray, demands: ndarray, capacity: float) -> [([[int]], int)]:
+    """
+    Find violated framed capacity inequalities.
+
+    A set H of clients is split into parts S_1, ..., S_t fitting into one
+    vehicle each. Every vehicle serving H enters it at least once, and a
+    part entered more than once could be packed into a vehicle of its own,
+    so (with crossings counted by x(d(.)) and r the bin-packing lower bound
+    of part demands):
+
+        x(d(H)) + sum x(d(S_i)) >= 2 r + 2 t
+
+    With every client left and entered once, this is written over arcs
+    inside sets as x(H) + sum x(S_i) <= 2 |H| - r - t. Candidate sets H are
+    those of separate_cuts, parts are the groups of clients joined by edges
+    of value 1. With all parts single clients it is a rounded capacity cut
+    with the Martello-Toth bound instead of rounded demand.
+
+    :param values: Arc values (depot at index 0)
+    :param demands: Place demands (depot at index 0)
+    :param capacity: Largest vehicle capacity
+    :returns: List of violated cuts as tuples (sets [H, S_1, ...] without single clients, right-hand side)
+    """
+
+    weights = values + values.T
+    groups = _shrunk_groups(weights, demands, capacity)
+    group_of = {i: members for members in groups for i in members}
+
+    candidates = [c for threshold in CUT_THRESHOLDS for c in _components(weights, threshold)]
+    candidates += _grown_sets(values, weights, demands, capacity)
+    cuts, seen = [], set()
+
+    for clients in candidates:
+        key = tuple(clients)
+
+        if len(clients) < 2 or key in seen:
+            continue
+
+        seen.add(key)
+        inside = set(clients)
+        parts = []
+
+        for i in clients:
+            part = [j for j in group_of[i] if j in inside]
+
+            if part[0] == i:
+                parts.append(part)
+
+        vehicles = min_vehicles_l2([demands[part].sum() for part in parts], capacity)
+        rhs = 2 * len(clients) - vehicles - len(parts)
+        sets = [clients] + [part for part in parts if len(part) > 1]
+
+        if _arcs_within(values, sets) > rhs + CUT_VIOLATION:
+            cuts.append((sets, rhs))
+
+    return cuts
+
+
+def comb_cuts(values: ndarray) -> [([[int]], int)]:
+    """
+    Find violated comb inequalities (of the TSP, valid for routes through
+    a depot as well) with teeth of two clients.
+
+    For a handle H and an odd number t >= 3 of disjoint teeth T_j, each with
+    one client in H and one outside:
+
+        x(H) + sum x(T_j) <= |H| + (t - 1) / 2
+
+    Handles are connected components of clients joined by fractional edges,
+    teeth are edges of value 1 leaving them (odd component heuristic).
+
+    :param values: Arc values (depot at index 0)
+    :returns: List of violated cuts as tuples (sets [H, T_1, ...], right-hand side)
+    """
+
+    weights = values + values.T
+    fractional = weights.copy()
+    fractional[fractional >= 1.0 - EPSILON] = 0.0
+    cuts = []
+
+    for handle in _components(fractional, 0.0):
+        if len(handle) < 2:
+            continue
+
+        inside = set(handle)
+        teeth, used = [], set()
+
+        for i in handle:
+            for j in flatnonzero(weights[i] >= 1.0 - EPSILON).tolist():
+                if j > 0 and j not in inside and j not in used:
+                    teeth.append([i, j])
+                    used.add(j)
+
+        if len(teeth) % 2 == 0:
+            teeth = teeth[:-1]
+
+        if len(teeth) < 3:
+            continue
+
+        sets = [handle] + teeth
+        rhs = len(handle) + (len(teeth) - 1) // 2
+
+        if _arcs_within(values, sets) > rhs + CUT_VIOLATION:
+            cuts.append((sets, rhs))
+
+    return cuts
+
+
+def find_cuts(values: ndarray, demands: ndarray, capacity: float, framed: bool = True, combs: bool = True,
+              max_cuts: int = MAX_CUTS) -> [([[int]], int)]:
+    """
+    Most violated rounded capacity, framed capacity and comb cuts.
+
+    :param values: Arc values (depot at index 0)
+    :param demands: Place demands (depot at index 0)
+    :param capacity: Largest vehicle capacity
+    :param framed: Separate framed capacity cuts
+    :param combs: Separate comb cuts
+    :param max_cuts: Maximum number of cuts returned
+    :returns: List of cuts as tuples (client sets, right-hand side), limiting
+        arcs inside all sets together
+    """
+
+    cuts = [([clients], rhs) for clients, rhs in separate_cuts(values, demands, capacity)]
+
+    if framed:
+        cuts += framed_capacity_cuts(values, demands, capacity)
+
+    if combs:
+        cuts += comb_cuts(values)
+
+    cuts.sort(key=lambda cut: cut[1] - _arcs_within(values, cut[0]))
+
+    return cuts[:max_cuts]
+
+
+def add_cuts(model: CVRPModel, cuts: [([[int]], int)]):
+    """
+    Add cuts (from find_cuts) to con_cuts of the model.
+    """
+
+    places = [p.slug_name for p in model.network.all_places]
+
+    for sets, rhs in cuts:
+        model.con_cuts.add(
+            quicksum(
+                model.x[places[i], places[j], k]
+                for s in sets
+                for i in s
+                for j in s if j != i
+                for k in model.vehicles
+            ) <= rhs
+        )
+
+
+def _set_domain(model: CVRPModel, domain):
+    for var in model.x.values():
+        var.domain = domain
+
+
+def branch_and_cut(model: CVRPModel, solvers_tried: [str] = None, max_rounds: int = 50, framed: bool = True,
+                   combs: bool = True, progress: callable = None, **solve_options):
+    """
+    Solve CVRPModel, adding violated cuts until the optimal solution satisfies them all.
+
+    Cuts (see find_cuts) are first separated from the LP relaxation in
+    rounds, until none are found or the bound tails off (see TAILING_OFF),
+    so that the solver starts branching from a tighter bound. The model is
+    then solved as a MIP and cuts violated by its solution are added until
+    there are none, which makes the model correct even if it was built
+    without subtour elimination constraints (see CVRPModel).
+
+    :param model: Model
+    :param solvers_tried: Solvers as in solve_model
+    :param max_rounds: Maximum number of cut rounds on the relaxation
+    :param framed: Separate framed capacity cuts
+    :param combs: Separate comb cuts
+    :param progress: Called with lower bound after every solve
+    :param solve_options: Options passed to solve_model
+    :returns: Result of the last solve, wallclock time of all solves
+    """
+
+    report = progress if progress is not None else lambda bound: None
+
+    demands = zeros(len(model.network.all_places))
+    demands[1:] = model.network.client_demands
+    capacity = model.network.vehicle_capacities.max()
+
+    start = time.perf_counter()
+    history = []
+
+    _set_domain(model, UnitInterval)
+
+    try:
+        for _ in range(max_rounds):
+            solve_model(model, solvers_tried, **solve_options)
+            history.append(value(model.obj_total_cost))
+            report(history[-1])
+
+            rounds, improvement = TAILING_OFF
+
+            if len(history) > rounds and history[-1] - history[-1 - rounds] < improvement * abs(history[-1]):
+                break
+
+            cuts = find_cuts(model.arc_values(), demands, capacity, framed, combs)
+
+            if not cuts:
+                break
+
+            add_cuts(model, cuts)
+    finally:
+        _set_domain(model, Binary)
+
+    while True:
+        result = solve_model(model, solvers_tried, **solve_options)
+        report(value(model.obj_total_cost))
+
+        # Solutions are integer: components of the support graph are routes and subtours
+        cuts = find_cuts(model.arc_values(), demands, capacity, framed=False, combs=False)
+
+        if not cuts:
+            break
+
+        add_cuts(model, cuts)
+
+    result.solver.wallclock_time = time.perf_counter() - start
+
+    return result
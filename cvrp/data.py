@@ -1,21 +1,37 @@
+from math import inf, isfinite
+
 from slugify import slugify
-from numpy import clip
+from numpy import array, ndarray
 
 from cvrp.exceptions import *
-from cvrp.geo import geo_dist
+from cvrp.feasibility import check_feasibility
+from cvrp.geo import geo_dist, geo_dist_matrix
+from cvrp.spatial import SpatialIndex
+
+# Default travel speed in km/h, travel times, service times, time windows
+# and shift lengths are in minutes (time 0 is when vehicles may leave the depot)
+DEFAULT_SPEED = 60.0
 
 
 class Place:
     __name: str
+    __slug_name: str
     __latitude: float
     __longitude: float
     __demand: float
+    __service_time: float
+    __ready_time: float
+    __due_time: float
 
-    def __init__(self, name: str, lat: float, lon: float, demand: float = 0.0):
+    def __init__(self, name: str, lat: float, lon: float, demand: float = 0.0, service_time: float = 0.0,
+                 ready_time: float = 0.0, due_time: float = inf):
         self.name = name
         self.latitude = lat
         self.longitude = lon
         self.demand = demand
+        self.service_time = service_time
+        self.ready_time = ready_time
+        self.due_time = due_time
 
     @property
     def name(self) -> str:
@@ -27,10 +43,15 @@ class Place:
             raise ValueError("Name can not be empty")
 
         self.__name = value
+        self.__slug_name = None
 
     @property
     def slug_name(self) -> str:
-        return slugify(self.__name)
+        # Cached, routes and models look slugs up for every place
+        if self.__slug_name is None:
+            self.__slug_name = slugify(self.__name)
+
+        return self.__slug_name
 
     @property
     def latitude(self) -> float:
@@ -38,8 +59,8 @@ class Place:
 
     @latitude.setter
     def latitude(self, value: float):
-        # noinspection PyTypeChecker
-        self.__latitude = float(clip(a=value, a_min=-180.0, a_max=180.0))
+        # Builtins instead of numpy.clip, which is slow for scalars (places are created in bulk when loading)
+        self.__latitude = float(min(max(value, -90.0), 90.0))
 
     @property
     def longitude(self) -> float:
@@ -47,8 +68,7 @@ class Place:
 
     @longitude.setter
     def longitude(self, value: float):
-        # noinspection PyTypeChecker
-        self.__longitude = float(clip(a=value, a_min=-90.0, a_max=90.0))
+        self.__longitude = float(min(max(value, -180.0), 180.0))
 
     @property
     def demand(self) -> float:
@@ -58,6 +78,42 @@ class Place:
     def demand(self, value: float):
         self.__demand = max([0.0, value])
 
+    @property
+    def service_time(self) -> float:
+        return self.__service_time
+
+    @service_time.setter
+    def service_time(self, value: float):
+        self.__service_time = float(max(0.0, value))
+
+    @property
+    def ready_time(self) -> float:
+        """
+        Earliest start of service (vehicles arriving earlier wait).
+        """
+
+        return self.__ready_time
+
+    @ready_time.setter
+    def ready_time(self, value: float):
+        self.__ready_time = float(max(0.0, value))
+
+    @property
+    def due_time(self) -> float:
+        """
+        Latest start of service (inf if there is no deadline).
+        """
+
+        return self.__due_time
+
+    @due_time.setter
+    def due_time(self, value: float):
+        self.__due_time = float(max(0.0, value)) if value is not None else inf
+
+    @property
+    def has_time_window(self) -> bool:
+        return self.__ready_time > 0.0 or isfinite(self.__due_time)
+
     @staticmethod
     def distance(a, b) -> float:
         if not isinstance(a, Place) or not isinstance(b, Place):
@@ -74,11 +130,14 @@ class Place:
 
 class Vehicle:
     __name = ""
+    __slug_name = None
     __max_capacity = 0.0
+    __shift_length = inf
 
-    def __init__(self, name: str, max_capacity: float):
+    def __init__(self, name: str, max_capacity: float, shift_length: float = inf):
         self.name = name
         self.max_capacity = max_capacity
+        self.shift_length = shift_length
 
     @property
     def name(self) -> str:
@@ -90,10 +149,15 @@ class Vehicle:
             raise ValueError("Name can not be empty")
 
         self.__name = value
+        self.__slug_name = None
 
     @property
     def slug_name(self) -> str:
-        return slugify(self.__name)
+        # Cached, routes and models look slugs up for every place
+        if self.__slug_name is None:
+            self.__slug_name = slugify(self.__name)
+
+        return self.__slug_name
 
     @property
     def max_capacity(self) -> float:
@@ -103,12 +167,41 @@ class Vehicle:
     def max_capacity(self, value: float):
         self.__max_capacity = max([0.0, value])
 
+    @property
+    def shift_length(self) -> float:
+        """
+        Longest time from leaving the depot to returning to it (inf if unlimited).
+        """
+
+        return self.__shift_length
+
+    @shift_length.setter
+    def shift_length(self, value: float):
+        self.__shift_length = float(max(0.0, value)) if value is not None else inf
+
 
 class Network:
     def __init__(self):
         self.__depot = Place("Central Warehouse", 0.0, 0.0)
         self.__clients = []
         self.__vehicles = []
+        self.__index = None
+        self.__speed = DEFAULT_SPEED
+
+    @property
+    def speed(self) -> float:
+        """
+        Travel speed of vehicles in km/h.
+        """
+
+        return self.__speed
+
+    @speed.setter
+    def speed(self, value: float):
+        if not value > 0.0:
+            raise ValueError("Speed must be positive")
+
+        self.__speed = float(value)
 
     @property
     def depot(self) -> Place:
@@ -121,6 +214,9 @@ class Network:
 
         self.__depot = value
 
+        if self.__index is not None:
+            self.__index.move(0, value.latitude, value.longitude)
+
     @property
     def clients(self) -> [Place]:
         return self.__clients
@@ -129,6 +225,108 @@ class Network:
     def all_places(self) -> [Place]:
         return [self.depot] + self.clients
 
+    @property
+    def latitudes(self) -> ndarray:
+        return array([p.latitude for p in self.all_places], dtype=float)
+
+    @property
+    def longitudes(self) -> ndarray:
+        return array([p.longitude for p in self.all_places], dtype=float)
+
+    @property
+    def client_demands(self) -> ndarray:
+        return array([c.demand for c in self.clients], dtype=float)
+
+    @property
+    def vehicle_capacities(self) -> ndarray:
+        return array([v.max_capacity for v in self.vehicles], dtype=float)
+
+    def distance_matrix(self) -> ndarray:
+        """
+        Distances between all places (depot first, then clients in order).
+        """
+
+        return geo_dist_matrix(self.latitudes, self.longitudes)
+
+    def travel_time_matrix(self, dist: ndarray = None) -> ndarray:
+        """
+        Travel times in minutes between all places (ordered as in distance_matrix).
+
+        :param dist: Distance matrix, computed if None
+        """
+
+        return (self.distance_matrix() if dist is None else dist) * (60.0 / self.__speed)
+
+    @property
+    def has_time_constraints(self) -> bool:
+        """
+        True if some place has service time or time window, or some vehicle has limited shift.
+        """
+
+        return (
+            any(p.has_time_window or p.service_time > 0.0 for p in self.all_places) or
+            any(isfinite(v.shift_length) for v in self.__vehicles)
+        )
+
+    @property
+    def spatial_index(self) -> SpatialIndex:
+        """
+        Spatial index of all places (positions as in all_places), built on first
+        use and updated when places are added or removed.
+
+        Coordinates changed on a place of the network have to be reported
+        with update_place.
+        """
+
+        # Clients list may also be modified directly
+        if self.__index is None or len(self.__index) != len(self.__clients) + 1:
+            self.__index = SpatialIndex(self.latitudes, self.longitudes)
+
+        return self.__index
+
+    def update_place(self, place: Place):
+        """
+        Update spatial index after coordinates of a place changed.
+        """
+
+        if self.__index is None:
+            return
+
+        position = self.__place_position(place)
+
+        if position is not None:
+            self.__index.move(position, place.latitude, place.longitude)
+
+    def __place_position(self, place: Place) -> int:
+        if place is self.__depot:
+            return 0
+
+        for i, client in enumerate(self.__clients):
+            if client is place:
+                return i + 1
+
+        return None
+
+    def nearest_places(self, lat: float, lon: float, k: int = 1) -> [Place]:
+        """
+        Places nearest to given coordinates (depot included), closest first.
+        """
+
+        _, positions = self.spatial_index.query(lat, lon, k)
+        places = self.all_places
+
+        return [places[i] for i in positions[0]]
+
+    def places_within(self, lat: float, lon: float, radius: float) -> [Place]:
+        """
+        Places within radius (in km) of given coordinates (depot included), closest first.
+        """
+
+        positions = self.spatial_index.query_radius(lat, lon, radius)[0]
+        places = self.all_places
+
+        return [places[i] for i in positions]
+
     @property
     def vehicles(self) -> [Vehicle]:
         return self.__vehicles
@@ -137,9 +335,35 @@ class Network:
         if client not in self.__clients and client is not self.__depot:
             self.__clients.append(client)
 
+            if self.__index is not None:
+                self.__index.append([client.latitude], [client.longitude])
+
+    def add_clients(self, clients: [Place]):
+        """
+        Add many clients at once (without linear membership checks for each).
+        """
+
+        known = {id(c) for c in self.__clients}
+        known.add(id(self.__depot))
+        added = []
+
+        for client in clients:
+            if id(client) not in known:
+                known.add(id(client))
+                added.append(client)
+
+        self.__clients.extend(added)
+
+        if self.__index is not None and added:
+            self.__index.append([c.latitude for c in added], [c.longitude for c in added])
+
     def remove_client(self, client: Place):
         if client in self.__clients:
-            self.__clients.remove(client)
+            position = self.__clients.index(client)
+            del self.__clients[position]
+
+            if self.__index is not None:
+                self.__index.delete(position + 1)
 
     def get_place(self, slug_name):
         for place in self.all_places:
@@ -152,6 +376,18 @@ class Network:
         if vehicle not in self.__vehicles:
             self.__vehicles.append(vehicle)
 
+    def add_vehicles(self, vehicles: [Vehicle]):
+        """
+        Add many vehicles at once (without linear membership checks for each).
+        """
+
+        known = {id(v) for v in self.__vehicles}
+
+        for vehicle in vehicles:
+            if id(vehicle) not in known:
+                known.add(id(vehicle))
+                self.__vehicles.append(vehicle)
+
     def remove_vehicle(self, vehicle: Vehicle):
         if vehicle in self.__vehicles:
             self.__vehicles.remove(vehicle)
@@ -164,20 +400,7 @@ class Network:
         return None
 
     def check_solvability(self):
-        if len(self.clients) == 0:
-            raise NoClientsException()
-
-        if len(self.vehicles) == 0:
-            raise NoVehiclesException()
-
-        demands = [c.demand for c in self.clients]
-        capacities = [v.max_capacity for v in self.vehicles]
-
-        if sum(capacities) < sum(demands):
-            raise SumCapacityOverloadException()
-
-        if max(capacities) < max(demands):
-            raise MaxCapacityOverloadException()
+        check_feasibility(self.client_demands, self.vehicle_capacities)
 
     def is_solvable(self):
         try:
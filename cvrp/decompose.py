@@ -0,0 +1,220 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from numpy import arctan2, argsort, array, bincount, full, inf, sort, zeros
+
+from cvrp.data import Network
+from cvrp.exceptions import InsufficientVehiclesException
+from cvrp.feasibility import first_fit_packing
+from cvrp.geo import geo_dist_matrix
+from cvrp.heuristics import improve_vehicle_routes
+
+
+def sweep_angles(network: Network):
+    """
+    Polar angles of clients around the depot (planar approximation).
+    """
+
+    lat, lon = network.latitudes, network.longitudes
+
+    return arctan2(lat[1:] - lat[0], lon[1:] - lon[0])
+
+
+def capacitated_assignment(dist, demands, capacities, regret=True):
+    """
+    Generalized-assignment step: give every client to the nearest cluster with
+    enough free capacity. Clients are assigned in order of decreasing regret
+    (difference between the two nearest clusters), so that clients with one
+    clearly best cluster go first.
+
+    :param dist: Distances of shape (clients, clusters)
+    :param demands: Client demands
+    :param capacities: Cluster capacities
+    :param regret: Order clients by regret (otherwise by decreasing demand)
+    :returns: Cluster index for every client
+    :raises InsufficientVehiclesException: Some client does not fit into any cluster
+    """
+
+    if regret and dist.shape[1] > 1:
+        nearest = sort(dist, axis=1)
+        order = argsort(nearest[:, 0] - nearest[:, 1])
+    else:
+        order = argsort(-demands)
+
+    free = array(capacities, dtype=float)
+    assignment = zeros(len(demands), dtype=int)
+
+    for i in order:
+        candidates = dist[i].copy()
+        candidates[free < demands[i] - 1e-9] = inf
+        cluster = int(candidates.argmin())
+
+        if candidates[cluster] == inf:
+            raise InsufficientVehiclesException()
+
+        assignment[i] = cluster
+        free[cluster] -= demands[i]
+
+    return assignment
+
+
+def cluster_clients(network: Network, max_iterations: int = 20):
+    """
+    Capacitated k-means: one cluster for every vehicle, bounded by its capacity.
+
+    Clusters are seeded by sweeping clients around the depot, then alternately
+    clients are assigned to the nearest centroid with free capacity and
+    centroids are recomputed, until assignment does not change. The greedy
+    assignment may get stuck where the clients can be packed, then the last
+    assignment within capacities (or first-fit decreasing packing) is kept.
+
+    :param network: Network
+    :param max_iterations: Maximum number of k-means iterations
+    :returns: Vehicle index for every client
+    :raises InsufficientVehiclesException: Clients could not be packed into the vehicles
+    """
+
+    demands = network.client_demands
+    capacities = network.vehicle_capacities
+    lat, lon = network.latitudes[1:], network.longitudes[1:]
+    k = len(capacities)
+
+    # Sweep seeding: consecutive angular sectors, sized proportionally to capacities
+    order = argsort(sweep_angles(network))
+    share = capacities.cumsum() / capacities.sum() * demands.sum()
+    sectors = share.searchsorted(demands[order].cumsum() - demands[order] * 0.5).clip(max=k - 1)
+    assignment = full(len(demands), -1)
+    assignment[order] = sectors
+    feasible = None
+
+    for _ in range(max_iterations):
+        counts = bincount(assignment, minlength=k)
+        used = counts > 0
+
+        # Empty clusters are seeded with the depot position
+        cen_lat = full(k, network.depot.latitude)
+        cen_lon = full(k, network.depot.longitude)
+        cen_lat[used] = bincount(assignment, lat, minlength=k)[used] / counts[used]
+        cen_lon[used] = bincount(assignment, lon, minlength=k)[used] / counts[used]
+
+        try:
+            updated = capacitated_assignment(geo_dist_matrix(lat, lon, cen_lat, cen_lon), demands, capacities)
+        except InsufficientVehiclesException:
+            feasible = feasible if feasible is not None else first_fit_packing(demands, capacities)
+
+            if feasible is None:
+                raise
+
+            return feasible
+
+        feasible = updated
+
+        if (updated == assignment).all():
+            break
+
+        assignment = updated
+
+    return assignment
+
+
+def sub_network(network: Network, clients, vehicles) -> Network:
+    """
+    Network sharing depot with the given one, limited to given clients and vehicles.
+    """
+
+    sub = Network()
+    sub.depot = network.depot
+
+    for client in clients:
+        sub.add_client(client)
+
+    for vehicle in vehicles:
+        sub.add_vehicle(vehicle)
+
+    return sub
+
+
+def decompose(network: Network, vehicles_per_cluster: int = 1, max_iterations: int = 20) -> [Network]:
+    """
+    Split network into independent, capacity-feasible sub-networks.
+
+    :param network: Network
+    :param vehicles_per_cluster: Number of vehicles (with their clusters) merged into one sub-network
+    :param max_iterations: Maximum number of k-means iterations
+    :returns: List of sub-networks, vehicles without clients are left out
+    """
+
+    assignment = cluster_clients(network, max_iterations)
+    vehicles = [v for k, v in enumerate(network.vehicles) if (assignment == k).any()]
+    vehicle_index = {id(v): k for k, v in enumerate(network.vehicles)}
+
+    # Group neighbouring clusters by the mean angle of their clients
+    angles = sweep_angles(network)
+    cluster_angle = {
+        id(v): angles[assignment == vehicle_index[id(v)]].mean()
+        for v in vehicles
+    }
+    vehicles.sort(key=lambda v: cluster_angle[id(v)])
+
+    networks = []
+
+    for i in range(0, len(vehicles), vehicles_per_cluster):
+        group = vehicles[i:i + vehicles_per_cluster]
+        indices = [vehicle_index[id(v)] for v in group]
+        clients = [c for c, k in zip(network.clients, assignment) if k in indices]
+
+        networks.append(sub_network(network, clients, group))
+
+    return networks
+
+
+def solve_exact(network: Network) -> dict:
+    """
+    Solve network with CVRPModel and return its vehicle routes.
+    """
+
+    from cvrp.model import CVRPModel
+    from cvrp.solver import solve_model
+
+    model = CVRPModel(network)
+    solve_model(model)
+
+    return model.vehicle_routes()
+
+
+def decomposed_solve(network: Network, solve=solve_exact, vehicles_per_cluster: int = 1,
+                     workers: int = None, improve: bool = True) -> dict:
+    """
+    Cluster-first route-second solve of a large network.
+
+    Clients are clustered into capacity-feasible groups, every group is
+    solved as an independent problem (in parallel, one process per group),
+    and results are stitched into one solution.
+
+    :param network: Network
+    :param solve: Function solving a sub-network, returning its vehicle routes
+        (must be picklable when workers != 1)
+    :param vehicles_per_cluster: Number of vehicles in every sub-network
+    :param workers: Number of worker processes (None for all cores, 1 to solve in process)
+    :param improve: Run inter-cluster local search over the stitched solution
+    :returns: Routes in CVRPModel.vehicle_routes format (unused vehicles have empty routes)
+    """
+
+    network.check_solvability()
+
+    networks = decompose(network, vehicles_per_cluster)
+
+    if workers == 1:
+        results = map(solve, networks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(solve, networks))
+
+    vehicle_routes = {v.slug_name: [] for v in network.vehicles}
+
+    for routes in results:
+        vehicle_routes.update(routes)
+
+    if improve:
+        vehicle_routes = improve_vehicle_routes(network, vehicle_routes)
+
+    return vehicle_routes
@@ -0,0 +1,290 @@
+from numpy import arange, array, concatenate, delete, full, hstack, inf, isinf, minimum, partition, zeros
+
+from cvrp.data import Network, Place
+from cvrp.exceptions import InsufficientVehiclesException
+from cvrp.geo import geo_dist_matrix, geo_dist_pairs
+from cvrp.heuristics import (
+    EPSILON, TimeWindows, local_search, nearest_neighbours, network_time_windows, to_vehicle_routes
+)
+
+# Plans are repaired without the full distance matrix: insertion costs are
+# computed from distances of pending clients to all places, local search
+# runs on a small sub-problem made of the affected routes only.
+
+
+def _route_edges(routes: [[int]]) -> (array, array, array, array):
+    """
+    Edges of all routes (depot included), flattened route after route.
+
+    :returns: Tuple (edge start places, edge end places, route of every edge,
+        index of the first edge of every route)
+    """
+
+    starts, ends, owners, first = [], [], [], []
+
+    for r, route in enumerate(routes):
+        stops = [0] + route + [0]
+        first.append(len(starts))
+        starts.extend(stops[:-1])
+        ends.extend(stops[1:])
+        owners.extend([r] * (len(stops) - 1))
+
+    return array(starts), array(ends), array(owners), array(first)
+
+
+class _RepairTravel:
+    """
+    Travel times looked up while a plan is repaired, as travel[a][b].
+
+    Insertion checks look up travel between inserted clients and any place,
+    route schedules only between consecutive stops. So rows of inserted
+    clients and route edges are enough, no full travel time matrix is built
+    (times are symmetric, a pair is found in the row of either place).
+    """
+
+    def __init__(self, rows: dict, edges: dict):
+        """
+        :param rows: Travel times from inserted clients to all places
+        :param edges: Travel times of (a, b) pairs of consecutive stops of routes
+        """
+
+        self.rows = rows
+        self.edges = edges
+
+    def __getitem__(self, a: int):
+        row = self.rows.get(a)
+
+        return row if row is not None else _RepairTravelRow(self, a)
+
+
+class _RepairTravelRow:
+    def __init__(self, travel: _RepairTravel, a: int):
+        self.travel = travel
+        self.a = a
+
+    def __getitem__(self, b: int) -> float:
+        row = self.travel.rows.get(b)
+
+        return row[self.a] if row is not None else self.travel.edges[self.a, b]
+
+
+def _time_infeasible(times: TimeWindows, route: [int], vehicle: int, pending: [int], demands, spare: float) -> array:
+    """
+    Mask of insertions of pending clients (rows) between consecutive stops of
+    the route (columns) violating time windows. Clients over the spare
+    capacity of the route are not checked, capacity rules them out anyway.
+    """
+
+    earliest, latest = times.schedule(route, vehicle)
+    stops = [0] + route + [0]
+    mask = zeros((len(pending), len(stops) - 1), dtype=bool)
+
+    for row, u in enumerate(pending):
+        if demands[u] > spare + EPSILON:
+            continue
+
+        for pos in range(len(stops) - 1):
+            mask[row, pos] = not times.path_fits(earliest[pos], stops[pos], [u], stops[pos + 1], latest[pos + 1])
+
+    return mask
+
+
+def _insert(lat, lon, demands, capacities, routes: [[int]], pending: [int], to_pending, regret: bool,
+            times: TimeWindows = None) -> [int]:
+    """
+    Insert pending clients into routes (in place).
+
+    With regret, the client with the largest difference between insertion
+    into its best and second best route goes first, otherwise clients are
+    inserted in the given order at their cheapest position.
+
+    :param to_pending: Distances of pending clients (rows) to all places
+    :param times: Time windows (places indexed as lat and lon, ignored if None)
+    :returns: Indices of modified routes
+    """
+
+    loads = array([demands[route].sum() if route else 0.0 for route in routes])
+    pending = list(pending)
+    modified = set()
+
+    # Insertions violating time windows, only columns of the route changed last are updated
+    if times is not None:
+        late = hstack([
+            _time_infeasible(times, route, r, pending, demands, capacities[r] - loads[r])
+            for r, route in enumerate(routes)
+        ])
+
+    while pending:
+        a, b, owners, first = _route_edges(routes)
+        lengths = geo_dist_pairs(lat[a], lon[a], lat[b], lon[b])
+
+        delta = to_pending[:, a] + to_pending[:, b] - lengths
+        delta[loads[owners] + demands[pending][:, None] > capacities[owners] + EPSILON] = inf
+
+        if times is not None:
+            delta[late] = inf
+
+        if regret and len(pending) > 1:
+            route_best = minimum.reduceat(delta, first, axis=1)
+
+            if route_best.shape[1] > 1:
+                best, second = partition(route_best, 1, axis=1)[:, :2].T
+            else:
+                best, second = route_best[:, 0], full(len(pending), inf)
+
+            if isinf(best).any():
+                raise InsufficientVehiclesException()
+
+            # Clients fitting a single route have infinite regret and go first
+            row = int(array(second - best).argmax())
+        else:
+            row = 0
+
+        edge = int(delta[row].argmin())
+
+        if delta[row, edge] == inf:
+            raise InsufficientVehiclesException()
+
+        r = int(owners[edge])
+        u = pending.pop(row)
+        routes[r].insert(edge - int(first[r]), u)
+        loads[r] += demands[u]
+        modified.add(r)
+
+        to_pending = delete(to_pending, row, axis=0)
+
+        if times is not None:
+            # Route had as many edges as it has stops now
+            start = int(first[r])
+            late = hstack((
+                delete(late[:, :start], row, axis=0),
+                _time_infeasible(times, routes[r], r, pending, demands, capacities[r] - loads[r]),
+                delete(late[:, start + len(routes[r]):], row, axis=0),
+            ))
+
+    return modified
+
+
+def _reoptimize(lat, lon, demands, capacities, routes: [[int]], affected: [int], max_passes: int,
+                times: TimeWindows = None, speed: float = None):
+    """
+    Local search restricted to the affected routes (in place).
+
+    :param times: Time windows (places indexed as lat and lon, ignored if None)
+    :param speed: Vehicle speed in km/h (travel times between affected places, with times)
+    """
+
+    affected = sorted(affected)
+    places = [0] + [u for r in affected for u in routes[r]]
+
+    if len(places) < 3:
+        return
+
+    local = {u: i for i, u in enumerate(places)}
+    dist = geo_dist_matrix(lat[places], lon[places])
+
+    if times is not None:
+        times = TimeWindows(
+            dist * (60.0 / speed), [times.service[u] for u in places],
+            [times.ready[u] for u in places], [times.due[u] for u in places], [times.returns[r] for r in affected]
+        )
+
+    improved = local_search(
+        dist, demands[places], capacities[affected], [[local[u] for u in routes[r]] for r in affected],
+        nearest_neighbours(dist, 10), max_passes=max_passes, times=times
+    )
+
+    for r, route in zip(affected, improved):
+        routes[r] = [places[i] for i in route]
+
+
+def update_plan(network: Network, vehicle_routes: dict, added: [Place] = (), cancelled: [Place] = (),
+                regret: bool = True, max_passes: int = 5, nearby_routes: int = 2) -> dict:
+    """
+    Repair an existing plan after new orders arrived or some were cancelled.
+
+    Added clients are inserted into the network and into routes by regret
+    (or cheapest) insertion, cancelled clients are removed from both. Then
+    local search runs over the modified routes and routes nearest to the
+    inserted clients only. Clients of the network missing in the plan are
+    inserted as well, routes of vehicles missing in the plan start empty.
+    With time constraints, insertions and moves keep routes within them.
+    The network is changed only if the plan is repaired.
+
+    :param network: Network the plan belongs to
+    :param vehicle_routes: Plan in CVRPModel.vehicle_routes format
+    :param added: New clients
+    :param cancelled: Cancelled clients
+    :param regret: Use regret insertion (cheapest insertion in the given order otherwise)
+    :param max_passes: Maximum number of local search passes
+    :param nearby_routes: Number of routes closest to every inserted client re-optimized with it
+    :returns: Repaired plan in the same format
+    :raises InsufficientVehiclesException: Some client does not fit into any route
+    """
+
+    # Network is changed only once the plan is repaired, places are indexed as they will be then
+    known = network.all_places
+    present = {id(p) for p in known}
+    removed = {id(c) for c in cancelled}
+    kept = [i for i, p in enumerate(known) if id(p) not in removed]
+    new = list({id(c): c for c in added if id(c) not in present and id(c) not in removed}.values())
+    places = [known[i] for i in kept] + new
+
+    index = {p.slug_name: i for i, p in enumerate(places)}
+    routes, affected = [], set()
+
+    for r, vehicle in enumerate(network.vehicles):
+        stops = [dest for _, dest in vehicle_routes.get(vehicle.slug_name, [])[:-1]]
+        route = [index[slug] for slug in stops if slug in index]
+
+        if len(route) != len(stops):
+            affected.add(r)
+
+        routes.append(route)
+
+    routed = zeros(len(places), dtype=bool)
+    routed[[u for route in routes for u in route]] = True
+    pending = [u for u in range(1, len(places)) if not routed[u]]
+
+    lat = concatenate((network.latitudes[kept], [c.latitude for c in new]))
+    lon = concatenate((network.longitudes[kept], [c.longitude for c in new]))
+    demands = array([p.demand for p in places], dtype=float)
+    demands[0] = 0.0
+    capacities = network.vehicle_capacities
+    to_pending = geo_dist_matrix(lat[pending], lon[pending], lat, lon)
+    times = None
+
+    if network.has_time_constraints or any(c.has_time_window or c.service_time > 0.0 for c in new):
+        a, b, _, _ = _route_edges(routes)
+        minutes = 60.0 / network.speed
+        travel = _RepairTravel(
+            dict(zip(pending, (to_pending * minutes).tolist())),
+            dict(zip(zip(a.tolist(), b.tolist()), (geo_dist_pairs(lat[a], lon[a], lat[b], lon[b]) * minutes).tolist()))
+        )
+        times = network_time_windows(network, places=places, travel=travel)
+
+    if pending:
+        affected |= _insert(lat, lon, demands, capacities, routes, pending, to_pending, regret, times)
+
+        # Routes passing close to inserted clients may take them over (new clients are not in the index yet)
+        route_of = full(len(places), -1)
+
+        for r, route in enumerate(routes):
+            route_of[route] = r
+
+        position = full(len(known), -1)
+        position[kept] = arange(len(kept))
+        _, nearest = network.spatial_index.query(lat[pending], lon[pending], nearby_routes * 5 + 1)
+
+        for u, candidates in zip(pending, position[nearest]):
+            near = [int(route_of[v]) for v in candidates if v > 0 and route_of[v] != route_of[u]]
+            affected.update(list(dict.fromkeys(near))[:nearby_routes])
+
+    _reoptimize(lat, lon, demands, capacities, routes, affected, max_passes, times, network.speed)
+
+    network.add_clients(new)
+
+    for client in cancelled:
+        network.remove_client(client)
+
+    return to_vehicle_routes(network, routes)
@@ -16,3 +16,23 @@ class MaxCapacityOverloadException(CVRPException):
 
 class SumCapacityOverloadException(CVRPException):
     message = "The total client demand exceeds the total vehicle capacity."
+
+
+class InsufficientVehiclesException(CVRPException):
+    message = "The client demands can not be packed into the available vehicles."
+
+
+class ExcessVehiclesException(CVRPException):
+    message = "There are more vehicles than clients, but every vehicle of the exact model has to serve a client."
+
+
+class TimeConstraintsUnsupportedException(CVRPException):
+    message = "This method does not support service times, time windows or limited shifts."
+
+
+class SolveCancelledException(CVRPException):
+    message = "Solving has been cancelled."
+
+
+class SolverProcessException(CVRPException):
+    message = "The solver process exited unexpectedly."
@@ -0,0 +1,205 @@
+from numpy import (
+    argsort, asarray, concatenate, cumsum, ceil, searchsorted, sort, unique, zeros
+)
+
+from cvrp.exceptions import *
+
+
+def min_vehicles_l1(demands, capacity: float) -> int:
+    """
+    Trivial bin-packing lower bound: total demand divided by capacity.
+
+    :param demands: Client demands
+    :param capacity: Capacity of a single vehicle
+    :returns: Lower bound on the number of vehicles
+    """
+
+    demands = asarray(demands, dtype=float)
+
+    if len(demands) == 0:
+        return 0
+
+    # Nothing fits into vehicles without capacity, every client with demand needs one at least
+    if capacity <= 0:
+        return int((demands > 0).sum())
+
+    return int(ceil(demands.sum() / capacity - 1e-9))
+
+
+def min_vehicles_l2(demands, capacity: float) -> int:
+    """
+    Martello-Toth L2 bin-packing lower bound.
+
+    For every threshold alpha in [0, C/2] clients are split into J1 (demand
+    greater than C - alpha), J2 (between C/2 and C - alpha) and J3 (between
+    alpha and C/2). Clients in J1 and J2 need separate vehicles, and J3
+    demand which does not fit into the residual space of J2 needs more.
+    All thresholds are evaluated at once on the sorted demands.
+
+    :param demands: Client demands
+    :param capacity: Capacity of a single vehicle
+    :returns: Lower bound on the number of vehicles
+    """
+
+    w = sort(asarray(demands, dtype=float))
+
+    if len(w) == 0:
+        return 0
+
+    if capacity <= 0:
+        return min_vehicles_l1(w, capacity)
+
+    prefix = concatenate(([0.0], cumsum(w)))
+    half = capacity / 2.0
+
+    # Only thresholds equal to some demand (or zero) give distinct bounds
+    alphas = unique(concatenate(([0.0], w[w <= half])))
+
+    # Indices into sorted demands: w[lo:mid] is J3, w[mid:hi] is J2, w[hi:] is J1
+    lo = searchsorted(w, alphas, side="left")
+    mid = searchsorted(w, half, side="right")
+    hi = searchsorted(w, capacity - alphas, side="right")
+    hi = hi.clip(min=mid)
+
+    n = len(w)
+    j1_j2 = n - mid
+    j2_count = hi - mid
+    j2_sum = prefix[hi] - prefix[mid]
+    j3_sum = prefix[mid] - prefix[lo]
+
+    residual = j3_sum - (j2_count * capacity - j2_sum)
+    extra = ceil(residual / capacity - 1e-9).clip(min=0)
+
+    return int(max((j1_j2 + extra).max(), min_vehicles_l1(w, capacity)))
+
+
+def min_vehicles_fleet(demands, capacities) -> int:
+    """
+    Smallest number of vehicles (taken from the largest) whose total
+    capacity covers total demand.
+
+    :param demands: Client demands
+    :param capacities: Vehicle capacities
+    :returns: Lower bound on the number of vehicles, or len(capacities) + 1 if even
+        the whole fleet is not enough
+    """
+
+    total = float(asarray(demands, dtype=float).sum())
+    fleet = cumsum(sort(asarray(capacities, dtype=float))[::-1])
+
+    return int(searchsorted(fleet, total - 1e-9, side="left")) + 1
+
+
+def first_fit_packing(demands, capacities):
+    """
+    First-fit decreasing packing of clients into the given fleet.
+
+    Clients are sorted by decreasing demand and vehicles by decreasing
+    capacity, every client goes to the first vehicle with enough free space.
+
+    :param demands: Client demands
+    :param capacities: Vehicle capacities
+    :returns: Vehicle index (into capacities) for every client, or None if packing failed
+    """
+
+    demands = asarray(demands, dtype=float)
+    by_capacity = argsort(-asarray(capacities, dtype=float), kind="stable")
+    free = asarray(capacities, dtype=float)[by_capacity]
+    packing = zeros(len(demands), dtype=int)
+
+    for i in argsort(-demands, kind="stable"):
+        fits = (free >= demands[i] - 1e-9).nonzero()[0]
+
+        if len(fits) == 0:
+            return None
+
+        free[fits[0]] -= demands[i]
+        packing[i] = by_capacity[fits[0]]
+
+    return packing
+
+
+def first_fit_decreasing(demands, capacities):
+    """
+    Number of vehicles used by first-fit decreasing packing (see first_fit_packing).
+
+    :param demands: Client demands
+    :param capacities: Vehicle capacities
+    :returns: Number of vehicles used, or None if packing failed
+    """
+
+    packing = first_fit_packing(demands, capacities)
+
+    return len(unique(packing)) if packing is not None else None
+
+
+def vehicle_bounds(demands, capacities) -> (int, int):
+    """
+    Bounds on the number of vehicles needed to carry all client demands.
+
+    :param demands: Client demands
+    :param capacities: Vehicle capacities
+    :returns: Tuple (lower bound, upper bound), upper bound is None if first-fit
+        decreasing did not manage to pack the clients
+    """
+
+    demands = asarray(demands, dtype=float)
+    capacities = asarray(capacities, dtype=float)
+
+    lower = max(
+        min_vehicles_l2(demands, capacities.max()),
+        min_vehicles_fleet(demands, capacities),
+    )
+
+    return lower, first_fit_decreasing(demands, capacities)
+
+
+def check_feasibility(demands, capacities):
+    """
+    Fast pre-solve check whether demands can be served by the fleet at all.
+
+    Raises one of CVRPException subclasses if instance is proven infeasible.
+
+    :param demands: Client demands
+    :param capacities: Vehicle capacities
+    :returns: Tuple of vehicle bounds as returned by vehicle_bounds
+    """
+
+    demands = asarray(demands, dtype=float)
+    capacities = asarray(capacities, dtype=float)
+
+    if len(demands) == 0:
+        raise NoClientsException()
+
+    if len(capacities) == 0:
+        raise NoVehiclesException()
+
+    if capacities.sum() < demands.sum():
+        raise SumCapacityOverloadException()
+
+    if capacities.max() < demands.max():
+        raise MaxCapacityOverloadException()
+
+    lower = max(
+        min_vehicles_l2(demands, capacities.max()),
+        min_vehicles_fleet(demands, capacities),
+    )
+
+    if lower > len(capacities):
+        raise InsufficientVehiclesException()
+
+    upper = first_fit_decreasing(demands, capacities)
+
+    if upper is None:
+        # Clients larger than a capacity level can only be served by vehicles above it
+        for level in unique(capacities)[:-1]:
+            large = demands[demands > level]
+            larger_vehicles = capacities[capacities > level]
+
+            if larger_vehicles.sum() < large.sum():
+                raise InsufficientVehiclesException()
+
+            if min_vehicles_l2(large, larger_vehicles.max()) > len(larger_vehicles):
+                raise InsufficientVehiclesException()
+
+    return lower, upper
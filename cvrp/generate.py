@@ -0,0 +1,196 @@
+from math import ceil, cos, radians
+
+from numpy import ceil as ceil_array, clip, concatenate, cos as cos_array, full, ndarray, pi, sin, zeros
+from numpy.random import Generator, default_rng
+
+from cvrp.data import Network, Place, Vehicle
+
+# Instances follow the scheme of Uchoa et al. benchmark sets: clients placed
+# uniformly, in clusters or mixed, depot in the center, in a corner or at
+# random, demands from one of several distributions and capacity derived from
+# the average number of clients per route. Coordinates are generated in a
+# square area (in km) and mapped onto latitudes and longitudes around center.
+
+KM_PER_DEGREE = 111.195
+
+CLIENT_PLACEMENTS = ("uniform", "clustered", "mixed")
+DEPOT_PLACEMENTS = ("random", "center", "corner")
+
+
+def _unit(rng: Generator, n: int, x: ndarray, y: ndarray, size: float) -> ndarray:
+    return full(n, 1.0)
+
+
+def _small(rng: Generator, n: int, x: ndarray, y: ndarray, size: float) -> ndarray:
+    return rng.integers(1, 11, n).astype(float)
+
+
+def _large(rng: Generator, n: int, x: ndarray, y: ndarray, size: float) -> ndarray:
+    return rng.integers(5, 101, n).astype(float)
+
+
+def _quadrant(rng: Generator, n: int, x: ndarray, y: ndarray, size: float) -> ndarray:
+    # Large demands in two opposite quadrants, small ones in the others
+    even = (x > size / 2) == (y > size / 2)
+
+    return (rng.integers(1, 51, n) + 50 * even).astype(float)
+
+
+def _many_small(rng: Generator, n: int, x: ndarray, y: ndarray, size: float) -> ndarray:
+    small_share = rng.uniform(0.7, 0.95)
+    small = rng.random(n) < small_share
+
+    return (rng.integers(1, 11, n) * small + rng.integers(50, 101, n) * ~small).astype(float)
+
+
+DEMAND_DISTRIBUTIONS = {
+    "unit": _unit,
+    "small": _small,
+    "large": _large,
+    "quadrant": _quadrant,
+    "many_small": _many_small,
+}
+
+
+def _clustered(rng: Generator, n: int, size: float, clusters: int, spread: float) -> (ndarray, ndarray):
+    """
+    Clients around uniformly placed cluster centers, distances from centers
+    distributed exponentially (density decreases exponentially from centers).
+    """
+
+    centers = rng.uniform(0.0, size, (clusters, 2))
+    owner = rng.integers(0, clusters, n)
+    distance = rng.exponential(spread, n)
+    angle = rng.uniform(0.0, 2 * pi, n)
+
+    x = clip(centers[owner, 0] + distance * cos_array(angle), 0.0, size)
+    y = clip(centers[owner, 1] + distance * sin(angle), 0.0, size)
+
+    return x, y
+
+
+def generate_arrays(clients: int, placement: str = "uniform", depot: str = "center", demand: str = "small",
+                    route_size: float = 10.0, capacity_spread: float = 0.0, fleet_slack: float = 0.1,
+                    size: float = 100.0, clusters: int = None, cluster_spread: float = None,
+                    seed: int = None) -> dict:
+    """
+    Generate a random instance as arrays.
+
+    :param clients: Number of clients
+    :param placement: Client placement, one of CLIENT_PLACEMENTS (mixed
+        places half of clients uniformly and half in clusters)
+    :param depot: Depot placement, one of DEPOT_PLACEMENTS
+    :param demand: Demand distribution, one of DEMAND_DISTRIBUTIONS
+    :param route_size: Average number of clients per route, sets the
+        capacity to route_size times the average demand
+    :param capacity_spread: Relative spread of vehicle capacities around the
+        capacity, below 1 (0 for a homogeneous fleet)
+    :param fleet_slack: Share of vehicles added above the number needed for the total demand
+        (the fleet is never larger than the number of clients)
+    :param size: Side of the square area in km
+    :param clusters: Number of clusters (random from 3 to 8 if None)
+    :param cluster_spread: Mean distance of clients from cluster centers in km (size / 25 if None)
+    :param seed: Random seed
+    :returns: Dict of arrays x, y (km, depot first), demands (depot first,
+        0 for the depot) and capacities
+    """
+
+    if clients < 1:
+        raise ValueError("Number of clients must be positive")
+
+    if placement not in CLIENT_PLACEMENTS:
+        raise ValueError(f"Unknown client placement: {placement}")
+
+    if depot not in DEPOT_PLACEMENTS:
+        raise ValueError(f"Unknown depot placement: {depot}")
+
+    if demand not in DEMAND_DISTRIBUTIONS:
+        raise ValueError(f"Unknown demand distribution: {demand}")
+
+    if not 0.0 <= capacity_spread < 1.0:
+        raise ValueError("Capacity spread must be between 0 and 1")
+
+    rng = default_rng(seed)
+    clusters = clusters or int(rng.integers(3, 9))
+    cluster_spread = cluster_spread if cluster_spread is not None else size / 25
+
+    if placement == "uniform":
+        clustered = 0
+    elif placement == "clustered":
+        clustered = clients
+    else:
+        clustered = clients // 2
+
+    cx, cy = _clustered(rng, clustered, size, clusters, cluster_spread)
+    ux, uy = rng.uniform(0.0, size, (2, clients - clustered))
+
+    if depot == "center":
+        depot_xy = (size / 2, size / 2)
+    elif depot == "corner":
+        depot_xy = (0.0, 0.0)
+    else:
+        depot_xy = tuple(rng.uniform(0.0, size, 2))
+
+    x = concatenate(([depot_xy[0]], cx, ux))
+    y = concatenate(([depot_xy[1]], cy, uy))
+
+    demands = zeros(clients + 1)
+    demands[1:] = DEMAND_DISTRIBUTIONS[demand](rng, clients, x[1:], y[1:], size)
+
+    # Largest client has to fit into the smallest vehicle
+    capacity = max(ceil(route_size * demands[1:].mean()), ceil(demands.max() / (1 - capacity_spread)))
+
+    # More vehicles than clients would leave some routes empty
+    vehicles = min(ceil(demands.sum() / capacity * (1 + fleet_slack)) + 1, clients)
+    capacities = ceil_array(capacity * (1 + capacity_spread * rng.uniform(-1.0, 1.0, vehicles)))
+
+    # Spread may shrink the fleet below total demand, the largest vehicles make up for it
+    shortage = demands.sum() - capacities.sum()
+
+    if shortage > 0:
+        capacities[capacities.argmax()] += shortage
+
+    return {"x": x, "y": y, "demands": demands, "capacities": capacities}
+
+
+def to_lat_lon(x: ndarray, y: ndarray, center: (float, float), size: float) -> (ndarray, ndarray):
+    """
+    Map coordinates in km within a square area onto latitudes and longitudes
+    (equirectangular projection around the center of the area).
+    """
+
+    lat0, lon0 = center
+    lat = lat0 + (y - size / 2) / KM_PER_DEGREE
+    lon = lon0 + (x - size / 2) / (KM_PER_DEGREE * max(cos(radians(lat0)), 1e-6))
+
+    return clip(lat, -90.0, 90.0), clip(lon, -180.0, 180.0)
+
+
+def generate(clients: int, center: (float, float) = (52.0, 20.0), size: float = 100.0, seed: int = None,
+             **options) -> Network:
+    """
+    Generate a random network (see generate_arrays for options).
+
+    :param clients: Number of clients
+    :param center: Latitude and longitude of the center of the area
+    :param size: Side of the square area in km
+    :param seed: Random seed, the same seed and options give the same network
+    :returns: Network
+    """
+
+    arrays = generate_arrays(clients, size=size, seed=seed, **options)
+    lat, lon = to_lat_lon(arrays["x"], arrays["y"], center, size)
+    lat, lon, demands = lat.tolist(), lon.tolist(), arrays["demands"].tolist()
+
+    network = Network()
+    network.depot = Place("Central Depot", lat[0], lon[0])
+    network.add_clients([
+        Place(f"Client {i}", lat[i], lon[i], demands[i])
+        for i in range(1, clients + 1)
+    ])
+    network.add_vehicles([
+        Vehicle(f"Vehicle {k + 1}", capacity)
+        for k, capacity in enumerate(arrays["capacities"].tolist())
+    ])
+
+    return network
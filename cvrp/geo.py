@@ -1,4 +1,4 @@
-from numpy import sin, cos, sqrt, power, arctan2, deg2rad
+from numpy import sin, cos, sqrt, power, arctan2, deg2rad, asarray, clip
 
 # Approximate mean earth radius
 EARTH_RADIUS = 6.371E+3
@@ -31,3 +31,47 @@ def geo_dist(lat_a: float, lon_a: float, lat_b: float, lon_b: float) -> float:
     c = 2 * arctan2(sqrt(a), sqrt(1 - a))
 
     return EARTH_RADIUS * c
+
+
+def geo_dist_matrix(lat_a, lon_a, lat_b=None, lon_b=None):
+    """
+    Pairwise geographic distances between two sets of coordinates.
+
+    Vectorized variant of :func:`geo_dist` (same Haversine formula).
+
+    :param lat_a: First latitudes (array of size n)
+    :param lon_a: First longitudes (array of size n)
+    :param lat_b: Second latitudes (array of size m), defaults to lat_a
+    :param lon_b: Second longitudes (array of size m), defaults to lon_a
+    :returns: Distance matrix of shape (n, m)
+    """
+
+    if lat_b is None or lon_b is None:
+        lat_b, lon_b = lat_a, lon_a
+
+    return geo_dist_pairs(
+        asarray(lat_a, dtype=float)[:, None], asarray(lon_a, dtype=float)[:, None],
+        asarray(lat_b, dtype=float)[None, :], asarray(lon_b, dtype=float)[None, :]
+    )
+
+
+def geo_dist_pairs(lat_a, lon_a, lat_b, lon_b):
+    """
+    Element-wise geographic distances (arrays are broadcast together).
+
+    :returns: Distances of the broadcast shape
+    """
+
+    fi_a = deg2rad(asarray(lat_a, dtype=float))
+    fi_b = deg2rad(asarray(lat_b, dtype=float))
+    lm_a = deg2rad(asarray(lon_a, dtype=float))
+    lm_b = deg2rad(asarray(lon_b, dtype=float))
+
+    d_fi_sq = power(sin((fi_b - fi_a) * 0.5), 2)
+    d_lm_sq = power(sin((lm_b - lm_a) * 0.5), 2)
+
+    a = clip(d_fi_sq + cos(fi_a) * cos(fi_b) * d_lm_sq, 0.0, 1.0)
+
+    c = 2 * arctan2(sqrt(a), sqrt(1 - a))
+
+    return EARTH_RADIUS * c
@@ -0,0 +1,640 @@
+from numpy import argpartition, argsort, array, asarray, inf, minimum, ndarray, take_along_axis
+
+from cvrp.data import Network
+from cvrp.exceptions import InsufficientVehiclesException
+
+# Routes used by heuristics are lists of place indices (clients are numbered
+# from 1 in Network.all_places order, 0 is the depot, which is not stored in
+# the route). Route lists are aligned with Network.vehicles, unused vehicles
+# have empty routes.
+
+EPSILON = 1e-9
+
+
+def network_arrays(network: Network) -> (ndarray, ndarray, ndarray):
+    """
+    Index-based representation of the network used by heuristics.
+
+    :param network: Network
+    :returns: Tuple (distance matrix, demands with depot at index 0, vehicle capacities)
+    """
+
+    demands = array([p.demand for p in network.all_places], dtype=float)
+    demands[0] = 0.0
+
+    return network.distance_matrix(), demands, network.vehicle_capacities
+
+
+class TimeWindows:
+    """
+    Time constraints for heuristics, in minutes (places indexed as in
+    network_arrays, vehicles as in routes).
+
+    Feasibility of insertions is checked in constant time against route
+    schedules (see schedule): a stop whose service start is pushed forward
+    by no more than its forward time slack (latest - earliest start) keeps
+    the rest of the route feasible. Removing stops never makes a route
+    infeasible, as travel times satisfy the triangle inequality.
+
+    :ivar travel: Travel times between places
+    :ivar service: Service times (0 for the depot)
+    :ivar ready: Earliest service starts (departure from the depot at index 0)
+    :ivar due: Latest service starts (inf for the depot)
+    :ivar returns: Latest return to the depot of every vehicle
+    """
+
+    def __init__(self, travel, service, ready, due, returns):
+        self.travel = travel.tolist() if isinstance(travel, ndarray) else travel
+        self.service = [float(t) for t in service]
+        self.ready = [float(t) for t in ready]
+        self.due = [float(t) for t in due]
+        self.returns = [float(t) for t in returns]
+        self.longest_return = max(self.returns, default=inf)
+
+    def arrays(self) -> dict:
+        """
+        Time data as arrays (accepted back by the constructor as keyword arguments).
+        """
+
+        return {
+            "travel": array(self.travel, dtype=float), "service": array(self.service),
+            "ready": array(self.ready), "due": array(self.due), "returns": array(self.returns)
+        }
+
+    def schedule(self, route: [int], vehicle: int = None) -> ([float], [float]):
+        """
+        Earliest and latest service starts along the route.
+
+        Both lists are indexed by stops of the route with the depot at both
+        ends (position 0 is the departure, the last one the return). Latest
+        starts are the latest ones keeping the rest of the route feasible.
+
+        :param route: Route
+        :param vehicle: Vehicle index (the longest shift is used if None)
+        :returns: Tuple (earliest starts, latest starts)
+        """
+
+        travel, service, ready, due = self.travel, self.service, self.ready, self.due
+        stops = [0] + list(route) + [0]
+
+        earliest = [ready[0]]
+
+        for a, b in zip(stops[:-1], stops[1:]):
+            earliest.append(max(ready[b], earliest[-1] + service[a] + travel[a][b]))
+
+        latest = [0.0] * len(stops)
+        latest[-1] = self.returns[vehicle] if vehicle is not None else self.longest_return
+
+        for pos in range(len(stops) - 2, -1, -1):
+            a, b = stops[pos], stops[pos + 1]
+            latest[pos] = min(due[a], latest[pos + 1] - service[a] - travel[a][b])
+
+        return earliest, latest
+
+    def feasible(self, route: [int], vehicle: int = None) -> bool:
+        earliest, latest = self.schedule(route, vehicle)
+
+        return all(e <= l + EPSILON for e, l in zip(earliest, latest))
+
+    def path_fits(self, start: float, a: int, path: [int], b: int, latest_b: float) -> bool:
+        """
+        Check whether stops of path fit between a and b.
+
+        :param start: Earliest service start at a
+        :param a: Stop before path
+        :param path: Inserted stops
+        :param b: Stop after path
+        :param latest_b: Latest service start at b
+        """
+
+        travel, service, ready, due = self.travel, self.service, self.ready, self.due
+
+        for u in path:
+            start = max(ready[u], start + service[a] + travel[a][u])
+
+            if start > due[u] + EPSILON:
+                return False
+
+            a = u
+
+        return max(ready[b], start + service[a] + travel[a][b]) <= latest_b + EPSILON
+
+
+def network_time_windows(network: Network, dist: ndarray = None, places: list = None,
+                         travel=None) -> TimeWindows:
+    """
+    Time constraints of the network for heuristics.
+
+    Vehicles leave the depot at its ready time and have to return by its due
+    time and within their shift length.
+
+    :param network: Network
+    :param dist: Distance matrix (computed if None)
+    :param places: Places indexed as in travel, depot first (all places of the
+        network if None), time windows are then built even if the network has none
+    :param travel: Travel times looked up as travel[a][b] (from dist if None)
+    :returns: Time windows, None if the network has no time constraints
+    """
+
+    if places is None:
+        if not network.has_time_constraints:
+            return None
+
+        places = network.all_places
+
+    depot = network.depot
+
+    service = [p.service_time for p in places]
+    ready = [p.ready_time for p in places]
+    due = [p.due_time for p in places]
+    service[0], due[0] = 0.0, inf
+
+    shifts = array([v.shift_length for v in network.vehicles], dtype=float)
+    returns = minimum(depot.ready_time + shifts, depot.due_time)
+
+    travel = travel if travel is not None else network.travel_time_matrix(dist)
+
+    return TimeWindows(travel, service, ready, due, returns)
+
+
+def to_vehicle_routes(network: Network, routes: [[int]]) -> dict:
+    """
+    Convert index routes into CVRPModel.vehicle_routes format.
+    """
+
+    slugs = [p.slug_name for p in network.all_places]
+    vehicle_routes = {}
+
+    for vehicle, route in zip(network.vehicles, routes):
+        stops = [slugs[0]] + [slugs[i] for i in route] + [slugs[0]]
+        vehicle_routes[vehicle.slug_name] = list(zip(stops[:-1], stops[1:])) if route else []
+
+    return vehicle_routes
+
+
+def from_vehicle_routes(network: Network, vehicle_routes: dict) -> [[int]]:
+    """
+    Convert routes in CVRPModel.vehicle_routes format into index routes.
+    """
+
+    indices = {p.slug_name: i for i, p in enumerate(network.all_places)}
+
+    return [
+        [indices[dest] for _, dest in vehicle_routes.get(vehicle.slug_name, [])[:-1]]
+        for vehicle in network.vehicles
+    ]
+
+
+def route_length(dist, route: [int]) -> float:
+    if not route:
+        return 0.0
+
+    stops = [0] + list(route) + [0]
+
+    return float(sum(dist[a][b] for a, b in zip(stops[:-1], stops[1:])))
+
+
+def total_length(dist, routes: [[int]]) -> float:
+    return sum(route_length(dist, route) for route in routes)
+
+
+def nearest_neighbours(dist: ndarray, k: int = 20) -> [[int]]:
+    """
+    k nearest clients of every place (ordered by distance, depot excluded).
+
+    :param dist: Distance matrix
+    :param k: Number of neighbours
+    :returns: List of neighbour lists, indexed by place
+    """
+
+    n = len(dist)
+    k = min(k, n - 2)
+
+    if k <= 0:
+        return [[] for _ in range(n)]
+
+    # Depot and the place itself must never be selected
+    clients = asarray(dist, dtype=float)[:, 1:].copy()
+    clients[range(1, n), range(n - 1)] = float("inf")
+
+    nearest = argpartition(clients, k - 1, axis=1)[:, :k]
+    order = argsort(take_along_axis(clients, nearest, axis=1), axis=1)
+
+    return (take_along_axis(nearest, order, axis=1) + 1).tolist()
+
+
+def assign_vehicles(loads: [float], capacities) -> [int]:
+    """
+    Match routes to vehicles, larger loads to larger vehicles.
+
+    :param loads: Route loads
+    :param capacities: Vehicle capacities
+    :returns: Vehicle index for every route, or None if routes can not be matched
+    """
+
+    capacities = list(capacities)
+
+    if len(loads) > len(capacities):
+        return None
+
+    by_load = sorted(range(len(loads)), key=lambda r: -loads[r])
+    by_capacity = sorted(range(len(capacities)), key=lambda v: -capacities[v])
+
+    assignment = [0] * len(loads)
+
+    for r, v in zip(by_load, by_capacity):
+        if loads[r] > capacities[v] + EPSILON:
+            return None
+
+        assignment[r] = v
+
+    return assignment
+
+
+def cheapest_insertion(dist, demands, capacities, routes: [[int]], clients: [int],
+                       times: TimeWindows = None) -> [[int]]:
+    """
+    Insert clients one by one at their cheapest feasible position.
+
+    :param times: Time windows checked along with capacities (ignored if None)
+    :raises InsufficientVehiclesException: Some client does not fit into any route
+    """
+
+    routes = [list(route) for route in routes]
+    loads = [sum(demands[i] for i in route) for route in routes]
+    timing = [times.schedule(route, r) for r, route in enumerate(routes)] if times is not None else None
+
+    for u in clients:
+        best = None
+
+        for r, route in enumerate(routes):
+            if loads[r] + demands[u] > capacities[r] + EPSILON:
+                continue
+
+            stops = [0] + route + [0]
+
+            for pos in range(len(stops) - 1):
+                a, b = stops[pos], stops[pos + 1]
+                delta = dist[a][u] + dist[u][b] - dist[a][b]
+
+                if best is not None and delta >= best[0]:
+                    continue
+
+                if timing is not None and not times.path_fits(timing[r][0][pos], a, [u], b, timing[r][1][pos + 1]):
+                    continue
+
+                best = (delta, r, pos)
+
+        if best is None:
+            raise InsufficientVehiclesException()
+
+        _, r, pos = best
+        routes[r].insert(pos, u)
+        loads[r] += demands[u]
+
+        if timing is not None:
+            timing[r] = times.schedule(routes[r], r)
+
+    return routes
+
+
+def ruin_and_recreate(rng, dist, demands, capacities, routes: [[int]], neighbours: [[int]], size: int,
+                      times: TimeWindows = None) -> [[int]]:
+    """
+    Remove a random client with its nearest neighbours and reinsert them in
+    random order by cheapest insertion (which may also use empty routes).
+
+    :param rng: Random generator (random.Random)
+    :param size: Number of removed clients
+    :raises InsufficientVehiclesException: Some client could not be reinserted
+    """
+
+    seed_client = rng.randrange(1, len(dist))
+    removed = {seed_client, *neighbours[seed_client][:size - 1]}
+
+    partial = [[u for u in route if u not in removed] for route in routes]
+    order = list(removed)
+    rng.shuffle(order)
+
+    return cheapest_insertion(dist, demands, capacities, partial, order, times)
+
+
+def savings_routes(dist, demands, capacities, neighbours: [[int]] = None, times: TimeWindows = None) -> [[int]]:
+    """
+    Clarke-Wright savings construction for a fixed heterogeneous fleet.
+
+    Routes are merged up to the largest vehicle capacity (and the longest
+    shift), then matched with vehicles. Clients of routes which could not be
+    matched are reinserted with cheapest insertion.
+
+    :param dist: Distance matrix
+    :param demands: Demands (depot at index 0)
+    :param capacities: Vehicle capacities
+    :param neighbours: Candidate lists limiting savings to neighbouring pairs
+        (all pairs are considered if None)
+    :param times: Time windows (ignored if None)
+    :returns: Routes aligned with vehicles
+    """
+
+    dist = dist.tolist() if isinstance(dist, ndarray) else dist
+    n = len(dist)
+    q_max = max(capacities)
+
+    if neighbours is None:
+        pairs = ((i, j) for i in range(1, n) for j in range(i + 1, n))
+    else:
+        pairs = {(min(i, j), max(i, j)) for i in range(1, n) for j in neighbours[i]}
+
+    savings = sorted(
+        ((dist[0][i] + dist[0][j] - dist[i][j], i, j) for i, j in pairs),
+        reverse=True
+    )
+
+    route_of = list(range(n))
+    members = {i: [i] for i in range(1, n)}
+    loads = {i: demands[i] for i in range(1, n)}
+    timing = {i: times.schedule([i]) for i in range(1, n)} if times is not None else None
+
+    for saving, i, j in savings:
+        ri, rj = route_of[i], route_of[j]
+
+        if ri == rj or loads[ri] + loads[rj] > q_max + EPSILON:
+            continue
+
+        a, b = members[ri], members[rj]
+
+        # Both clients have to be route ends
+        if a[-1] != i:
+            a = a[::-1]
+
+        if b[0] != j:
+            b = b[::-1]
+
+        if a[-1] != i or b[0] != j:
+            continue
+
+        if timing is not None:
+            # Reversed routes have to be scheduled again, otherwise the merge is checked in constant time
+            a_timing = timing[ri] if a is members[ri] else times.schedule(a)
+            b_timing = timing[rj] if b is members[rj] else times.schedule(b)
+
+            if not times.path_fits(a_timing[0][-2], i, [], j, b_timing[1][1]):
+                continue
+
+            merged = a + b
+
+            if a is not members[ri] or b is not members[rj]:
+                if not times.feasible(merged):
+                    continue
+
+            timing[ri] = times.schedule(merged)
+            del timing[rj]
+        else:
+            merged = a + b
+
+        members[ri] = merged
+        loads[ri] += loads.pop(rj)
+        del members[rj]
+
+        for c in b:
+            route_of[c] = ri
+
+    return fit_to_fleet(dist, demands, capacities, list(members.values()), times)
+
+
+def fit_to_fleet(dist, demands, capacities, routes: [[int]], times: TimeWindows = None) -> [[int]]:
+    """
+    Match routes with vehicles, larger loads to larger vehicles.
+
+    Smallest routes are dropped until the rest can be matched, their
+    clients (and clients of routes exceeding the shift of the matched
+    vehicle) are reinserted with cheapest insertion.
+
+    :param routes: Routes built regardless of vehicles (every client in exactly one of them)
+    :returns: Routes aligned with vehicles
+    :raises InsufficientVehiclesException: Some client does not fit into any route
+    """
+
+    merged = sorted(routes, key=lambda route: -sum(demands[i] for i in route))
+    assignment = None
+
+    while merged:
+        assignment = assign_vehicles([sum(demands[i] for i in route) for route in merged], capacities)
+
+        if assignment is not None:
+            break
+
+        # Drop the smallest route and reinsert its clients later
+        merged = merged[:-1]
+
+    fitted = [[] for _ in capacities]
+
+    for route, v in zip(merged, assignment or []):
+        # Routes exceeding the shift of the matched vehicle are reinserted as well
+        if times is None or times.feasible(route, v):
+            fitted[v] = route
+
+    routed = {i for route in fitted for i in route}
+    pending = sorted((i for route in routes for i in route if i not in routed), key=lambda i: -demands[i])
+
+    return cheapest_insertion(dist, demands, capacities, fitted, pending, times)
+
+
+def two_opt(dist, route: [int], times: TimeWindows = None, vehicle: int = None) -> bool:
+    """
+    Improve route in place with 2-opt moves (first improvement).
+
+    With time windows, improving moves are checked along the reversed
+    segment only, the rest of the route is covered by its schedule.
+
+    :param times: Time windows (ignored if None)
+    :param vehicle: Vehicle index of the route (for time windows)
+    :returns: True if route has been changed
+    """
+
+    stops = [0] + route + [0]
+    changed, improved = False, True
+    earliest, latest = times.schedule(route, vehicle) if times is not None else (None, None)
+
+    while improved:
+        improved = False
+
+        for i in range(1, len(stops) - 2):
+            a, b = stops[i - 1], stops[i]
+
+            for j in range(i + 1, len(stops) - 1):
+                c, d = stops[j], stops[j + 1]
+
+                if dist[a][c] + dist[b][d] < dist[a][b] + dist[c][d] - EPSILON:
+                    segment = stops[i:j + 1][::-1]
+
+                    if times is not None:
+                        if not times.path_fits(earliest[i - 1], a, segment, d, latest[j + 1]):
+                            continue
+
+                        earliest, latest = times.schedule(stops[1:i] + segment + stops[j + 1:-1], vehicle)
+
+                    stops[i:j + 1] = segment
+                    improved = changed = True
+                    b = stops[i]
+
+    route[:] = stops[1:-1]
+
+    return changed
+
+
+def _neighbourhood_positions(routes: [[int]]) -> dict:
+    return {u: (r, i) for r, route in enumerate(routes) for i, u in enumerate(route)}
+
+
+def local_search(dist, demands, capacities, routes: [[int]], neighbours: [[int]] = None,
+                 max_passes: int = 50, on_pass: callable = None, times: TimeWindows = None) -> [[int]]:
+    """
+    Granular local search: 2-opt within routes, relocate and swap between routes.
+
+    Inter-route moves are only evaluated between a client and its neighbours.
+    With time windows, every move is checked in constant time against route
+    schedules, which are only rebuilt for routes changed by applied moves.
+
+    :param dist: Distance matrix
+    :param demands: Demands (depot at index 0)
+    :param capacities: Vehicle capacities (aligned with routes)
+    :param routes: Initial routes
+    :param neighbours: Candidate lists (20 nearest if None)
+    :param max_passes: Maximum number of improvement passes
+    :param on_pass: Called with pass number and current routes after every pass
+    :param times: Time windows (ignored if None)
+    :returns: Improved routes
+    """
+
+    if neighbours is None:
+        neighbours = nearest_neighbours(asarray(dist))
+
+    dist = dist.tolist() if isinstance(dist, ndarray) else dist
+    demands = list(demands)
+    routes = [list(route) for route in routes]
+    loads = [sum(demands[i] for i in route) for route in routes]
+
+    for iteration in range(max_passes):
+        improved = False
+
+        for r, route in enumerate(routes):
+            improved |= two_opt(dist, route, times, r)
+
+        position = _neighbourhood_positions(routes)
+        timing = [times.schedule(route, r) for r, route in enumerate(routes)] if times is not None else None
+
+        for u in list(position):
+            r, i = position[u]
+            route = routes[r]
+            prev_u = route[i - 1] if i > 0 else 0
+            next_u = route[i + 1] if i < len(route) - 1 else 0
+            removal = dist[prev_u][u] + dist[u][next_u] - dist[prev_u][next_u]
+
+            best = None
+
+            for v in neighbours[u]:
+                s, j = position[v]
+
+                if s == r:
+                    continue
+
+                target = routes[s]
+                prev_v = target[j - 1] if j > 0 else 0
+                next_v = target[j + 1] if j < len(target) - 1 else 0
+
+                # Relocate u next to v (schedules are indexed by stops, depot first)
+                if loads[s] + demands[u] <= capacities[s] + EPSILON:
+                    for pos, a, b in ((j, prev_v, v), (j + 1, v, next_v)):
+                        delta = dist[a][u] + dist[u][b] - dist[a][b] - removal
+
+                        if delta < -EPSILON and (best is None or delta < best[0]) and (
+                                timing is None or
+                                times.path_fits(timing[s][0][pos], a, [u], b, timing[s][1][pos + 1])
+                        ):
+                            best = (delta, "relocate", s, pos)
+
+                # Swap u and v
+                if loads[s] - demands[v] + demands[u] <= capacities[s] + EPSILON and \
+                        loads[r] - demands[u] + demands[v] <= capacities[r] + EPSILON:
+                    delta = (
+                        dist[prev_u][v] + dist[v][next_u] - dist[prev_u][u] - dist[u][next_u] +
+                        dist[prev_v][u] + dist[u][next_v] - dist[prev_v][v] - dist[v][next_v]
+                    )
+
+                    if delta < -EPSILON and (best is None or delta < best[0]) and (
+                            timing is None or
+                            times.path_fits(timing[s][0][j], prev_v, [u], next_v, timing[s][1][j + 2]) and
+                            times.path_fits(timing[r][0][i], prev_u, [v], next_u, timing[r][1][i + 2])
+                    ):
+                        best = (delta, "swap", s, j)
+
+            if best is None:
+                continue
+
+            _, move, s, pos = best
+
+            if move == "relocate":
+                route.pop(i)
+                routes[s].insert(pos, u)
+                loads[r] -= demands[u]
+                loads[s] += demands[u]
+            else:
+                v = routes[s][pos]
+                route[i], routes[s][pos] = v, u
+                loads[r] += demands[v] - demands[u]
+                loads[s] += demands[u] - demands[v]
+
+            for t in (r, s):
+                for k, w in enumerate(routes[t]):
+                    position[w] = (t, k)
+
+                if timing is not None:
+                    timing[t] = times.schedule(routes[t], t)
+
+            improved = True
+
+        if on_pass is not None:
+            on_pass(iteration + 1, routes)
+
+        if not improved:
+            break
+
+    return routes
+
+
+def improve_vehicle_routes(network: Network, vehicle_routes: dict, neighbours: int = 20) -> dict:
+    """
+    Run local search over a solution in CVRPModel.vehicle_routes format.
+
+    :param network: Network
+    :param vehicle_routes: Solution to improve
+    :param neighbours: Size of candidate lists
+    :returns: Improved solution in the same format
+    """
+
+    dist, demands, capacities = network_arrays(network)
+    times = network_time_windows(network, dist)
+    routes = from_vehicle_routes(network, vehicle_routes)
+    routes = local_search(dist, demands, capacities, routes, nearest_neighbours(dist, neighbours), times=times)
+
+    return to_vehicle_routes(network, routes)
+
+
+def solve_heuristic(network: Network, neighbours: int = 20) -> dict:
+    """
+    Savings construction followed by local search.
+
+    :param network: Network
+    :param neighbours: Size of candidate lists
+    :returns: Routes in CVRPModel.vehicle_routes format
+    """
+
+    dist, demands, capacities = network_arrays(network)
+    times = network_time_windows(network, dist)
+    candidates = nearest_neighbours(dist, neighbours)
+
+    routes = savings_routes(dist, demands, capacities, candidates, times)
+    routes = local_search(dist, demands, capacities, routes, candidates, times=times)
+
+    return to_vehicle_routes(network, routes)
@@ -0,0 +1,437 @@
+import random
+import time
+from collections import deque
+from math import atan2
+
+from numpy import argsort, count_nonzero, delete, flatnonzero, full, inf, int64, ndarray, partition, stack, zeros
+
+from cvrp.data import Network
+from cvrp.exceptions import InsufficientVehiclesException
+from cvrp.heuristics import (
+    EPSILON, TimeWindows, fit_to_fleet, from_vehicle_routes, local_search, nearest_neighbours, network_arrays,
+    network_time_windows, savings_routes, to_vehicle_routes, total_length
+)
+from cvrp.progress import CancellationToken, SolveProgress
+
+# Hybrid genetic search (Vidal et al.): individuals are giant tours (all
+# clients in one sequence) cut into routes by Split, children come from order
+# crossover and are improved by local search ("education"), the population
+# is ranked by cost and contribution to diversity.
+
+
+def _split_pass(dist, tour: [int], distance: [float], load: [float], capacity: float,
+                source: [float], target: [float], pred: [int]):
+    """
+    One pass of linear Split: best cost of serving the first t clients of
+    the tour with a route of clients i+1..t appended to a solution of cost
+    source[i], for every t (written into target and pred).
+
+    Route cost is source[i] + key(i) + distance[t] + dist[last][0], where
+    key(i) does not depend on t, so the best i is the minimum of a sliding
+    window of capacity-feasible predecessors, kept in a monotone deque.
+    """
+
+    window, keys = deque(), {}
+
+    for t in range(1, len(tour) + 1):
+        i = t - 1
+
+        if source[i] < float("inf"):
+            keys[i] = source[i] + dist[0][tour[i]] - distance[i + 1]
+
+            while window and keys[window[-1]] >= keys[i]:
+                window.pop()
+
+            window.append(i)
+
+        while window and load[t] - load[window[0]] > capacity + EPSILON:
+            window.popleft()
+
+        if window:
+            best = window[0]
+            target[t] = keys[best] + distance[t] + dist[tour[t - 1]][0]
+            pred[t] = best
+
+
+def split(dist, demands, tour: [int], capacity: float, max_routes: int = None) -> [[int]]:
+    """
+    Cut giant tour optimally into capacity-feasible routes (clients keep the
+    tour order), in linear time (Vidal, 2016).
+
+    :param dist: Distance matrix (nested lists)
+    :param demands: Demands (depot at index 0)
+    :param tour: Giant tour (all clients)
+    :param capacity: Vehicle capacity
+    :param max_routes: Maximum number of routes (unlimited if None), limited
+        Split takes time proportional to max_routes
+    :returns: Routes, None if tour can not be split within limits
+    """
+
+    n = len(tour)
+    distance, load = [0.0] * (n + 1), [0.0] * (n + 1)
+
+    for t in range(1, n + 1):
+        load[t] = load[t - 1] + demands[tour[t - 1]]
+        distance[t] = distance[t - 1] + (dist[tour[t - 2]][tour[t - 1]] if t > 1 else 0.0)
+
+    if max_routes is None:
+        cost, pred = [0.0] + [float("inf")] * n, [0] * (n + 1)
+        _split_pass(dist, tour, distance, load, capacity, cost, cost, pred)
+        preds = [pred]
+        routes_used = 1 if cost[n] < float("inf") else None
+    else:
+        # Layer k holds costs of solutions with exactly k routes
+        layers, preds = [[0.0] + [float("inf")] * n], []
+
+        for _ in range(max_routes):
+            layer, pred = [float("inf")] * (n + 1), [0] * (n + 1)
+            _split_pass(dist, tour, distance, load, capacity, layers[-1], layer, pred)
+            layers.append(layer)
+            preds.append(pred)
+
+        best = min(range(1, max_routes + 1), key=lambda k: layers[k][n]) if max_routes else None
+        routes_used = best if best is not None and layers[best][n] < float("inf") else None
+
+    if routes_used is None:
+        return None
+
+    routes, t = [], n
+
+    while t > 0:
+        i = preds[routes_used - 1][t] if max_routes is not None else preds[0][t]
+        routes.append(tour[i:t])
+        t = i
+
+        if max_routes is not None:
+            routes_used -= 1
+
+    return routes[::-1]
+
+
+def split_time_windows(dist, demands, tour: [int], capacity: float, times: TimeWindows) -> [[int]]:
+    """
+    Cut giant tour optimally into capacity and time feasible routes.
+
+    Routes are extended client by client with their schedule, until capacity
+    or time windows are exceeded, which takes time proportional to the
+    number of clients times the length of the longest route.
+
+    :returns: Routes, None if some client can not be served at all
+    """
+
+    n = len(tour)
+    travel, service, ready, due = times.travel, times.service, times.ready, times.due
+    cost, pred = [0.0] + [float("inf")] * n, [0] * (n + 1)
+
+    for i in range(n):
+        if cost[i] == float("inf"):
+            continue
+
+        load, length, start, prev = 0.0, 0.0, ready[0], 0
+
+        for t in range(i + 1, n + 1):
+            u = tour[t - 1]
+            load += demands[u]
+            start = max(ready[u], start + service[prev] + travel[prev][u])
+
+            # Later clients would only be served later
+            if load > capacity + EPSILON or start > due[u] + EPSILON or \
+                    start + service[u] + travel[u][0] > times.longest_return + EPSILON:
+                break
+
+            length += dist[prev][u]
+
+            if cost[i] + length + dist[u][0] < cost[t]:
+                cost[t], pred[t] = cost[i] + length + dist[u][0], i
+
+            prev = u
+
+    if cost[n] == float("inf"):
+        return None
+
+    routes, t = [], n
+
+    while t > 0:
+        routes.append(tour[pred[t]:t])
+        t = pred[t]
+
+    return routes[::-1]
+
+
+def order_crossover(rng: random.Random, a: [int], b: [int]) -> [int]:
+    """
+    Child with a random slice of a in place and other clients in order of b.
+    """
+
+    n = len(a)
+    start, end = sorted(rng.sample(range(n + 1), 2))
+    kept = set(a[start:end])
+    rest = [u for u in b[end:] + b[:end] if u not in kept]
+
+    # Remaining clients follow the slice cyclically
+    child = [0] * n
+    child[start:end] = a[start:end]
+    free = list(range(end, n)) + list(range(start))
+
+    for position, u in zip(free, rest):
+        child[position] = u
+
+    return child
+
+
+class Individual:
+    """
+    Solution of the population.
+
+    :ivar routes: Routes aligned with vehicles
+    :ivar cost: Total length of routes
+    :ivar tour: Giant tour (routes ordered by polar angle around depot)
+    :ivar fitness: Biased fitness (lower is better), set by Population
+    """
+
+    def __init__(self, routes: [[int]], cost: float, angles: [float]):
+        self.routes = routes
+        self.cost = cost
+        self.fitness = 0.0
+
+        ordered = sorted(
+            (route for route in routes if route),
+            key=lambda route: sum(angles[u] for u in route) / len(route)
+        )
+        self.tour = [u for route in ordered for u in route]
+
+        # Neighbours of clients in routes (0 is the depot), for broken pairs distance
+        size = len(angles)
+        self.successors = zeros(size, dtype=int64)
+        self.predecessors = zeros(size, dtype=int64)
+
+        for route in ordered:
+            self.successors[route] = route[1:] + [0]
+            self.predecessors[route] = [0] + route[:-1]
+
+
+def broken_pairs(individual: Individual, successors: ndarray, predecessors: ndarray) -> ndarray:
+    """
+    Broken pairs distances of individual to others given by stacked
+    successor and predecessor arrays: share of clients whose successor is
+    neither successor nor predecessor in the other solution, or which start
+    a route in one solution only.
+    """
+
+    succ, pred = individual.successors[1:], individual.predecessors[1:]
+    other_succ, other_pred = successors[:, 1:], predecessors[:, 1:]
+
+    broken = count_nonzero((succ != other_succ) & (succ != other_pred), axis=1)
+    broken += count_nonzero((pred == 0) & (other_pred != 0) & (other_succ != 0), axis=1)
+
+    return broken / max(len(succ), 1)
+
+
+class Population:
+    """
+    Individuals ranked by biased fitness: rank by cost plus weighted rank by
+    diversity contribution (average distance to the closest individuals).
+    Survivor selection removes clones first, then the worst individuals.
+    """
+
+    def __init__(self, size: int = 25, generation: int = 40, elite: int = 4, close: int = 5):
+        self.size = size
+        self.generation = generation
+        self.elite = elite
+        self.close = close
+        self.individuals = []
+        # Distances between individuals (in order of individuals), inf on diagonal
+        self.__distances = zeros((0, 0))
+
+    def __len__(self):
+        return len(self.individuals)
+
+    def add(self, individual: Individual):
+        count = len(self.individuals)
+        distances = full((count + 1, count + 1), inf)
+        distances[:count, :count] = self.__distances
+
+        if count:
+            distances[count, :count] = distances[:count, count] = broken_pairs(
+                individual,
+                stack([other.successors for other in self.individuals]),
+                stack([other.predecessors for other in self.individuals])
+            )
+
+        self.__distances = distances
+        self.individuals.append(individual)
+
+        if len(self.individuals) > self.size + self.generation:
+            self.select_survivors()
+        else:
+            self.update_fitness()
+
+    def remove(self, position: int):
+        del self.individuals[position]
+        self.__distances = delete(delete(self.__distances, position, axis=0), position, axis=1)
+
+    def update_fitness(self):
+        individuals = self.individuals
+        count = len(individuals)
+
+        if count < 2:
+            for individual in individuals:
+                individual.fitness = 0.0
+
+            return
+
+        close = min(self.close, count - 1)
+        diversity = partition(self.__distances, close - 1, axis=1)[:, :close].mean(axis=1)
+
+        cost_rank = argsort(argsort([individual.cost for individual in individuals], kind="stable"))
+        diversity_rank = argsort(argsort(-diversity, kind="stable"))
+        weight = 1.0 - min(self.elite, count) / count
+
+        for individual, fitness in zip(individuals, ((cost_rank + weight * diversity_rank) / (count - 1)).tolist()):
+            individual.fitness = fitness
+
+    def select_survivors(self):
+        while len(self.individuals) > self.size:
+            clones = flatnonzero((self.__distances < EPSILON).any(axis=1))
+
+            if len(clones):
+                worst = max(clones.tolist(), key=lambda i: self.individuals[i].cost)
+            else:
+                self.update_fitness()
+                worst = max(range(len(self.individuals)), key=lambda i: self.individuals[i].fitness)
+
+            self.remove(worst)
+
+        self.update_fitness()
+
+    def tournament(self, rng: random.Random) -> Individual:
+        a, b = rng.sample(self.individuals, 2) if len(self.individuals) > 1 else self.individuals * 2
+
+        return a if a.fitness <= b.fitness else b
+
+
+def hybrid_genetic_search(network: Network, population_size: int = 25, generation_size: int = 40,
+                          elite: int = 4, close: int = 5, max_iterations: int = 5000,
+                          max_no_improvement: int = 1000, time_limit: float = None, seed: int = None,
+                          neighbours: int = 20, progress: callable = None,
+                          token: CancellationToken = None, initial: dict = None,
+                          checkpoint: callable = None) -> dict:
+    """
+    Solve network with hybrid genetic search.
+
+    Children of two parents chosen by binary tournament are made by order
+    crossover of giant tours, cut into routes by Split (capacity is the
+    largest vehicle capacity, routes are then matched with vehicles, see
+    fit_to_fleet) and educated by local search. Only feasible individuals
+    are kept.
+
+    :param network: Network
+    :param population_size: Individuals kept after survivor selection
+    :param generation_size: Children added before survivor selection
+    :param elite: Number of best individuals whose ranks by cost dominate fitness
+    :param close: Number of closest individuals measuring diversity contribution
+    :param max_iterations: Maximum number of children
+    :param max_no_improvement: Children without improvement of the best solution after which search stops
+    :param time_limit: Seconds after which search stops
+    :param seed: Random seed
+    :param neighbours: Size of candidate lists of local search
+    :param progress: Called with SolveProgress when the best solution improves
+    :param token: Cancellation token, the best solution found so far is returned when cancelled
+    :param initial: Valid routes (in CVRPModel.vehicle_routes format) added to the initial population
+    :param checkpoint: Called with (vehicle routes, cost, None) when the best solution improves
+    :returns: Routes in CVRPModel.vehicle_routes format (unused vehicles have empty routes)
+    :raises InsufficientVehiclesException: No feasible solution has been found
+    """
+
+    network.check_solvability()
+
+    rng = random.Random(seed)
+    deadline = time.time() + time_limit if time_limit is not None else float("inf")
+    report = progress if progress is not None else lambda state: None
+
+    dist, demands, capacities = network_arrays(network)
+    times = network_time_windows(network, dist)
+    candidates = nearest_neighbours(dist, neighbours)
+    dist, demands = dist.tolist(), demands.tolist()
+    capacity = float(max(capacities))
+
+    lat, lon = network.latitudes, network.longitudes
+    angles = [atan2(y - lat[0], x - lon[0]) for x, y in zip(lon.tolist(), lat.tolist())]
+
+    def educate(tour: [int]) -> Individual:
+        if times is None:
+            routes = split(dist, demands, tour, capacity)
+
+            # Fewer longer routes may fit the fleet where the cheapest split does not
+            if routes is not None and len(routes) > len(capacities):
+                routes = split(dist, demands, tour, capacity, len(capacities)) or routes
+        else:
+            routes = split_time_windows(dist, demands, tour, capacity, times)
+
+        if routes is None:
+            return None
+
+        try:
+            routes = fit_to_fleet(dist, demands, capacities, routes, times)
+        except InsufficientVehiclesException:
+            return None
+
+        routes = local_search(dist, demands, capacities, routes, candidates, times=times)
+
+        return Individual(routes, total_length(dist, routes), angles)
+
+    population = Population(population_size, generation_size, elite, close)
+    best = None
+
+    def consider(individual: Individual, iteration: int) -> bool:
+        nonlocal best
+
+        if individual is None:
+            return False
+
+        population.add(individual)
+
+        if best is None or individual.cost < best.cost - EPSILON:
+            best = individual
+            report(SolveProgress("heuristic", iteration=iteration, incumbent=best.cost))
+
+            if checkpoint is not None:
+                checkpoint(to_vehicle_routes(network, best.routes), best.cost, None)
+
+            return True
+
+        return False
+
+    try:
+        routes = savings_routes(dist, demands, capacities, candidates, times)
+        consider(Individual(routes, total_length(dist, routes), angles), 0)
+    except InsufficientVehiclesException:
+        pass
+
+    if initial is not None:
+        routes = from_vehicle_routes(network, initial)
+        routes = local_search(dist, demands, capacities, routes, candidates, times=times)
+        consider(Individual(routes, total_length(dist, routes), angles), 0)
+
+    clients = list(range(1, len(dist)))
+
+    for _ in range(population_size * 2):
+        if len(population) >= population_size or time.time() > deadline:
+            break
+
+        consider(educate(rng.sample(clients, len(clients))), 0)
+
+    no_improvement = 0
+
+    for iteration in range(1, max_iterations + 1):
+        if not population.individuals or no_improvement >= max_no_improvement or time.time() > deadline or \
+                (token is not None and token.cancelled):
+            break
+
+        child = order_crossover(rng, population.tournament(rng).tour, population.tournament(rng).tour)
+        no_improvement = 0 if consider(educate(child), iteration) else no_improvement + 1
+
+    if best is None:
+        raise InsufficientVehiclesException()
+
+    return to_vehicle_routes(network, best.routes)
@@ -0,0 +1,318 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from numpy import array, inf, isfinite, isnan, nan, ones, zeros
+
+from cvrp.data import Place, Vehicle
+
+# Accepted column names (first one is canonical)
+PLACE_COLUMNS = {
+    "name": ("name",),
+    "latitude": ("latitude", "lat"),
+    "longitude": ("longitude", "lon", "lng"),
+    "demand": ("demand",),
+    "service_time": ("service_time", "service"),
+    "ready_time": ("ready_time", "ready"),
+    "due_time": ("due_time", "due"),
+}
+
+VEHICLE_COLUMNS = {
+    "name": ("name",),
+    "max_capacity": ("max_capacity", "capacity"),
+    "shift_length": ("shift_length", "shift"),
+}
+
+CHUNK_SIZE = 10000
+
+
+def _count_lines(path: str) -> int:
+    count = 0
+
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            count += block.count(b"\n")
+
+    return count
+
+
+def _read_csv(path: str, chunk_size: int):
+    total = max(_count_lines(path) - 1, 1)
+
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.DictReader(file)
+
+        if reader.fieldnames is None:
+            raise ValueError("CSV file has no header row")
+
+        while True:
+            try:
+                rows = list(islice(reader, chunk_size))
+            except csv.Error as exc:
+                raise ValueError(f"Malformed CSV file: {exc}")
+
+            if not rows:
+                break
+
+            yield {key: [row.get(key) for row in rows] for key in reader.fieldnames}, total
+
+
+def _read_geojson(path: str, chunk_size: int):
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+
+    features = data.get("features", []) if isinstance(data, dict) else data
+    total = max(len(features), 1)
+
+    for start in range(0, len(features), chunk_size):
+        chunk = features[start:start + chunk_size]
+
+        # Features which are not objects, or have geometries without a position, are not GeoJSON points
+        try:
+            properties = [feature.get("properties") or {} for feature in chunk]
+            coordinates = [
+                (feature.get("geometry") or {}).get("coordinates") or (None, None)
+                for feature in chunk
+            ]
+
+            columns = {key: [p.get(key) for p in properties] for key in {k for p in properties for k in p}}
+
+            # GeoJSON positions are (longitude, latitude)
+            columns.setdefault("longitude", [c[0] for c in coordinates])
+            columns.setdefault("latitude", [c[1] for c in coordinates])
+        except (AttributeError, KeyError, IndexError, TypeError) as exc:
+            raise ValueError(f"Malformed GeoJSON feature near feature {start + 1}: {exc}")
+
+        yield columns, total
+
+
+def _read_parquet(path: str, chunk_size: int):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Reading Parquet files requires pyarrow package")
+
+    file = pq.ParquetFile(path)
+    total = max(file.metadata.num_rows, 1)
+
+    for batch in file.iter_batches(batch_size=chunk_size):
+        yield batch.to_pydict(), total
+
+
+READERS = {
+    ".csv": _read_csv,
+    ".geojson": _read_geojson,
+    ".json": _read_geojson,
+    ".parquet": _read_parquet,
+}
+
+
+def read_chunks(path: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Read tabular file in chunks.
+
+    :param path: CSV, GeoJSON or Parquet file
+    :param chunk_size: Number of rows per chunk
+    :returns: Generator of tuples (columns dict, total number of rows)
+    """
+
+    _, extension = os.path.splitext(path)
+
+    if extension.lower() not in READERS:
+        raise ValueError(f"Unsupported file type: {extension}")
+
+    return READERS[extension.lower()](path, chunk_size)
+
+
+def _column(columns: dict, names: (str,), size: int) -> list:
+    for name in names:
+        for key in columns:
+            if key is not None and key.strip().lower() == name:
+                return columns[key]
+
+    return [None] * size
+
+
+def _to_float(values: list):
+    def convert(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return nan
+
+    return array([convert(v) for v in values], dtype=float)
+
+
+def _to_float_or(values: list, default: float):
+    """
+    Convert optional column values, empty cells get default.
+    """
+
+    return _to_float([v if v not in (None, "") else default for v in values])
+
+
+def validate_places(names, lat, lon, demand, service=None, ready=None, due=None) -> ([str], array):
+    """
+    Vectorized validation of place columns (time columns are optional).
+
+    :returns: Tuple (error message for every row, empty if valid; mask of valid rows)
+    """
+
+    service = service if service is not None else zeros(len(names))
+    ready = ready if ready is not None else zeros(len(names))
+    due = due if due is not None else ready + inf
+
+    errors = [""] * len(names)
+    checks = [
+        (array([not n for n in names], dtype=bool), "missing name"),
+        (~isfinite(lat) | (abs(lat) > 90.0), "invalid latitude"),
+        (~isfinite(lon) | (abs(lon) > 180.0), "invalid longitude"),
+        (~isfinite(demand) | (demand < 0.0), "invalid demand"),
+        (~isfinite(service) | (service < 0.0), "invalid service time"),
+        (~isfinite(ready) | (ready < 0.0), "invalid ready time"),
+        (isnan(due) | (due < ready), "invalid due time"),
+    ]
+
+    valid = ones(len(names), dtype=bool)
+
+    for invalid, message in checks:
+        valid &= ~invalid
+
+        for i in invalid.nonzero()[0]:
+            errors[i] = f"{errors[i]}, {message}" if errors[i] else message
+
+    return errors, valid
+
+
+def validate_vehicles(names, capacity, shift=None) -> ([str], array):
+    """
+    Vectorized validation of vehicle columns (shift column is optional).
+
+    :returns: Tuple (error message for every row, empty if valid; mask of valid rows)
+    """
+
+    errors = [""] * len(names)
+    missing_name = array([not n for n in names], dtype=bool)
+    invalid_capacity = ~isfinite(capacity) | (capacity <= 0.0)
+    invalid_shift = isnan(shift) | (shift <= 0.0) if shift is not None else zeros(len(names), dtype=bool)
+
+    for i in missing_name.nonzero()[0]:
+        errors[i] = "missing name"
+
+    for i in invalid_capacity.nonzero()[0]:
+        errors[i] = f"{errors[i]}, invalid capacity" if errors[i] else "invalid capacity"
+
+    for i in invalid_shift.nonzero()[0]:
+        errors[i] = f"{errors[i]}, invalid shift length" if errors[i] else "invalid shift length"
+
+    return errors, ~missing_name & ~invalid_capacity & ~invalid_shift
+
+
+def _load(path, parse, chunk_size, progress, should_stop, existing):
+    items, errors = [], []
+    rows_done = 0
+
+    # Slug names identify places and vehicles in models and routes
+    slugs = set(existing)
+
+    for columns, total in read_chunks(path, chunk_size):
+        if should_stop is not None and should_stop():
+            break
+
+        size = len(next(iter(columns.values()), []))
+        chunk_items, chunk_errors = parse(columns, size)
+        rows = [i for i, e in enumerate(chunk_errors) if not e]
+
+        for row, item in zip(rows, chunk_items):
+            if item.slug_name in slugs:
+                raise ValueError(f"Row {rows_done + row + 1}: duplicate name {item.name!r}")
+
+            slugs.add(item.slug_name)
+
+        items.extend(chunk_items)
+        errors.extend(f"Row {rows_done + i + 1}: {e}" for i, e in enumerate(chunk_errors) if e)
+
+        rows_done += size
+
+        if progress is not None:
+            progress(min(rows_done / total, 1.0))
+
+    return items, errors
+
+
+def _parse_places(columns: dict, size: int) -> ([Place], [str]):
+    names = [str(n).strip() if n is not None else "" for n in _column(columns, PLACE_COLUMNS["name"], size)]
+    lat = _to_float(_column(columns, PLACE_COLUMNS["latitude"], size))
+    lon = _to_float(_column(columns, PLACE_COLUMNS["longitude"], size))
+    demand = _to_float_or(_column(columns, PLACE_COLUMNS["demand"], size), 0.0)
+    service = _to_float_or(_column(columns, PLACE_COLUMNS["service_time"], size), 0.0)
+    ready = _to_float_or(_column(columns, PLACE_COLUMNS["ready_time"], size), 0.0)
+    due = _to_float_or(_column(columns, PLACE_COLUMNS["due_time"], size), inf)
+
+    errors, valid = validate_places(names, lat, lon, demand, service, ready, due)
+
+    places = [
+        Place(names[i], lat[i], lon[i], demand[i], service[i], ready[i], due[i])
+        for i in valid.nonzero()[0]
+    ]
+
+    return places, errors
+
+
+def _parse_vehicles(columns: dict, size: int) -> ([Vehicle], [str]):
+    names = [str(n).strip() if n is not None else "" for n in _column(columns, VEHICLE_COLUMNS["name"], size)]
+    capacity = _to_float(_column(columns, VEHICLE_COLUMNS["max_capacity"], size))
+    shift = _to_float_or(_column(columns, VEHICLE_COLUMNS["shift_length"], size), inf)
+
+    errors, valid = validate_vehicles(names, capacity, shift)
+
+    vehicles = [
+        Vehicle(names[i], capacity[i], shift[i])
+        for i in valid.nonzero()[0]
+    ]
+
+    return vehicles, errors
+
+
+def load_places(path: str, chunk_size: int = CHUNK_SIZE, progress: callable = None,
+                should_stop: callable = None, existing: [str] = ()) -> ([Place], [str]):
+    """
+    Read places from CSV (columns name, latitude, longitude, demand), GeoJSON
+    (Point features with name and demand properties) or Parquet file.
+    Optional service_time, ready_time and due_time columns (properties) are
+    read as minutes.
+
+    Invalid rows are skipped and reported.
+
+    :param path: File path
+    :param chunk_size: Number of rows parsed and validated at once
+    :param progress: Called with fraction of rows done after every chunk
+    :param should_stop: Checked before every chunk, reading stops if it returns True
+    :param existing: Slug names of places already in the network
+    :returns: Tuple (list of places, list of error messages)
+    :raises ValueError: File can not be read, or names of two places have the same slug
+    """
+
+    return _load(path, _parse_places, chunk_size, progress, should_stop, existing)
+
+
+def load_vehicles(path: str, chunk_size: int = CHUNK_SIZE, progress: callable = None,
+                  should_stop: callable = None, existing: [str] = ()) -> ([Vehicle], [str]):
+    """
+    Read vehicles from CSV/Parquet (columns name, max_capacity) or GeoJSON
+    (features with name and max_capacity properties) file. Optional
+    shift_length column (property) is read as minutes.
+
+    Invalid rows are skipped and reported.
+
+    :param path: File path
+    :param chunk_size: Number of rows parsed and validated at once
+    :param progress: Called with fraction of rows done after every chunk
+    :param should_stop: Checked before every chunk, reading stops if it returns True
+    :param existing: Slug names of vehicles already in the network
+    :returns: Tuple (list of vehicles, list of error messages)
+    :raises ValueError: File can not be read, or names of two vehicles have the same slug
+    """
+
+    return _load(path, _parse_vehicles, chunk_size, progress, should_stop, existing)
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import time
+
+from cvrp.data import Network
+from cvrp.storage import network_columns
+
+# Journal is a text file with one JSON record per line, appended and synced
+# to disk on every write, so that a crash loses at most the record being
+# written (a truncated last line is ignored when reading). Records are
+# {"job", "event", "time", ...}, where event is "checkpoint" (incumbent
+# routes, cost and bound of a running job) or one of FINISHED_STATUSES.
+
+FINISHED_STATUSES = ("optimal", "reduced", "heuristic", "cancelled", "failed")
+
+
+def network_fingerprint(network: Network) -> str:
+    """
+    Hash of network data (places, vehicles, names and times), used to tell
+    whether journaled routes belong to the network.
+    """
+
+    digest = hashlib.sha1()
+
+    for key, values in sorted(network_columns(network).items()):
+        digest.update(key.encode("utf-8"))
+        digest.update(values.tobytes())
+
+    return digest.hexdigest()
+
+
+class JobState:
+    """
+    State of a job as last recorded in the journal.
+
+    :ivar status: "running" after a checkpoint, otherwise one of FINISHED_STATUSES
+    :ivar routes: Incumbent routes in CVRPModel.vehicle_routes format (None if unknown)
+    :ivar message: Error message of failed jobs
+    """
+
+    def __init__(self, job: str, status: str = "running", fingerprint: str = None, routes: dict = None,
+                 cost: float = None, bound: float = None, message: str = None, updated: float = None):
+        self.job = job
+        self.status = status
+        self.fingerprint = fingerprint
+        self.routes = routes
+        self.cost = cost
+        self.bound = bound
+        self.message = message
+        self.updated = updated
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def apply(self, record: dict):
+        """
+        Update state with a journal record of the job (missing values are kept).
+        """
+
+        event = record["event"]
+        self.status = "running" if event == "checkpoint" else event
+        self.updated = record.get("time", self.updated)
+
+        for key in ("fingerprint", "cost", "bound", "message"):
+            if record.get(key) is not None:
+                setattr(self, key, record[key])
+
+        if record.get("routes") is not None:
+            self.routes = {
+                vehicle: [tuple(arc) for arc in arcs]
+                for vehicle, arcs in record["routes"].items()
+            }
+
+    def record(self) -> dict:
+        """
+        Single journal record restoring this state.
+        """
+
+        return {
+            "job": self.job, "event": "checkpoint" if self.status == "running" else self.status,
+            "time": self.updated, "fingerprint": self.fingerprint, "routes": self.routes,
+            "cost": self.cost, "bound": self.bound, "message": self.message,
+        }
+
+
+class Journal:
+    """
+    Append-only journal of checkpoints and completion of solve jobs.
+
+    Jobs are identified by strings chosen by the caller (network file paths
+    in batches, network fingerprints in the GUI).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.jobs = {}
+
+        if os.path.exists(path):
+            self._read()
+
+    def _read(self):
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Record cut short by a crash
+                    continue
+
+                if record.get("job") is None or record.get("event") is None:
+                    continue
+
+                self.jobs.setdefault(record["job"], JobState(record["job"])).apply(record)
+
+    def _append(self, record: dict):
+        state = self.jobs.setdefault(record["job"], JobState(record["job"]))
+        state.apply(record)
+
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def state(self, job: str) -> JobState:
+        """
+        Last recorded state of the job, None if the job is not in the journal.
+        """
+
+        return self.jobs.get(job)
+
+    def checkpoint(self, job: str, routes: dict, cost: float, bound: float = None, fingerprint: str = None):
+        """
+        Record incumbent routes (and best known bound) of a running job.
+        """
+
+        self._append({
+            "job": job, "event": "checkpoint", "time": time.time(), "fingerprint": fingerprint,
+            "routes": routes, "cost": cost, "bound": bound,
+        })
+
+    def finish(self, job: str, status: str, routes: dict = None, cost: float = None, bound: float = None,
+               message: str = None):
+        """
+        Record completion of a job.
+
+        :param status: One of FINISHED_STATUSES
+        """
+
+        if status not in FINISHED_STATUSES:
+            raise ValueError(f"Unknown job status: {status}")
+
+        self._append({
+            "job": job, "event": status, "time": time.time(), "routes": routes, "cost": cost, "bound": bound,
+            "message": message,
+        })
+
+    def warm_start(self, job: str, network: Network) -> dict:
+        """
+        Last incumbent routes of the job, if they were recorded for the same
+        network and are still a valid solution of it.
+
+        :returns: Routes in CVRPModel.vehicle_routes format, None if there are none
+        """
+
+        from cvrp.validate import validate
+
+        state = self.jobs.get(job)
+
+        if state is None or state.routes is None or state.fingerprint != network_fingerprint(network):
+            return None
+
+        return state.routes if validate(network, state.routes).valid else None
+
+    def compact(self):
+        """
+        Rewrite the journal with one record per job (replacing the file at once).
+        """
+
+        temporary = self.path + ".tmp"
+
+        with open(temporary, "w", encoding="utf-8") as file:
+            for state in self.jobs.values():
+                file.write(json.dumps(state.record()) + "\n")
+
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary, self.path)
+
+
+class Checkpointer:
+    """
+    Checkpoint callable for solve_network and hybrid_genetic_search, writing
+    to the journal at most once in interval seconds (the latest values are
+    kept and written by the next call after the interval, or by flush).
+    """
+
+    def __init__(self, journal: Journal, job: str, fingerprint: str = None, interval: float = 30.0):
+        self.journal = journal
+        self.job = job
+        self.fingerprint = fingerprint
+        self.interval = interval
+        self.__pending = None
+        self.__written = -float("inf")
+
+    def __call__(self, routes: dict, cost: float, bound: float = None):
+        self.__pending = (routes, cost, bound)
+
+        if time.monotonic() - self.__written >= self.interval:
+            self.flush()
+
+    def flush(self):
+        if self.__pending is None:
+            return
+
+        routes, cost, bound = self.__pending
+        self.journal.checkpoint(self.job, routes, cost, bound, self.fingerprint)
+        self.__pending = None
+        self.__written = time.monotonic()
@@ -1,23 +1,45 @@
 from itertools import combinations
+from math import comb, isfinite
+from numpy import ndarray, zeros
 from pyomo.environ import *
 
 from cvrp.data import Network, Place
 
 
 class CVRPModel(ConcreteModel):
-    def __init__(self, network: Network, auto_init=True):
+    def __init__(self, network: Network, auto_init=True, subtours=True):
+        """
+        :param network: Network
+        :param auto_init: Build model components (see init_data)
+        :param subtours: Enumerate subtour elimination constraints of all client
+            subsets, otherwise they have to be added as cuts (see cuts.branch_and_cut)
+        """
+
         super(CVRPModel, self).__init__()
         self.network = network
+        self.subtours = subtours
 
         if auto_init:
             self.init_data()
 
-    def init_data(self):
+    def init_data(self, progress: callable = None):
+        """
+        Build model components.
+
+        :param progress: Called with fraction of the model built (constraints
+            take most of the time, subtour elimination is reported per subset size)
+        """
+
+        report = progress if progress is not None else lambda fraction: None
+
         self._init_sets()
         self._init_parameters()
+        report(0.05)
         self._init_variables()
-        self._init_constraints()
+        report(0.1)
+        self._init_constraints(lambda fraction: report(0.1 + 0.85 * fraction))
         self._init_objective()
+        report(1.0)
 
     def _init_sets(self):
         self.clients = Set(initialize=[p.slug_name for p in self.network.clients], doc="Clients")
@@ -56,6 +78,55 @@ class CVRPModel(ConcreteModel):
             doc="Travel costs matrix"
         )
 
+        if self.network.has_time_constraints:
+            self._init_time_parameters()
+
+    def _init_time_parameters(self):
+        places = self.network.all_places
+        slugs = [p.slug_name for p in places]
+        depot = self.network.depot
+        travel = self.network.travel_time_matrix()
+
+        # Service of every place starts before the horizon in any feasible solution
+        # scheduled as early as possible (even if returns are not limited)
+        horizon = min(depot.due_time, depot.ready_time + max(v.shift_length for v in self.network.vehicles))
+
+        if not isfinite(horizon):
+            horizon = max(p.ready_time for p in places) + sum(p.service_time for p in places) + \
+                travel.max(axis=1).sum()
+
+        self.s = Param(
+            self.places,
+            initialize={p.slug_name: p.service_time if p is not depot else 0.0 for p in places},
+            doc="Service times (depot has none)"
+        )
+
+        self.tt = Param(
+            self.places, self.places,
+            initialize={(a, b): travel[i, j] for i, a in enumerate(slugs) for j, b in enumerate(slugs)},
+            doc="Travel times matrix"
+        )
+
+        self.tw_start = Param(
+            self.places,
+            initialize={p.slug_name: p.ready_time for p in places},
+            doc="Earliest service starts (departure from depot)"
+        )
+
+        self.tw_end = Param(
+            self.places,
+            initialize={p.slug_name: min(p.due_time, horizon) if p is not depot else p.ready_time for p in places},
+            doc="Latest service starts (departure from depot)"
+        )
+
+        self.shift_end = Param(
+            self.vehicles,
+            initialize={
+                v.slug_name: min(depot.due_time, depot.ready_time + v.shift_length) for v in self.network.vehicles
+            },
+            doc="Latest return of vehicles to depot"
+        )
+
     def _init_variables(self):
         # noinspection PyUnresolvedReferences
         self.x = Var(
@@ -64,6 +135,13 @@ class CVRPModel(ConcreteModel):
             doc="1 if taken route from i-th to j-th place taken by k-th vehicle, 0 otherwise"
         )
 
+        if self.network.has_time_constraints:
+            self.t = Var(
+                self.places,
+                bounds=lambda m, i: (m.tw_start[i], m.tw_end[i]),
+                doc="Service start at i-th place (departure from depot)"
+            )
+
     def _init_objective(self):
         self.obj_total_cost = Objective(
             sense=minimize,
@@ -76,7 +154,7 @@ class CVRPModel(ConcreteModel):
             doc="Minimize total cost of routes taken by vehicles"
         )
 
-    def _init_constraints(self):
+    def _init_constraints(self, progress: callable = None):
         self.con_cl_vh_serve = ConstraintList(doc="Each client must be served by exactly one vehicle")
 
         for j in self.clients:
@@ -124,13 +202,29 @@ class CVRPModel(ConcreteModel):
                 ) <= self.q[k]
             )
 
-        clients_num = len(self.network.clients)
+        if self.network.has_time_constraints:
+            self._init_time_constraints()
+
+        self.con_cuts = ConstraintList(doc="Subtour elimination, capacity and comb cuts added by separation")
 
         self.con_subtours = ConstraintList(
             doc="Subtour elimination - ensures no cycles disconnected from depot"
         )
 
+        if not self.subtours:
+            return
+
+        clients_num = len(self.network.clients)
+
+        total = 2 ** clients_num
+        done = 1 + clients_num
+
         for r in range(2, clients_num + 1):
+            if progress is not None:
+                progress(done / total)
+
+            done += comb(clients_num, r)
+
             for s in combinations(self.clients, r):
                 self.con_subtours.add(
                     expr=sum(
@@ -141,11 +235,65 @@ class CVRPModel(ConcreteModel):
                     ) <= len(s) - 1
                 )
 
+    def _init_time_constraints(self):
+        """
+        Arrival time constraints with big-M coefficients as tight as time
+        windows allow (n^2 + n * vehicles constraints, instead of time
+        variables per vehicle).
+        """
+
+        _dpt = self.network.depot.slug_name
+
+        def big_m(i, j, end_j):
+            return max(0.0, self.tw_end[i] + self.s[i] + self.tt[i, j] - end_j)
+
+        self.con_arrival = ConstraintList(
+            doc="Service at j-th client starts after service at i-th place and travel, if j follows i"
+        )
+
+        for i in self.places:
+            for j in self.clients:
+                if j == i:
+                    continue
+
+                self.con_arrival.add(
+                    self.t[i] + self.s[i] + self.tt[i, j] - self.t[j] <=
+                    big_m(i, j, self.tw_start[j]) * (1 - sum(self.x[i, j, k] for k in self.vehicles))
+                )
+
+        self.con_shift = ConstraintList(
+            doc="Each vehicle must return to depot before the end of its shift"
+        )
+
+        for k in self.vehicles:
+            if not isfinite(self.shift_end[k]):
+                continue
+
+            for i in self.clients:
+                self.con_shift.add(
+                    self.t[i] + self.s[i] + self.tt[i, _dpt] - self.shift_end[k] <=
+                    big_m(i, _dpt, self.shift_end[k]) * (1 - self.x[i, _dpt, k])
+                )
+
+    def arc_values(self) -> ndarray:
+        """
+        Arc values summed over vehicles (places indexed as in Network.all_places).
+        """
+
+        index = {p.slug_name: i for i, p in enumerate(self.network.all_places)}
+        values = zeros((len(index), len(index)))
+
+        for (i, j, _), value in self.x.extract_values().items():
+            if value:
+                values[index[i], index[j]] += value
+
+        return values
+
     def vehicle_routes(self):
         # Get depot name
         _depot = self.network.depot.slug_name
 
-        raw_vars = [v for v in self.x if self.x[v].value > 0]
+        raw_vars = [v for v in self.x if self.x[v].value is not None and self.x[v].value > 0.5]
 
         vehicle_vars = {}
 
@@ -0,0 +1,249 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+
+from numpy import array, full, inf, ndarray, zeros, dtype as numpy_dtype
+
+from cvrp.data import Network
+from cvrp.exceptions import InsufficientVehiclesException
+from cvrp.heuristics import (
+    TimeWindows, local_search, nearest_neighbours, network_arrays, network_time_windows, ruin_and_recreate,
+    savings_routes, to_vehicle_routes, total_length
+)
+
+
+class SharedArrays:
+    """
+    NumPy arrays copied into shared memory blocks, so that worker processes
+    attach to them by name instead of receiving pickled copies.
+
+    Used as a context manager, blocks are released on exit.
+    """
+
+    def __init__(self, **arrays: ndarray):
+        self.blocks = []
+        self.specs = {}
+
+        for name, values in arrays.items():
+            block = SharedMemory(create=True, size=max(values.nbytes, 1))
+            self.blocks.append(block)
+            self.specs[name] = (block.name, values.shape, values.dtype.str)
+            ndarray(values.shape, values.dtype, buffer=block.buf)[...] = values
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_arrays(specs: dict) -> (dict, [SharedMemory]):
+    """
+    Attach to arrays of SharedArrays.specs (blocks must be kept referenced while arrays are used).
+
+    :returns: Tuple (dict of arrays, list of attached blocks)
+    """
+
+    arrays, blocks = {}, []
+
+    for name, (block_name, shape, dtype) in specs.items():
+        block = SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = ndarray(shape, numpy_dtype(dtype), buffer=block.buf)
+
+    return arrays, blocks
+
+
+def row_views(values: ndarray) -> [memoryview]:
+    """
+    Rows of a matrix (e.g. attached by attach_arrays) as memoryviews.
+
+    Heuristics index distances element by element, which is slow on arrays.
+    Rows are indexed like nested lists and return Python floats, but share
+    the memory of the array instead of copying it.
+    """
+
+    return [memoryview(row) for row in values]
+
+
+class _NoisyRow:
+    """
+    Row of distances scaled by noise factors of both places, computed on access.
+    """
+
+    def __init__(self, row, factor: float, factors: [float]):
+        self.row = row
+        self.factor = factor
+        self.factors = factors
+
+    def __getitem__(self, j: int) -> float:
+        return self.row[j] * self.factor * self.factors[j]
+
+
+# Worker process state set by _init_worker
+_worker = {}
+
+
+def _init_worker(specs: dict, lock):
+    arrays, blocks = attach_arrays(specs)
+
+    _worker.update(arrays)
+    _worker["blocks"] = blocks
+    _worker["demands"] = arrays["demands"].tolist()
+    _worker["capacities"] = arrays["capacities"].tolist()
+    _worker["lock"] = lock
+    _worker["dist_rows"] = row_views(arrays["dist"])
+    _worker["neighbours"] = arrays["neighbours"].tolist()
+
+    # Time windows are shared as arrays prefixed with "time_"
+    times = {name[5:]: values for name, values in arrays.items() if name.startswith("time_")}
+
+    if times:
+        times["travel"] = row_views(times["travel"])
+
+    _worker["times"] = TimeWindows(**times) if times else None
+
+
+def _publish_best(routes: [[int]], cost: float) -> ([[int]], float):
+    """
+    Exchange solution with the shared best one.
+
+    :returns: Shared best solution (routes, cost) after the exchange
+    """
+
+    best_cost, best_routes = _worker["best_cost"], _worker["best_routes"]
+    vehicles = len(routes)
+
+    with _worker["lock"]:
+        if cost < best_cost[0]:
+            best_cost[0] = cost
+            best_routes[:vehicles] = [len(route) for route in routes]
+            stops = [u for route in routes for u in route]
+            best_routes[vehicles:vehicles + len(stops)] = stops
+
+            return routes, cost
+
+        lengths = best_routes[:vehicles].tolist()
+        stops = best_routes[vehicles:].tolist()
+        shared_cost = float(best_cost[0])
+
+    shared, start = [], 0
+
+    for length in lengths:
+        shared.append(stops[start:start + length])
+        start += length
+
+    return shared, shared_cost
+
+
+def _trajectory(seed: int, iterations: int, share_every: int, deadline: float) -> (float, [[int]]):
+    """
+    Randomized savings construction, local search and ruin-and-recreate
+    iterations, exchanging the best solution with other workers.
+    """
+
+    rng = random.Random(seed)
+    demands, capacities = _worker["demands"], _worker["capacities"]
+    dist, neighbours, times = _worker["dist_rows"], _worker["neighbours"], _worker["times"]
+
+    # The first trajectory starts from plain savings, others from savings over
+    # distances scaled by random factors of both places (up to 20% together)
+    if seed == 0:
+        noisy = dist
+    else:
+        noise = random.Random(seed)
+        factors = [1.0 + 0.1 * noise.random() for _ in dist]
+        noisy = [_NoisyRow(row, factor, factors) for row, factor in zip(dist, factors)]
+
+    routes = savings_routes(noisy, demands, capacities, neighbours, times)
+    routes = local_search(dist, demands, capacities, routes, neighbours, times=times)
+    cost = total_length(dist, routes)
+    ruin_size = max(2, min(30, (len(dist) - 1) // 10))
+
+    for iteration in range(1, iterations + 1):
+        if time.time() > deadline:
+            break
+
+        try:
+            candidate = ruin_and_recreate(rng, dist, demands, capacities, routes, neighbours, ruin_size, times)
+        except InsufficientVehiclesException:
+            continue
+
+        candidate = local_search(dist, demands, capacities, candidate, neighbours, max_passes=5, times=times)
+        candidate_cost = total_length(dist, candidate)
+
+        if candidate_cost < cost - 1e-9:
+            routes, cost = candidate, candidate_cost
+
+        if iteration % share_every == 0:
+            routes, cost = _publish_best(routes, cost)
+
+    routes, cost = _publish_best(routes, cost)
+
+    return cost, routes
+
+
+def multi_start(network: Network, starts: int = None, workers: int = None, iterations: int = 200,
+                share_every: int = 20, time_limit: float = None) -> dict:
+    """
+    Parallel multi-start heuristic search.
+
+    Every start is an independent trajectory (randomized savings, local
+    search, ruin-and-recreate iterations) run in a process pool. Distance
+    matrix, demands and time windows are passed to workers through shared
+    memory (with candidate lists computed once), the best solution is kept
+    in shared memory too and workers
+    adopt it every share_every iterations if it is better than their own.
+
+    :param network: Network
+    :param starts: Number of trajectories (number of workers if None)
+    :param workers: Number of worker processes (all cores if None)
+    :param iterations: Ruin-and-recreate iterations of every trajectory
+    :param share_every: Iterations between exchanges of the best solution
+    :param time_limit: Seconds after which trajectories stop iterating
+    :returns: Routes in CVRPModel.vehicle_routes format (unused vehicles have empty routes)
+    """
+
+    network.check_solvability()
+
+    workers = workers or os.cpu_count() or 1
+    starts = starts or workers
+    deadline = time.time() + time_limit if time_limit is not None else inf
+
+    dist, demands, capacities = network_arrays(network)
+    times = network_time_windows(network, dist)
+    vehicles = len(capacities)
+
+    best_cost = full(1, inf)
+    best_routes = zeros(vehicles + len(dist) - 1, dtype=int)
+
+    context = get_context("spawn")
+    lock = context.Lock()
+
+    time_arrays = {f"time_{name}": values for name, values in times.arrays().items()} if times is not None else {}
+
+    with SharedArrays(
+            dist=dist, neighbours=array(nearest_neighbours(dist), dtype=int), demands=demands, capacities=capacities,
+            best_cost=best_cost, best_routes=best_routes, **time_arrays
+    ) as shared:
+        with ProcessPoolExecutor(
+                max_workers=min(workers, starts), mp_context=context,
+                initializer=_init_worker, initargs=(shared.specs, lock)
+        ) as executor:
+            results = list(executor.map(
+                _trajectory, range(starts), [iterations] * starts, [share_every] * starts, [deadline] * starts
+            ))
+
+    _, routes = min(results, key=lambda result: result[0])
+
+    return to_vehicle_routes(network, routes)
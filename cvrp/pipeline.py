@@ -0,0 +1,366 @@
+import os
+import re
+import signal
+import tempfile
+import threading
+from multiprocessing import get_context
+
+from cvrp.data import Network
+from cvrp.exceptions import CVRPException, ExcessVehiclesException, SolveCancelledException, SolverProcessException
+from cvrp.heuristics import (
+    from_vehicle_routes, local_search, nearest_neighbours, network_arrays, network_time_windows, savings_routes,
+    to_vehicle_routes, total_length
+)
+from cvrp.progress import CancellationToken, SolveProgress
+
+# Methods of solve: exact model (solve_network) or hybrid genetic search
+METHODS = ("mip", "hgs")
+
+# Progress lines of solver logs, as (pattern, group of incumbent, group of bound)
+LOG_PATTERNS = [
+    # GLPK: "+   321: mip =   4.163858273e+03 >=   3.202401779e+03  23.1% (12; 0)"
+    (re.compile(r"mip\s*=\s*(\S+)\s*>=\s*(\S+)"), 1, 2),
+    # CBC: "Cbc0010I After 100 nodes, 5 on tree, 1234 best solution, best possible 1000 (0.5 seconds)"
+    (re.compile(r"on tree, (\S+) best solution, best possible (\S+)"), 1, 2),
+    # HiGHS: " B   12   3   4  25.00%   1000   1234   18.96%   ..." (bound, incumbent, gap)
+    (re.compile(r"^\s*\w?\s+\d+\s+\d+\s+\d+\s+[\d.]+%\s+(\S+)\s+(\S+)\s+(?:\S+%|Large)"), 2, 1),
+]
+
+# Solve options writing solver log to a file (logfile of shell solvers by default),
+# in-process solvers hold the GIL, so the log has to be written by the solver itself
+SOLVER_LOG_OPTIONS = {
+    "appsi_highs": lambda path: {"options": {"log_file": path}},
+}
+
+
+def _to_number(text: str) -> float:
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+
+    return number if abs(number) != float("inf") else None
+
+
+def parse_log_line(line: str) -> (float, float):
+    """
+    Read incumbent and bound from a progress line of solver log.
+
+    :returns: Tuple (incumbent, bound), values not found (or infinite) are None,
+        None if line is not a progress line
+    """
+
+    for pattern, incumbent, bound in LOG_PATTERNS:
+        match = pattern.search(line)
+
+        if match:
+            return _to_number(match.group(incumbent)), _to_number(match.group(bound))
+
+    return None
+
+
+class Solution:
+    """
+    Result of solve_network, usable in place of a solved model in reports.
+
+    :ivar status: "optimal" if solved by MIP solver, "reduced" if solved by MIP
+        solver over a restricted network (see preprocess.reduce_network, no bound
+        is claimed), "cancelled" if solving was cancelled and the best solution
+        found so far is returned
+    :ivar result: Solver results (None if cancelled)
+    :ivar bound: Best known lower bound (None if unknown)
+    """
+
+    def __init__(self, network: Network, routes: dict, cost: float, status: str, result=None, bound: float = None):
+        self.network = network
+        self.routes = routes
+        self.cost = cost
+        self.status = status
+        self.result = result
+        self.bound = bound
+
+    def vehicle_routes(self) -> dict:
+        return self.routes
+
+    def obj_total_cost(self) -> float:
+        return self.cost
+
+
+def _solve_process(network: Network, solvers_tried: [str], log_path: str, connection, preprocess: bool = True,
+                   cuts: bool = True):
+    # Own process group, so that solver started by this process can be killed with it
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+
+    from cvrp.cuts import branch_and_cut
+    from cvrp.model import CVRPModel
+    from cvrp.preprocess import fix_infeasible_arcs, reduce_network
+    from cvrp.solver import get_solvers, solve_model
+
+    try:
+        reduction = reduce_network(network, merge=preprocess, drop_vehicles=preprocess)
+
+        # Every vehicle has to leave the depot in CVRPModel (heuristics leave extra vehicles unused)
+        if len(reduction.network.vehicles) > len(reduction.network.clients):
+            raise ExcessVehiclesException()
+
+        model = CVRPModel(reduction.network, auto_init=False, subtours=not cuts)
+        model.init_data(progress=lambda fraction: connection.send(("build", fraction)))
+
+        if preprocess:
+            fix_infeasible_arcs(model)
+
+        connection.send(("solve", reduction.restricted))
+
+        solver_name = get_solvers(solvers_tried)[0]
+        log_options = SOLVER_LOG_OPTIONS.get(solver_name, lambda path: {"logfile": path})
+
+        if cuts:
+            result = branch_and_cut(
+                model, [solver_name], progress=lambda bound: connection.send(("bound", bound)), **log_options(log_path)
+            )
+        else:
+            result = solve_model(model, [solver_name], **log_options(log_path))
+
+        routes = reduction.vehicle_routes(model.vehicle_routes())
+        connection.send(("done", (routes, model.obj_total_cost(), result)))
+    except (CVRPException, EnvironmentError, ValueError) as exc:
+        connection.send(("error", exc))
+
+
+def _terminate(process):
+    if not process.is_alive():
+        return
+
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            # Process group not created yet
+            process.terminate()
+    else:
+        process.terminate()
+
+    process.join()
+
+
+def heuristic_solution(network: Network, report: callable, token: CancellationToken, initial: dict = None,
+                       checkpoint: callable = None) -> (dict, float):
+    """
+    Savings construction and local search, reporting cost after every pass.
+
+    :param initial: Routes (in CVRPModel.vehicle_routes format) improved instead of savings construction
+    :param checkpoint: Called with (vehicle routes, cost, None) after every pass
+    :returns: Tuple (vehicle routes, cost)
+    """
+
+    dist, demands, capacities = network_arrays(network)
+    times = network_time_windows(network, dist)
+    neighbours = nearest_neighbours(dist)
+
+    if initial is not None:
+        routes = from_vehicle_routes(network, initial)
+    else:
+        routes = savings_routes(dist, demands, capacities, neighbours, times)
+
+    def on_pass(iteration, current):
+        token.raise_if_cancelled()
+        cost = total_length(dist, current)
+        report(SolveProgress("heuristic", iteration=iteration, incumbent=cost))
+
+        if checkpoint is not None:
+            checkpoint(to_vehicle_routes(network, current), cost, None)
+
+    routes = local_search(dist, demands, capacities, routes, neighbours, on_pass=on_pass, times=times)
+
+    return to_vehicle_routes(network, routes), total_length(dist, routes)
+
+
+def solve_network(network: Network, solvers_tried: [str] = None, progress: callable = None,
+                  token: CancellationToken = None, poll_interval: float = 0.2, preprocess: bool = True,
+                  initial_routes: dict = None, checkpoint: callable = None, cuts: bool = True) -> Solution:
+    """
+    Solve network with CVRPModel in a child process, keeping a heuristic incumbent.
+
+    While the child builds and solves the model, a heuristic solution is
+    computed here, then the solver log is followed for incumbent and bound.
+    Cancelling the token terminates the child (and the solver it started).
+
+    :param network: Network
+    :param solvers_tried: Solvers as in solve_model
+    :param progress: Called with SolveProgress on every change
+    :param token: Cancellation token
+    :param poll_interval: Seconds between checks of the child process
+    :param preprocess: Solve the network reduced by reduce_network, with
+        infeasible arcs fixed (routes are mapped back onto the network)
+    :param initial_routes: Valid routes (e.g. last checkpoint of an interrupted
+        solve) the heuristic incumbent starts from instead of savings construction
+    :param checkpoint: Called with (vehicle routes, cost, bound) whenever the
+        heuristic incumbent or the bound changes (see journal.Checkpointer)
+    :param cuts: Build the model without subtour elimination constraints and
+        solve it by separating cuts (see cuts.branch_and_cut), otherwise
+        constraints of all client subsets are enumerated
+    :returns: Optimal solution, or the best known one if cancelled
+    :raises SolveCancelledException: Cancelled before any solution was found
+    :raises ExcessVehiclesException: More vehicles than clients are left after preprocessing
+    """
+
+    network.check_solvability()
+
+    token = token if token is not None else CancellationToken()
+    report = progress if progress is not None else lambda state: None
+
+    log_fd, log_path = tempfile.mkstemp(prefix="cvrp-", suffix=".log")
+    os.close(log_fd)
+
+    context = get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_solve_process, args=(network, solvers_tried, log_path, sender, preprocess, cuts),
+                              daemon=True)
+    process.start()
+    sender.close()
+
+    best = None
+    solver_incumbent = None
+    bound = None
+    stage = "build"
+    restricted = False
+
+    def state(**values):
+        costs = [c for c in (best[1] if best else None, solver_incumbent) if c is not None]
+
+        return SolveProgress(stage, incumbent=min(costs) if costs else None, bound=bound, **values)
+
+    try:
+        try:
+            best = heuristic_solution(network, report, token, initial_routes, checkpoint)
+        except SolveCancelledException:
+            pass
+        except CVRPException:
+            # Heuristics may fail where the exact model does not
+            pass
+
+        with open(log_path, errors="replace") as log:
+            while not token.cancelled:
+                if receiver.poll(poll_interval):
+                    try:
+                        kind, payload = receiver.recv()
+                    except EOFError:
+                        raise SolverProcessException()
+
+                    if kind == "build":
+                        report(state(fraction=payload))
+                    elif kind == "solve":
+                        stage = "solve"
+                        restricted = payload
+                        report(state())
+                    elif kind == "bound":
+                        if not restricted:
+                            bound = max(bound, payload) if bound is not None else payload
+                            report(state())
+                    elif kind == "error":
+                        raise payload
+                    else:
+                        routes, cost, result = payload
+                        stage = "done"
+
+                        if restricted:
+                            report(SolveProgress(stage, fraction=1.0, incumbent=cost))
+
+                            return Solution(network, routes, cost, "reduced", result)
+
+                        report(SolveProgress(stage, fraction=1.0, incumbent=cost, bound=cost))
+
+                        return Solution(network, routes, cost, "optimal", result, bound=cost)
+                elif not process.is_alive():
+                    raise SolverProcessException()
+
+                changed = False
+
+                # Solves of branch-and-cut start the log over
+                if os.path.getsize(log_path) < log.tell():
+                    log.seek(0)
+
+                for line in log.readlines():
+                    values = parse_log_line(line)
+
+                    if values is None:
+                        continue
+
+                    line_incumbent, line_bound = values
+
+                    # Incumbents of branch-and-cut solves may violate cuts not added yet
+                    if line_incumbent is not None and not cuts:
+                        solver_incumbent, changed = line_incumbent, True
+
+                    # Bounds of earlier solves (with fewer cuts) stay valid, those of a restricted network do not
+                    if line_bound is not None and not restricted:
+                        bound, changed = max(bound, line_bound) if bound is not None and cuts else line_bound, True
+
+                if changed:
+                    report(state())
+
+                    if checkpoint is not None and best is not None:
+                        checkpoint(best[0], best[1], bound)
+
+        if best is None:
+            raise SolveCancelledException()
+
+        return Solution(network, best[0], best[1], "cancelled", bound=bound)
+    finally:
+        _terminate(process)
+        receiver.close()
+        os.remove(log_path)
+
+
+def solve(network: Network, method: str = "mip", solvers_tried: [str] = None, time_limit: float = None,
+          seed: int = None, progress: callable = None, token: CancellationToken = None, preprocess: bool = True,
+          initial_routes: dict = None, checkpoint: callable = None, cuts: bool = True) -> Solution:
+    """
+    Solve network with one of METHODS.
+
+    :param network: Network
+    :param method: "mip" for solve_network, "hgs" for hybrid_genetic_search
+    :param solvers_tried: Solvers as in solve_model (exact model only)
+    :param time_limit: Seconds of hybrid genetic search, or after which the
+        exact solve is cancelled and the best solution found so far is returned
+    :param seed: Random seed of hybrid genetic search
+    :param progress: Called with SolveProgress on every change
+    :param token: Cancellation token
+    :param preprocess: Reduce network before the exact model is built (see solve_network)
+    :param initial_routes: Valid routes to start from (see solve_network)
+    :param checkpoint: Called with (vehicle routes, cost, bound) (see solve_network)
+    :param cuts: Solve the exact model by separating cuts (see solve_network)
+    :returns: Solution, status "heuristic" for hybrid genetic search
+    """
+
+    if method == "hgs":
+        from cvrp.hgs import hybrid_genetic_search
+        from cvrp.validate import validate
+
+        routes = hybrid_genetic_search(
+            network, time_limit=time_limit, seed=seed, progress=progress, token=token, initial=initial_routes,
+            checkpoint=checkpoint
+        )
+
+        return Solution(network, routes, validate(network, routes).total_distance, "heuristic")
+
+    if method != "mip":
+        raise ValueError(f"Unknown method: {method}")
+
+    token = token if token is not None else CancellationToken()
+    timer = None
+
+    if time_limit is not None:
+        timer = threading.Timer(time_limit, token.cancel)
+        timer.daemon = True
+        timer.start()
+
+    try:
+        return solve_network(
+            network, solvers_tried, progress=progress, token=token, preprocess=preprocess,
+            initial_routes=initial_routes, checkpoint=checkpoint, cuts=cuts
+        )
+    finally:
+        if timer is not None:
+            timer.cancel()
@@ -0,0 +1,261 @@
+from typing import TYPE_CHECKING
+
+from cvrp.data import Network, Place
+from cvrp.feasibility import first_fit_decreasing
+
+if TYPE_CHECKING:
+    from cvrp.model import CVRPModel
+
+
+class Reduction:
+    """
+    Reduced network to be solved in place of the original one.
+
+    :ivar original: Network as given
+    :ivar network: Reduced network (unmerged clients and kept vehicles are
+        the same objects as in the original network)
+    :ivar members: Original clients of every client of the reduced network (by slug name)
+    :ivar dropped_vehicles: Vehicles of the original network left out of the reduced one
+    """
+
+    def __init__(self, original: Network, network: Network, members: dict, dropped_vehicles: list):
+        self.original = original
+        self.network = network
+        self.members = members
+        self.dropped_vehicles = dropped_vehicles
+
+    @property
+    def merged_clients(self) -> int:
+        """
+        Number of clients removed by merging.
+        """
+
+        return len(self.original.clients) - len(self.network.clients)
+
+    @property
+    def restricted(self) -> bool:
+        """
+        Reduced network differs from the original one, so its optimal solution
+        is not necessarily optimal (nor its bounds valid) for the original.
+        """
+
+        return self.merged_clients > 0 or len(self.dropped_vehicles) > 0
+
+    def vehicle_routes(self, vehicle_routes: dict) -> dict:
+        """
+        Map routes of the reduced network onto the original one.
+
+        Merged clients are expanded into consecutive stops at the same
+        coordinates, so costs do not change. Dropped vehicles get empty routes.
+
+        :param vehicle_routes: Routes in CVRPModel.vehicle_routes format
+        :returns: Routes in the same format over original places and vehicles
+        """
+
+        mapped = {}
+
+        for vehicle, arcs in vehicle_routes.items():
+            if not arcs:
+                mapped[vehicle] = []
+                continue
+
+            stops = [arcs[0][0]]
+
+            for _, place in arcs:
+                stops.extend(self.members.get(place, [place]))
+
+            mapped[vehicle] = list(zip(stops[:-1], stops[1:]))
+
+        for vehicle in self.dropped_vehicles:
+            mapped[vehicle.slug_name] = []
+
+        return mapped
+
+
+def _merged_place(places: [Place]) -> Place:
+    first = places[0]
+
+    return Place(
+        first.name, first.latitude, first.longitude,
+        demand=sum(p.demand for p in places),
+        service_time=sum(p.service_time for p in places),
+    )
+
+
+def merge_colocated(clients: [Place], capacity: float) -> [[Place]]:
+    """
+    Group clients at identical coordinates into merged clients.
+
+    Clients at the same coordinates are packed first-fit decreasing into
+    groups whose combined demand fits into capacity. Clients with time
+    windows are never merged (windows of consecutive services would change).
+
+    :param clients: Clients
+    :param capacity: Largest vehicle capacity
+    :returns: Groups of clients in order of their first member, single clients included
+    """
+
+    position = {id(c): i for i, c in enumerate(clients)}
+    colocated = {}
+    merged = []
+
+    for client in clients:
+        if client.has_time_window:
+            merged.append([client])
+        else:
+            colocated.setdefault((client.latitude, client.longitude), []).append(client)
+
+    for group in colocated.values():
+        bins, loads = [], []
+
+        for client in sorted(group, key=lambda c: -c.demand):
+            for b, load in enumerate(loads):
+                if load + client.demand <= capacity + 1e-9:
+                    bins[b].append(client)
+                    loads[b] += client.demand
+                    break
+            else:
+                bins.append([client])
+                loads.append(client.demand)
+
+        merged.extend(sorted(b, key=lambda c: position[id(c)]) for b in bins)
+
+    merged.sort(key=lambda group: position[id(group[0])])
+
+    return merged
+
+
+def needed_vehicles(network: Network) -> list:
+    """
+    Vehicles enough to carry all client demands.
+
+    The largest vehicles are kept, as many as first-fit decreasing packing of
+    demands uses (it fills vehicles sorted by decreasing capacity, so these
+    are exactly the vehicles it packed into). Every vehicle has to leave the
+    depot in CVRPModel, so any further vehicle only forces an extra route.
+    If packing fails, the largest vehicles are kept, one per client at most
+    (no solution uses more routes). Vehicles with limited shifts are all
+    kept, packing does not account for time.
+
+    :param network: Network
+    :returns: Vehicles to keep, in their original order
+    """
+
+    vehicles = network.vehicles
+
+    if network.has_time_constraints:
+        return list(vehicles)
+
+    used = first_fit_decreasing(network.client_demands, network.vehicle_capacities)
+
+    if used is None:
+        used = len(network.clients)
+
+    by_capacity = sorted(range(len(vehicles)), key=lambda k: -vehicles[k].max_capacity)
+    kept = set(by_capacity[:used])
+
+    return [v for k, v in enumerate(vehicles) if k in kept]
+
+
+def reduce_network(network: Network, merge: bool = True, drop_vehicles: bool = True) -> Reduction:
+    """
+    Preprocess network before the model is built.
+
+    Note that both reductions restrict the problem: merged clients are served
+    by one vehicle, and a fleet used in full by CVRPModel is made smaller.
+    Clients are not merged if merged demands do not pack into the fleet.
+
+    :param network: Network
+    :param merge: Merge clients at identical coordinates (see merge_colocated)
+    :param drop_vehicles: Leave out vehicles not needed by packing (see needed_vehicles)
+    :returns: Reduction with the reduced network
+    """
+
+    reduced = Network()
+    reduced.depot = network.depot
+    reduced.speed = network.speed
+    members = {}
+
+    groups = [[client] for client in network.clients]
+
+    if merge and network.clients and network.vehicles:
+        merged = merge_colocated(network.clients, network.vehicle_capacities.max())
+        demands = [sum(c.demand for c in group) for group in merged]
+
+        # Merged demands may not pack into the fleet even if the original ones do
+        if first_fit_decreasing(demands, network.vehicle_capacities) is not None:
+            groups = merged
+
+    clients = []
+
+    for group in groups:
+        if len(group) == 1:
+            clients.append(group[0])
+        else:
+            place = _merged_place(group)
+            members[place.slug_name] = [c.slug_name for c in group]
+            clients.append(place)
+
+    reduced.add_clients(clients)
+
+    reduced.add_vehicles(network.vehicles)
+    dropped = []
+
+    if drop_vehicles and reduced.clients and reduced.vehicles:
+        kept = {id(v) for v in needed_vehicles(reduced)}
+        dropped = [v for v in network.vehicles if id(v) not in kept]
+
+        for vehicle in dropped:
+            reduced.remove_vehicle(vehicle)
+
+    return Reduction(network, reduced, members, dropped)
+
+
+def infeasible_arcs(network: Network) -> [(str, str, str)]:
+    """
+    Arcs which no vehicle can take in a capacity-feasible solution.
+
+    Arc (i, j) can not be taken by vehicle k if demands of i and j together
+    exceed its capacity, and no arc to or from client j can be taken by a
+    vehicle too small for j alone (which fixes clients fitting into only
+    some vehicles to those vehicles). Loops (i, i) are never taken.
+
+    :param network: Network
+    :returns: List of (from slug, to slug, vehicle slug)
+    """
+
+    depot = network.depot.slug_name
+    clients = [(c.slug_name, c.demand) for c in network.clients]
+    arcs = []
+
+    for vehicle in network.vehicles:
+        k, capacity = vehicle.slug_name, vehicle.max_capacity + 1e-9
+        arcs.append((depot, depot, k))
+
+        for i, d_i in clients:
+            if d_i > capacity:
+                arcs.append((depot, i, k))
+                arcs.append((i, depot, k))
+
+            for j, d_j in clients:
+                if i == j or d_i + d_j > capacity:
+                    arcs.append((i, j, k))
+
+    return arcs
+
+
+def fix_infeasible_arcs(model: "CVRPModel") -> int:
+    """
+    Fix variables of infeasible arcs (see infeasible_arcs) to 0, so that
+    solvers get them as constants.
+
+    :param model: Model with variables built
+    :returns: Number of fixed variables
+    """
+
+    arcs = infeasible_arcs(model.network)
+
+    for arc in arcs:
+        model.x[arc].fix(0)
+
+    return len(arcs)
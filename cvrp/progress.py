@@ -0,0 +1,60 @@
+from threading import Event
+
+from cvrp.exceptions import SolveCancelledException
+
+
+class CancellationToken:
+    """
+    Thread-safe flag telling long running operations to stop.
+    """
+
+    def __init__(self):
+        self.__event = Event()
+
+    def cancel(self):
+        self.__event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.__event.is_set()
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise SolveCancelledException()
+
+
+class SolveProgress:
+    """
+    Snapshot of solve pipeline state passed to progress callbacks.
+
+    :ivar stage: "build", "heuristic", "solve" or "done"
+    :ivar fraction: Completed fraction of the stage (None if unknown)
+    :ivar incumbent: Cost of the best solution found so far
+    :ivar bound: Best known lower bound
+    :ivar iteration: Heuristic iteration (local search pass)
+    """
+
+    def __init__(self, stage: str, fraction: float = None, incumbent: float = None, bound: float = None,
+                 iteration: int = None):
+        self.stage = stage
+        self.fraction = fraction
+        self.incumbent = incumbent
+        self.bound = bound
+        self.iteration = iteration
+
+    @property
+    def gap(self) -> float:
+        """
+        Relative gap between incumbent and bound (None if either is unknown).
+        """
+
+        if self.incumbent is None or self.bound is None or self.incumbent == 0:
+            return None
+
+        return max(0.0, (self.incumbent - self.bound) / abs(self.incumbent))
+
+    def __repr__(self):
+        return (
+            f"SolveProgress(stage={self.stage!r}, fraction={self.fraction}, incumbent={self.incumbent}, "
+            f"bound={self.bound}, gap={self.gap}, iteration={self.iteration})"
+        )
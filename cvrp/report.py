@@ -1,208 +1,505 @@
 import base64
 import io
+import os
 from datetime import datetime
 
-import matplotlib.pyplot as plt
+from typing import TYPE_CHECKING
 
-from pyhtml import *
+from numpy import (
+    arange, argsort, column_stack, empty, maximum, minimum, repeat, stack, take_along_axis, triu_indices, unique
+)
 
-from pyomo.opt.results import SolverResults, check_optimal_termination
+from pyhtml import *
 
-from cvrp.model import CVRPModel
-from cvrp.solver import get_solvers
 from cvrp.data import Place
 
+# matplotlib and Pyomo are imported where they are used (matplotlib alone
+# takes most of the package import time), annotations only need their types
+if TYPE_CHECKING:
+    from pyomo.opt.results import SolverResults
+    from cvrp.model import CVRPModel
 
-def generate_network_vis(network, routes):
-    plt.figure(figsize=(8, 8))
-    plt.axis("off")
 
-    # Draw edges
-    for p_a in network.all_places:
-        for p_b in network.all_places:
-            if p_a == p_b:
-                continue
+# Networks up to this size get all background edges drawn in "auto" mode
+ALL_EDGES_LIMIT = 50
+
+
+def network_edge_segments(network, edges: str = "auto", k_nearest: int = 5):
+    """
+    Background edges of the network map as line segments.
+
+    :param network: Network to draw
+    :param edges: "all" for every pair of places, "nearest" for k-nearest
+        neighbours of each place, "none" for no edges, "auto" picks "all" for
+        small networks and "nearest" otherwise
+    :param k_nearest: Number of neighbours per place in "nearest" mode
+    :returns: Array of shape (n_edges, 2, 2) with (lon, lat) segment ends
+    """
+
+    lon, lat = network.longitudes, network.latitudes
+    points = column_stack((lon, lat))
+    n = len(points)
+
+    if edges == "auto":
+        edges = "all" if n <= ALL_EDGES_LIMIT else "nearest"
+
+    if edges == "none" or n < 2:
+        return empty((0, 2, 2))
+
+    if edges == "all":
+        i, j = triu_indices(n, k=1)
+    elif edges == "nearest":
+        k = min(k_nearest, n - 1)
+        _, found = network.spatial_index.query(lat, lon, k + 1)
+
+        # Every place finds itself (or a place at the same coordinates) among
+        # its neighbours, itself is moved last and left out
+        itself = found == arange(n)[:, None]
+        nearest = take_along_axis(found, argsort(itself, axis=1, kind="stable"), axis=1)[:, :k]
+        i = repeat(arange(n), k)
+        j = nearest.ravel()
+
+        # Each undirected edge is drawn once
+        i, j = minimum(i, j), maximum(i, j)
+        i, j = unique(column_stack((i, j)), axis=0).T
+    else:
+        raise ValueError(f"Unknown edges mode: {edges}")
+
+    return stack((points[i], points[j]), axis=1)
+
+
+def generate_network_vis(network, routes, edges: str = "auto", k_nearest: int = 5, fmt: str = "png"):
+    """
+    Render network map with selected routes.
+
+    Figure is drawn with Agg canvas directly (without pyplot global state),
+    so no figures are kept in memory between reports.
 
-            lon = [p_a.longitude, p_b.longitude]
-            lat = [p_a.latitude, p_b.latitude]
+    :param network: Network to draw
+    :param routes: Vehicle routes as returned by CVRPModel.vehicle_routes
+    :param edges: Background edges mode (see network_edge_segments)
+    :param k_nearest: Number of neighbours per place in "nearest" edges mode
+    :param fmt: Image format ("png" or "svg")
+    :returns: Rendered image as bytes
+    """
 
-            plt.plot(lon, lat, color="grey", linewidth=0.5, alpha=0.33)
+    from matplotlib import rcParams
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import LineCollection
+    from matplotlib.figure import Figure
+    from matplotlib.lines import Line2D
+
+    fig = Figure(figsize=(8, 8))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.axis("off")
+
+    # Draw edges
+    segments = network_edge_segments(network, edges, k_nearest)
+
+    if len(segments):
+        ax.add_collection(LineCollection(segments, colors="grey", linewidths=0.5, alpha=0.33))
 
     # Draw selected routes
-    for vehicle_slug, route in routes.items():
-        vehicle = network.get_vehicle(vehicle_slug)
+    places = {p.slug_name: p for p in network.all_places}
+    vehicles = {v.slug_name: v for v in network.vehicles}
+    colors = rcParams["axes.prop_cycle"].by_key()["color"]
 
-        lon = [network.depot.longitude]
-        lat = [network.depot.latitude]
+    route_lines, route_colors, handles = [], [], []
+
+    for n, (vehicle_slug, route) in enumerate(routes.items()):
+        color = colors[n % len(colors)]
+
+        line = [(network.depot.longitude, network.depot.latitude)]
 
         for src_slug, dest_slug in route:
-            dest = network.get_place(dest_slug)
-            lon += [dest.longitude]
-            lat += [dest.latitude]
+            dest = places[dest_slug]
+            line.append((dest.longitude, dest.latitude))
 
-        plt.plot(lon, lat, label=vehicle.name)
+        route_lines.append(line)
+        route_colors.append(color)
+        handles.append(Line2D([], [], color=color, label=vehicles[vehicle_slug].name))
 
-    # Draw place vertices
-    longitudes = [place.longitude for place in network.all_places]
-    latitudes = [place.latitude for place in network.all_places]
+    if route_lines:
+        ax.add_collection(LineCollection(route_lines, colors=route_colors))
+        ax.legend(handles=handles)
 
-    plt.scatter(longitudes, latitudes, color="yellow")
+    # Draw place vertices
+    ax.scatter(network.longitudes, network.latitudes, color="yellow")
 
     for place in network.all_places:
-        plt.annotate(place.name, (place.longitude, place.latitude))
+        ax.annotate(place.name, (place.longitude, place.latitude))
+
+    ax.autoscale_view()
 
     # Save figure to bytes stream
     io_bytes = io.BytesIO()
-    plt.savefig(io_bytes, format="png")
-    io_bytes.seek(0)
+    fig.savefig(io_bytes, format=fmt)
+    fig.clear()
+
+    return io_bytes.getvalue()
 
+
+def encode_network_vis(image: bytes) -> str:
     # Encode as base64 image
-    return "data:image/png;base64," + base64.b64encode(io_bytes.read()).decode("utf-8").replace("\n", "")
+    return "data:image/png;base64," + base64.b64encode(image).decode("utf-8").replace("\n", "")
 
 
-# noinspection PyUnresolvedReferences
-def generate_report(model: CVRPModel, result: SolverResults):
+STYLE = (
+    "table, th, td { border: 1px solid black; border-collapse: collapse; }" +
+    "section { margin-left: 2em; }"
+)
 
-    # noinspection PyUnresolvedReferences
-    def place_rows(ctx):
-        depot = ctx.get("network").depot
-        demand_sum = 0
+# Number of vehicle routes on a single page of a written report
+VEHICLES_PER_PAGE = 100
 
-        for i, place in enumerate(ctx.get("network").all_places):
-            h = "E" if place.longitude > 0 else "W"
-            v = "N" if place.latitude > 0 else "S"
 
-            demand_sum += place.demand
+# noinspection PyUnresolvedReferences
+def place_rows(ctx):
+    depot = ctx.get("network").depot
+    demand_sum = 0
 
-            yield tr(
-                td(strong(place.name) if place is depot else place.name),
-                td("-" if place is depot else place.demand),
-                td(f"{abs(place.longitude):.2f} {h}, {abs(place.latitude):.2f} {v}")
-            )
+    for i, place in enumerate(ctx.get("network").all_places):
+        h = "E" if place.longitude > 0 else "W"
+        v = "N" if place.latitude > 0 else "S"
+
+        demand_sum += place.demand
 
         yield tr(
-            td(strong("TOTAL")),
-            td(f"{demand_sum:.2f}"),
-            td("-")
+            td(strong(place.name) if place is depot else place.name),
+            td("-" if place is depot else place.demand),
+            td(f"{abs(place.longitude):.2f} {h}, {abs(place.latitude):.2f} {v}")
         )
 
-    # noinspection PyUnresolvedReferences
-    def vehicle_rows(ctx):
-        max_cap_sum = 0
+    yield tr(
+        td(strong("TOTAL")),
+        td(f"{demand_sum:.2f}"),
+        td("-")
+    )
 
-        for i, vehicle in enumerate(ctx.get("network").vehicles):
-            max_cap_sum += vehicle.max_capacity
 
-            yield tr(
-                td(vehicle.name),
-                td(vehicle.max_capacity),
-            )
+# noinspection PyUnresolvedReferences
+def vehicle_rows(ctx):
+    max_cap_sum = 0
+
+    for i, vehicle in enumerate(ctx.get("network").vehicles):
+        max_cap_sum += vehicle.max_capacity
 
         yield tr(
-            td(strong("TOTAL")),
-            td(f"{max_cap_sum:.2f}")
+            td(vehicle.name),
+            td(vehicle.max_capacity),
         )
 
-    # noinspection PyUnresolvedReferences
-    def route_vehicles(ctx):
-        network = ctx.get("network")
-        routes = ctx.get("routes")
+    yield tr(
+        td(strong("TOTAL")),
+        td(f"{max_cap_sum:.2f}")
+    )
+
+
+# noinspection PyUnresolvedReferences
+def route_vehicles(ctx):
+    network = ctx.get("network")
+    routes = ctx.get("routes")
+    places = {p.slug_name: p for p in network.all_places}
+
+    for vehicle in ctx.get("vehicles", network.vehicles):
+        place_names = ["Departure from depot"]
+        vehicle_distance = 0
 
-        for vehicle in network.vehicles:
-            place_names = ["Departure from depot"]
-            vehicle_distance = 0
+        for vehicle_route in routes[vehicle.slug_name]:
+            place_from = places[vehicle_route[0]]
+            place_dest = places[vehicle_route[1]]
 
-            for vehicle_route in routes[vehicle.slug_name]:
-                place_from = network.get_place(vehicle_route[0])
-                place_dest = network.get_place(vehicle_route[1])
+            route_name = place_dest.name
 
-                route_name = place_dest.name
+            if place_dest is network.depot:
+                route_name = "Return to depot"
 
-                if place_dest is network.depot:
-                    route_name = "Return to depot"
+            distance = Place.distance(place_from, place_dest)
+            vehicle_distance += distance
 
-                distance = Place.distance(place_from, place_dest)
-                vehicle_distance += distance
+            place_names.append(f"{route_name} (+ {distance:.2f} km)")
+
+        yield div(
+            h2(f"{vehicle.name} ({vehicle_distance:.2f} km)"),
+            ol(*[li(name) for name in place_names]),
+        )
 
-                place_names.append(f"{route_name} (+ {distance:.2f} km)")
 
-            yield div(
-                h2(f"{vehicle.name} ({vehicle_distance:.2f} km)"),
-                ol(*[li(name) for name in place_names]),
+def input_section():
+    return section(
+        h2("Input Data"),
+        div(
+            h3("Places"),
+            table(
+                thead(td("Name"), td("Demand"), td("Geo Position")),
+                tbody(place_rows)
+            )
+        ),
+        div(
+            h3("Vehicles"),
+            table(
+                thead(td("Name"), td("Max Capacity")),
+                tbody(vehicle_rows)
             )
+        ),
+    )
+
+
+def solver_info(result: "SolverResults", *keys: str, default=None):
+    """
+    First defined value of solver information (solvers fill different fields).
+    """
 
-    body_sections = [
-        section(
-            h2("Input Data"),
-            div(
-                h3("Places"),
-                table(
-                    thead(td("Name"), td("Demand"), td("Geo Position")),
-                    tbody(place_rows)
-                )
-            ),
-            div(
-                h3("Vehicles"),
-                table(
-                    thead(td("Name"), td("Max Capacity")),
-                    tbody(vehicle_rows)
-                )
-            ),
+    for key in keys:
+        try:
+            value = getattr(result.solver, key)
+        except AttributeError:
+            continue
+
+        if isinstance(value, (str, int, float)):
+            return value
+
+    return default
+
+
+def solver_section(result: "SolverResults", status: str = "cancelled"):
+    from cvrp.solver import get_solvers
+
+    if result is None:
+        if status != "cancelled":
+            return section(h2("Solver"), p("Solution has been found by heuristics."))
+
+        return section(
+            h2("Solver"),
+            p("Solving has been cancelled, the best solution found so far is shown."),
         )
-    ]
 
-    if check_optimal_termination(result):
+    return section(
+        h2("Solver"),
+        div(table(tbody(
+            tr(td(strong("Used Solver:")), td(solver_info(result, "name") or get_solvers()[0])),
+            tr(td(strong("Solve Time:")), td(solver_info(result, "time", "wallclock_time", default="-"))),
+            tr(td(strong("Status:")), td(str(result.solver.status))),
+            tr(td(strong("Termination Condition:")), td(str(result.solver.termination_condition))),
+            tr(td(strong("Return Code:")), td(str(solver_info(result, "return_code", default="-")))),
+            tr(td(strong("Message:")), td(str(solver_info(result, "message", default="-")))),
+        ))),
+        h2("Problem"),
+        div(table(tbody(*[
+            tr(td(p(strong(k + ":")), td(v.value)))
+            for k, v in result.problem[0].items()
+        ])))
+    )
+
+
+def cost_summary(cost: float, lower_bound: float = None):
+    """
+    Total distance of the solution, with lower bound and gap if the bound is known.
+    """
+
+    rows = [p(strong("Total Distance Covered: "), span(f"{cost:.2f} km"))]
+
+    if lower_bound is not None:
+        gap = (cost - lower_bound) / cost if cost > 0 else 0.0
+
+        rows.append(p(strong("Lower Bound: "), span(f"{lower_bound:.2f} km")))
+        rows.append(p(strong("Gap: "), span(f"{max(gap, 0.0):.2%}")))
+
+    return div(*rows)
+
+
+def _lower_bound(model, lower_bound: float = None) -> float:
+    if lower_bound is not None:
+        return lower_bound
+
+    # Set by column_generation and lower_bound (cvrp.bound), pipeline solutions have bound
+    for key in ("lower_bound", "bound"):
+        value = getattr(model, key, None)
+
+        if isinstance(value, (int, float)):
+            return value
+
+    return None
+
+
+def report_page(page_title: str, heading: str, *body_sections):
+    return html(
+        head(
+            title(f"Route Planning - {page_title}"),
+            style(STYLE),
+        ),
+        body(
+            header(h1(heading)),
+            *body_sections,
+            footer(hr, f"Generated: {datetime.now()}"),
+        ),
+    )
+
+
+# noinspection PyUnresolvedReferences
+def generate_report(model: "CVRPModel", result: "SolverResults", lower_bound: float = None):
+    """
+    Build report as HTML text.
+
+    :param model: Solved model (or pipeline Solution)
+    :param result: Solver results, None if solution was not found by solver
+    :param lower_bound: Lower bound on total distance shown next to it (bound
+        or lower_bound attribute of the model is used if None)
+    """
+
+    from pyomo.opt.results import check_optimal_termination
+
+    body_sections = [input_section()]
+
+    if result is None or check_optimal_termination(result):
         body_sections.append(
             section(
                 h2("Selected Routes"),
                 div(route_vehicles),
-                p(strong("Total Distance Covered: "), span(f"{model.obj_total_cost():.2f} km"))
+                cost_summary(model.obj_total_cost(), _lower_bound(model, lower_bound))
             )
         )
 
         body_sections.append(
             section(
                 h2("Visualization"),
-                lambda ctx: img(src=generate_network_vis(ctx.get("network"), ctx.get("routes")))
+                lambda ctx: img(src=encode_network_vis(generate_network_vis(ctx.get("network"), ctx.get("routes"))))
             )
         )
 
-    body_sections.append(
-        section(
-            h2("Solver"),
-            div(table(tbody(
-                tr(td(strong("Used Solver:")), td(get_solvers()[0])),
-                tr(td(strong("Solve Time:")), td(result.solver.time)),
-                tr(td(strong("Status:")), td(str(result.solver.status))),
-                tr(td(strong("Termination Condition:")), td(str(result.solver.termination_condition))),
-                tr(td(strong("Return Code:")), td(str(result.solver.return_code))),
-                tr(td(strong("Message:")), td(str(result.solver.message))),
-            ))),
-            h2("Problem"),
-            div(table(tbody(*[
-                tr(td(p(strong(k + ":")), td(v.value)))
-                for k, v in result.problem[0].items()
-            ])))
-        )
-    )
+    body_sections.append(solver_section(result, getattr(model, "status", "cancelled")))
 
-    template = html(
-        head(
-            title("Route Planning - Report"),
-            style(
-                "table, th, td { border: 1px solid black; border-collapse: collapse; }" +
-                "section { margin-left: 2em; }"
-            ),
-        ),
-        body(
-            header(h1("Route Planning Report")),
-            *body_sections,
-            footer(hr, f"Generated: {datetime.now()}"),
-        ),
-    )
+    template = report_page("Report", "Route Planning Report", *body_sections)
 
     return template.render(
         network=model.network,
         routes=model.vehicle_routes(),
         result=result
     )
+
+
+class _FileStream(io.StringIO):
+    """
+    Adapter letting pyhtml render directly into a text file.
+
+    pyhtml only writes text (instead of UTF-8 bytes) to StringIO instances,
+    so this is a StringIO passing everything through to the file.
+    """
+
+    def __init__(self, file):
+        super().__init__()
+        self.file = file
+
+    def write(self, value: str) -> int:
+        return self.file.write(value)
+
+    def getvalue(self) -> str:
+        return ""
+
+
+def write_html(path: str, template, **context):
+    with open(path, "w", encoding="utf-8") as file:
+        template.render(_out=_FileStream(file), **context)
+
+
+# noinspection PyUnresolvedReferences
+def write_report(model: "CVRPModel", result: "SolverResults", path: str,
+                 vehicles_per_page: int = VEHICLES_PER_PAGE, map_format: str = "png", lower_bound: float = None,
+                 **vis_options):
+    """
+    Write report into a set of files without building it in memory.
+
+    Table rows are rendered by generators directly into the file, vehicle
+    routes are split into pages of at most vehicles_per_page vehicles and
+    the map is saved as a separate image next to the report.
+
+    :param model: Solved model (or pipeline Solution)
+    :param result: Solver results, None if solving has been cancelled (routes
+        of the model are then the best known solution)
+    :param path: Path of the main report file, other files are placed in the same directory
+    :param vehicles_per_page: Number of vehicle routes per route page
+    :param map_format: Map image format ("png" or "svg")
+    :param lower_bound: Lower bound on total distance (as in generate_report)
+    :param vis_options: Extra options passed to generate_network_vis
+    :returns: List of paths of all written files (main report first)
+    """
+
+    from pyomo.opt.results import check_optimal_termination
+
+    directory, file_name = os.path.split(os.path.abspath(path))
+    stem, _ = os.path.splitext(file_name)
+
+    network = model.network
+    written = [os.path.join(directory, file_name)]
+    body_sections = [input_section()]
+
+    if result is None or check_optimal_termination(result):
+        routes = model.vehicle_routes()
+
+        vehicles = network.vehicles
+        pages = [vehicles[i:i + vehicles_per_page] for i in range(0, len(vehicles), vehicles_per_page)]
+        page_names = [f"{stem}-routes-{n + 1}.html" for n in range(len(pages))]
+
+        for n, page_vehicles in enumerate(pages):
+            links = [a(href=file_name)("Back to report")]
+
+            if n > 0:
+                links.append(a(href=page_names[n - 1])("Previous page"))
+
+            if n < len(pages) - 1:
+                links.append(a(href=page_names[n + 1])("Next page"))
+
+            page_path = os.path.join(directory, page_names[n])
+
+            write_html(
+                page_path,
+                report_page(
+                    f"Routes ({n + 1} of {len(pages)})",
+                    f"Selected Routes ({n + 1} of {len(pages)})",
+                    nav(*links),
+                    div(route_vehicles)
+                ),
+                network=network,
+                routes=routes,
+                vehicles=page_vehicles
+            )
+
+            written.append(page_path)
+
+        map_name = f"{stem}-map.{map_format}"
+        map_path = os.path.join(directory, map_name)
+
+        with open(map_path, "wb") as file:
+            file.write(generate_network_vis(network, routes, fmt=map_format, **vis_options))
+
+        written.append(map_path)
+
+        body_sections.append(
+            section(
+                h2("Selected Routes"),
+                ul(*[
+                    li(a(href=name)(f"Vehicles {vs[0].name} - {vs[-1].name}"))
+                    for vs, name in zip(pages, page_names)
+                ]),
+                cost_summary(model.obj_total_cost(), _lower_bound(model, lower_bound))
+            )
+        )
+
+        body_sections.append(
+            section(
+                h2("Visualization"),
+                img(src=map_name)
+            )
+        )
+
+    body_sections.append(solver_section(result, getattr(model, "status", "cancelled")))
+
+    write_html(
+        written[0],
+        report_page("Report", "Route Planning Report", *body_sections),
+        network=network,
+        result=result
+    )
+
+    return written
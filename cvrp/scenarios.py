@@ -0,0 +1,202 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+from numpy import array, array_equal
+
+from cvrp.data import Network, Place, Vehicle
+from cvrp.exceptions import CVRPException
+from cvrp.heuristics import (
+    local_search, nearest_neighbours, network_time_windows, savings_routes, to_vehicle_routes, total_length
+)
+from cvrp.multistart import SharedArrays, attach_arrays, row_views
+
+
+def clone_network(network: Network) -> Network:
+    """
+    Copy of the network with its own places and vehicles, so that the copy
+    can be changed without changing the network.
+    """
+
+    def copy_place(place: Place) -> Place:
+        return Place(
+            place.name, place.latitude, place.longitude, place.demand, place.service_time, place.ready_time,
+            place.due_time
+        )
+
+    clone = Network()
+    clone.speed = network.speed
+    clone.depot = copy_place(network.depot)
+    clone.add_clients([copy_place(c) for c in network.clients])
+    clone.add_vehicles([Vehicle(v.name, v.max_capacity, v.shift_length) for v in network.vehicles])
+
+    return clone
+
+
+class Scenario:
+    """
+    Named variant of a network, with the result of its last solve.
+
+    :ivar routes: Routes in CVRPModel.vehicle_routes format (None if not solved or failed)
+    :ivar cost: Total distance of routes
+    :ivar routes_used: Number of vehicles with non-empty routes
+    :ivar solve_time: Seconds of solving in the worker
+    :ivar error: Message of the exception which made the solve fail
+    """
+
+    def __init__(self, name: str, network: Network):
+        self.name = name
+        self.network = network
+        self.routes = None
+        self.cost = None
+        self.routes_used = None
+        self.solve_time = None
+        self.error = None
+
+    @property
+    def solved(self) -> bool:
+        return self.routes is not None
+
+    def copy_result(self, other: "Scenario"):
+        """
+        Take the result of the last solve from another scenario.
+        """
+
+        self.routes = other.routes
+        self.cost = other.cost
+        self.routes_used = other.routes_used
+        self.solve_time = other.solve_time
+        self.error = other.error
+
+
+def extra_vehicle_scenario(network: Network, capacity: float = None) -> Scenario:
+    """
+    Variant with one more vehicle (as large as the largest one by default).
+    """
+
+    variant = clone_network(network)
+    capacity = capacity if capacity is not None else max((v.max_capacity for v in network.vehicles), default=1.0)
+    names = {v.name for v in variant.vehicles}
+    number = 1
+
+    while f"Extra vehicle {number}" in names:
+        number += 1
+
+    variant.add_vehicle(Vehicle(f"Extra vehicle {number}", capacity))
+
+    return Scenario(f"Add vehicle ({capacity:g})", variant)
+
+
+def scaled_demand_scenario(network: Network, client: Place, factor: float) -> Scenario:
+    """
+    Variant with demand of a client (of the network) multiplied by factor.
+    """
+
+    variant = clone_network(network)
+    position = network.clients.index(client)
+    variant.clients[position].demand = client.demand * factor
+
+    return Scenario(f"{client.name}: demand x{factor:g}", variant)
+
+
+# Worker process state set by _init_worker
+_worker = {}
+
+
+def _init_worker(specs: dict):
+    arrays, blocks = attach_arrays(specs)
+    _worker["blocks"] = blocks
+    _worker["dist"] = arrays["dist"]
+    _worker["dist_rows"] = row_views(arrays["dist"])
+    _worker["neighbours"] = arrays["neighbours"].tolist()
+
+
+def _solve_scenario(network: Network, shared: bool) -> (dict, float, float, str):
+    """
+    Savings construction and local search of a scenario network.
+
+    :param shared: Places have the coordinates of the shared distance matrix
+    :returns: Tuple (vehicle routes, cost, solve time, error message), routes are None on failure
+    """
+
+    start = time.perf_counter()
+
+    try:
+        network.check_solvability()
+
+        if shared:
+            dist = _worker["dist"]
+            dist_list, neighbours = _worker["dist_rows"], _worker["neighbours"]
+        else:
+            dist = network.distance_matrix()
+            dist_list, neighbours = row_views(dist), nearest_neighbours(dist)
+
+        demands = [0.0] + [c.demand for c in network.clients]
+        capacities = network.vehicle_capacities
+        times = network_time_windows(network, dist)
+
+        routes = savings_routes(dist_list, demands, capacities, neighbours, times)
+        routes = local_search(dist_list, demands, capacities, routes, neighbours, times=times)
+    except CVRPException as exc:
+        return None, None, time.perf_counter() - start, exc.message
+
+    return to_vehicle_routes(network, routes), total_length(dist_list, routes), time.perf_counter() - start, None
+
+
+def solve_scenarios(network: Network, scenarios: [Scenario], workers: int = None, progress: callable = None):
+    """
+    Solve scenarios concurrently in a process pool (savings construction and
+    local search, see solve_heuristic).
+
+    The distance matrix of the network and its candidate lists are computed
+    once and passed to workers through shared memory, scenarios whose places have the same
+    coordinates as the network (changed demands or vehicles) use it, others
+    compute their own. Results are stored in the scenarios, a solve failing
+    with any exception (also in the pool itself) is stored as scenario error.
+
+    :param network: Base network
+    :param scenarios: Scenarios to solve
+    :param workers: Number of worker processes (all cores if None)
+    :param progress: Called with every scenario when its solve is finished
+    """
+
+    if not scenarios:
+        return
+
+    workers = min(workers or os.cpu_count() or 1, len(scenarios))
+    lat, lon = network.latitudes, network.longitudes
+
+    def same_places(scenario: Scenario) -> bool:
+        return array_equal(scenario.network.latitudes, lat) and array_equal(scenario.network.longitudes, lon)
+
+    shared_flags = [same_places(scenario) for scenario in scenarios]
+    dist = network.distance_matrix() if any(shared_flags) else array([[0.0]])
+    neighbours = array(nearest_neighbours(dist), dtype=int) if any(shared_flags) else array([[0]])
+
+    context = get_context("spawn")
+
+    with SharedArrays(dist=dist, neighbours=neighbours) as shared:
+        with ProcessPoolExecutor(
+                max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(shared.specs,)
+        ) as executor:
+            futures = {
+                executor.submit(_solve_scenario, scenario.network, flag): scenario
+                for scenario, flag in zip(scenarios, shared_flags)
+            }
+
+            for future in as_completed(futures):
+                scenario = futures[future]
+
+                try:
+                    scenario.routes, scenario.cost, scenario.solve_time, scenario.error = future.result()
+                except Exception as exc:
+                    scenario.routes, scenario.cost, scenario.solve_time = None, None, None
+                    scenario.error = f"{type(exc).__name__}: {exc}"
+
+                scenario.routes_used = (
+                    sum(1 for route in scenario.routes.values() if route) if scenario.routes is not None else None
+                )
+
+                if progress is not None:
+                    progress(scenario)
@@ -0,0 +1,422 @@
+import asyncio
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+
+from cvrp.exceptions import CVRPException, SolveCancelledException
+from cvrp.journal import network_fingerprint
+from cvrp.pipeline import METHODS, solve
+from cvrp.progress import CancellationToken, SolveProgress
+from cvrp.storage import network_from_json, routes_json
+
+# Local HTTP/JSON service around solve (one request per connection):
+#
+#   POST /jobs            {"network": <network as written by export_json>,
+#                          "method": "mip" or "hgs", "time_limit": seconds, "seed": int}
+#                         -> 202 and the job, or 200 and an identical job submitted before
+#   GET /jobs/<id>        -> job (status, latest progress, result or error)
+#   GET /jobs/<id>/events -> job events as JSON lines, streamed until the job ends
+#   DELETE /jobs/<id>     -> cancel job (a running job ends with its best solution so far)
+#   GET /health           -> state of the worker pool and queue
+#
+# Requests for the same network (by fingerprint) with the same options share
+# one job, unless it failed or was cancelled.
+
+JOB_STATUSES = ("queued", "running", "done", "failed", "cancelled")
+
+FINISHED_JOB_STATUSES = ("done", "failed", "cancelled")
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _progress_json(state: SolveProgress) -> dict:
+    return {
+        "stage": state.stage, "fraction": state.fraction, "incumbent": state.incumbent, "bound": state.bound,
+        "gap": state.gap, "iteration": state.iteration,
+    }
+
+
+class Job:
+    """
+    Solve job of the service.
+
+    :ivar status: One of JOB_STATUSES
+    :ivar progress: Latest progress (None before the first report)
+    :ivar result: Solution status, cost, bound and routes of a finished job
+    :ivar events: Events of the job so far (status changes and progress)
+    """
+
+    def __init__(self, job_id: str, key: str, network, method: str, time_limit: float, seed: int):
+        self.id = job_id
+        self.key = key
+        self.network = network
+        self.method = method
+        self.time_limit = time_limit
+        self.seed = seed
+        self.token = CancellationToken()
+        self.status = "queued"
+        self.progress = None
+        self.result = None
+        self.error = None
+        self.events = [{"event": "status", "status": self.status}]
+        self.__changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_JOB_STATUSES
+
+    def json(self) -> dict:
+        return {
+            "id": self.id, "status": self.status, "method": self.method, "time_limit": self.time_limit,
+            "seed": self.seed, "progress": self.progress, "result": self.result, "error": self.error,
+        }
+
+    def __publish(self, event: dict):
+        self.events.append(event)
+
+        # Waiting streams hold the previous event, a new one is made for the next change
+        self.__changed.set()
+        self.__changed = asyncio.Event()
+
+    def report(self, state: SolveProgress):
+        self.progress = _progress_json(state)
+        self.__publish(dict(event="progress", **self.progress))
+
+    def set_status(self, status: str, result: dict = None, error: str = None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.__publish({"event": "status", "status": status, "result": result, "error": error})
+
+    async def events_from(self, position: int) -> [dict]:
+        """
+        Events after position, waiting for the next one if there are none yet.
+
+        :returns: New events, empty if the job finished and all events have been seen
+        """
+
+        while True:
+            changed = self.__changed
+
+            if len(self.events) > position:
+                return self.events[position:]
+
+            if self.finished:
+                return []
+
+            await changed.wait()
+
+
+class SolveService:
+    """
+    Queue of solve jobs with a bounded pool of workers, served over HTTP.
+
+    Solvers are probed once on start instead of on every solve. Every job
+    gets at most time_budget seconds (requests may ask for less).
+
+    :param workers: Number of jobs solved at the same time
+    :param time_budget: Maximum seconds of a job (None for unlimited)
+    :param max_queue: Maximum number of queued jobs, further requests are refused
+    :param max_jobs: Number of jobs kept (finished jobs are forgotten oldest first)
+    :param solvers_tried: Solvers as in solve_model
+    :param max_body: Maximum size of request bodies in bytes
+    """
+
+    def __init__(self, workers: int = 2, time_budget: float = 300.0, max_queue: int = 100, max_jobs: int = 1000,
+                 solvers_tried: [str] = None, max_body: int = 64 * 1024 * 1024):
+        self.workers = workers
+        self.time_budget = time_budget
+        self.max_queue = max_queue
+        self.max_jobs = max_jobs
+        self.solvers_tried = solvers_tried
+        self.max_body = max_body
+        self.solvers = None
+        self.jobs = {}
+        self.__by_key = {}
+        self.__counter = 0
+        self.__queue = None
+        self.__tasks = []
+        self.__server = None
+        self.__executor = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> (str, int):
+        """
+        Probe solvers, start workers and listen for requests.
+
+        :param port: Port to listen on (0 for any free port)
+        :returns: Tuple (host, port) listened on
+        """
+
+        from cvrp.solver import get_solvers
+
+        loop = asyncio.get_event_loop()
+        self.__executor = ThreadPoolExecutor(max_workers=self.workers)
+
+        try:
+            self.solvers = await loop.run_in_executor(self.__executor, get_solvers, self.solvers_tried)
+        except EnvironmentError:
+            # Hybrid genetic search works without solvers
+            self.solvers = None
+
+        self.__queue = asyncio.Queue(self.max_queue)
+        self.__tasks = [asyncio.ensure_future(self.__work()) for _ in range(self.workers)]
+        self.__server = await asyncio.start_server(self.__handle, host, port)
+
+        return self.__server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        await self.__server.serve_forever()
+
+    async def close(self):
+        """
+        Stop listening, cancel all unfinished jobs and stop workers.
+        """
+
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+
+        for job in self.jobs.values():
+            job.token.cancel()
+
+        for task in self.__tasks:
+            task.cancel()
+
+        await asyncio.gather(*self.__tasks, return_exceptions=True)
+
+        if self.__executor is not None:
+            await asyncio.get_event_loop().run_in_executor(None, partial(self.__executor.shutdown, wait=True))
+
+    def submit(self, data: dict) -> (Job, bool):
+        """
+        Queue a job for request data (see POST /jobs).
+
+        :returns: Tuple (job, True if a new job was queued)
+        :raises ValueError: Invalid request data
+        """
+
+        if not isinstance(data, dict) or "network" not in data:
+            raise ValueError("Request has no network")
+
+        network = network_from_json(data["network"])
+        method = data.get("method", "mip")
+
+        if method not in METHODS:
+            raise ValueError(f"Unknown method: {method}")
+
+        time_limit = data.get("time_limit")
+        time_limit = float(time_limit) if time_limit is not None else None
+
+        if self.time_budget is not None:
+            time_limit = min(time_limit, self.time_budget) if time_limit is not None else self.time_budget
+
+        seed = data.get("seed")
+        seed = int(seed) if seed is not None else None
+
+        options = json.dumps([network_fingerprint(network), method, time_limit, seed])
+        key = hashlib.sha1(options.encode("utf-8")).hexdigest()
+        existing = self.__by_key.get(key)
+
+        if existing is not None and existing.status not in ("failed", "cancelled"):
+            return existing, False
+
+        if self.__queue.full():
+            raise _HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Job queue is full")
+
+        self.__counter += 1
+        job = Job(f"{self.__counter}-{key[:12]}", key, network, method, time_limit, seed)
+        self.jobs[job.id] = job
+        self.__by_key[key] = job
+        self.__queue.put_nowait(job)
+        self.__forget_finished()
+
+        return job, True
+
+    def cancel(self, job: Job):
+        job.token.cancel()
+
+        # Running jobs end in their worker
+        if job.status == "queued":
+            job.set_status("cancelled")
+
+    def __forget_finished(self):
+        finished = [job for job in self.jobs.values() if job.finished]
+
+        for job in finished[:max(0, len(self.jobs) - self.max_jobs)]:
+            del self.jobs[job.id]
+
+            if self.__by_key.get(job.key) is job:
+                del self.__by_key[job.key]
+
+    async def __work(self):
+        loop = asyncio.get_event_loop()
+
+        while True:
+            job = await self.__queue.get()
+
+            if job.finished:
+                continue
+
+            job.set_status("running")
+
+            def progress(state, job=job):
+                loop.call_soon_threadsafe(job.report, state)
+
+            run = partial(
+                solve, job.network, job.method, self.solvers, time_limit=job.time_limit, seed=job.seed,
+                progress=progress, token=job.token
+            )
+
+            try:
+                if job.method == "mip" and self.solvers is None:
+                    raise EnvironmentError("No solvers available")
+
+                solution = await loop.run_in_executor(self.__executor, run)
+                result = {
+                    "status": solution.status, "cost": solution.cost, "bound": solution.bound,
+                    "routes": routes_json(solution.vehicle_routes()),
+                }
+            except SolveCancelledException:
+                job.set_status("cancelled")
+            except CVRPException as exc:
+                job.set_status("failed", error=exc.message)
+            except (EnvironmentError, ValueError) as exc:
+                job.set_status("failed", error=str(exc))
+            except Exception as exc:
+                # Any other error fails the job only, the worker keeps taking jobs
+                job.set_status("failed", error=f"{type(exc).__name__}: {exc}")
+            else:
+                job.set_status("done", result=result)
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            method, path, body = await self.__read_request(reader)
+            parts = [part for part in path.split("?")[0].split("/") if part]
+
+            if parts[:1] == ["jobs"] and len(parts) == 3 and parts[2] == "events" and method == "GET":
+                await self.__stream(writer, self.__job(parts[1]))
+            else:
+                status, data = self.__route(method, parts, body)
+                await self.__respond(writer, status, data)
+        except _HTTPError as exc:
+            await self.__respond(writer, exc.status, {"error": exc.message})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def __read_request(self, reader: asyncio.StreamReader) -> (str, str, bytes):
+        try:
+            method, path, _ = (await reader.readline()).decode("latin-1").split()
+        except ValueError:
+            raise _HTTPError(HTTPStatus.BAD_REQUEST, "Invalid request line")
+
+        length = 0
+
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+
+            if not line:
+                break
+
+            name, _, value = line.partition(":")
+
+            if name.strip().lower() == "content-length":
+                try:
+                    length = int(value)
+                except ValueError:
+                    raise _HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+
+        if length > self.max_body:
+            raise _HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too large")
+
+        return method.upper(), path, await reader.readexactly(length) if length else b""
+
+    def __job(self, job_id: str) -> Job:
+        job = self.jobs.get(job_id)
+
+        if job is None:
+            raise _HTTPError(HTTPStatus.NOT_FOUND, f"Unknown job: {job_id}")
+
+        return job
+
+    def __route(self, method: str, parts: [str], body: bytes) -> (int, dict):
+        if parts == ["health"] and method == "GET":
+            return HTTPStatus.OK, {
+                "workers": self.workers,
+                "queued": self.__queue.qsize(),
+                "running": sum(job.status == "running" for job in self.jobs.values()),
+                "jobs": len(self.jobs),
+                "solvers": self.solvers,
+            }
+
+        if parts == ["jobs"] and method == "POST":
+            try:
+                job, created = self.submit(json.loads(body.decode("utf-8")))
+            except ValueError as exc:
+                raise _HTTPError(HTTPStatus.BAD_REQUEST, str(exc))
+
+            return HTTPStatus.ACCEPTED if created else HTTPStatus.OK, job.json()
+
+        if parts[:1] == ["jobs"] and len(parts) == 2:
+            job = self.__job(parts[1])
+
+            if method == "GET":
+                return HTTPStatus.OK, job.json()
+
+            if method == "DELETE":
+                self.cancel(job)
+
+                return HTTPStatus.OK, job.json()
+
+            raise _HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"Method not allowed: {method}")
+
+        raise _HTTPError(HTTPStatus.NOT_FOUND, f"Not found: /{'/'.join(parts)}")
+
+    @staticmethod
+    async def __respond(writer: asyncio.StreamWriter, status: int, data: dict):
+        body = json.dumps(data).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {int(status)} {HTTPStatus(status).phrase}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+            .encode("latin-1") + body
+        )
+        await writer.drain()
+
+    @staticmethod
+    async def __stream(writer: asyncio.StreamWriter, job: Job):
+        # No Content-Length, the stream ends when the connection is closed
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+        position = 0
+
+        while True:
+            events = await job.events_from(position)
+
+            if not events:
+                break
+
+            position += len(events)
+            writer.write(b"".join(json.dumps(event).encode("utf-8") + b"\n" for event in events))
+            await writer.drain()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8080, **options):
+    """
+    Run SolveService until cancelled (options as in SolveService).
+    """
+
+    service = SolveService(**options)
+    host, port = await service.start(host, port)
+    print(f"Listening on http://{host}:{port}", flush=True)
+
+    try:
+        await service.serve_forever()
+    finally:
+        await service.close()
@@ -1,12 +1,25 @@
-from pyomo.opt import check_available_solvers, SolverFactory
+import time
+from typing import TYPE_CHECKING
+
+import pyomo.environ  # registers solver plugins used by SolverFactory
+import pyutilib.subprocess.GlobalData
+from pyomo.opt import check_available_solvers, check_optimal_termination, SolverFactory
 
 from cvrp.exceptions import CVRPException
-from cvrp.model import CVRPModel, check_optimal_termination
+
+if TYPE_CHECKING:
+    from cvrp.model import CVRPModel
+
+# Pyomo multithreading error fix
+pyutilib.subprocess.GlobalData.DEFINE_SIGNAL_HANDLERS_DEFAULT = False
+
+# Solvers tried when none are given, in order of preference
+DEFAULT_SOLVERS = ["gurobi", "cplex", "appsi_highs", "glpk"]
 
 
 def get_solvers(solvers_tried: [str] = None):
     if not solvers_tried:
-        solvers_tried = ["gurobi", "cplex", "glpk"]
+        solvers_tried = DEFAULT_SOLVERS
 
     available_solvers = check_available_solvers(*solvers_tried)
 
@@ -16,12 +29,25 @@ def get_solvers(solvers_tried: [str] = None):
     return available_solvers
 
 
-def solve_model(model: CVRPModel, solvers_tried: [str] = None):
+def solve_model(model: "CVRPModel", solvers_tried: [str] = None, **solve_options):
     available_solvers = get_solvers(solvers_tried)
     solver = SolverFactory(available_solvers[0])
-    result = solver.solve(model)
+
+    start = time.perf_counter()
+    # Solutions are loaded only after termination is checked, APPSI solvers
+    # raise RuntimeError when loading a solution of an infeasible model
+    result = solver.solve(model, load_solutions=False, **solve_options)
 
     if not check_optimal_termination(result):
         raise CVRPException()
 
+    model.solutions.load_from(result)
+
+    # In-process solvers do not fill solver name and time in results
+    if not isinstance(result.solver.name, str):
+        result.solver.name = available_solvers[0]
+
+    if not isinstance(result.solver.wallclock_time, (int, float)):
+        result.solver.wallclock_time = time.perf_counter() - start
+
     return result
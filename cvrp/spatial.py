@@ -0,0 +1,350 @@
+from math import ceil, log2
+
+from numpy import (
+    arange, arcsin, argmax, argpartition, asarray, atleast_1d, bincount, broadcast_to, concatenate, cos, cumsum,
+    deg2rad, delete, einsum, empty, full, inf, int64, maximum, minimum, ndarray, ones, pi, repeat, sin, sqrt, stack,
+    unique, zeros
+)
+
+from cvrp.geo import EARTH_RADIUS
+
+# Points are kept as 3D coordinates on the unit sphere, where the straight
+# line (chord) distance grows monotonically with the geographic distance, so
+# an ordinary k-d tree with bounding boxes answers geographic queries.
+#
+# The tree is static, points added (or moved) later are kept in a buffer
+# scanned by brute force and removed points are only masked out. The tree is
+# rebuilt once the buffer or the number of removed points grows too large.
+
+
+def to_unit_sphere(lat, lon) -> ndarray:
+    """
+    Coordinates of points on the unit sphere.
+
+    :returns: Array of shape (n, 3)
+    """
+
+    fi, lm = deg2rad(asarray(lat, dtype=float)), deg2rad(asarray(lon, dtype=float))
+
+    return stack([cos(fi) * cos(lm), cos(fi) * sin(lm), sin(fi)], axis=-1)
+
+
+def _to_chord(distance) -> ndarray:
+    angle = minimum(asarray(distance, dtype=float) / EARTH_RADIUS, pi)
+
+    return 2.0 * sin(angle * 0.5)
+
+
+def _to_distance(chord) -> ndarray:
+    return 2.0 * EARTH_RADIUS * arcsin(minimum(chord * 0.5, 1.0))
+
+
+def _groups(keys: ndarray, size: int) -> ndarray:
+    """
+    Offsets of groups of sorted keys 0..size - 1.
+    """
+
+    offsets = zeros(size + 1, dtype=int64)
+    cumsum(bincount(keys, minlength=size), out=offsets[1:])
+
+    return offsets
+
+
+def _by_query_and_distance(queries: ndarray, chords: ndarray) -> ndarray:
+    """
+    Order of candidates by query, then by distance (chords are at most 2).
+    """
+
+    return (queries * 4.0 + chords).argsort()
+
+
+class SpatialIndex:
+    """
+    Index of geographic points for nearest neighbour and radius queries.
+
+    Points are addressed by position, which behaves as in a list: appended
+    points go to the end and deleting a point moves the following ones back.
+    Queries are batched, their cost grows with log of the number of points.
+    """
+
+    def __init__(self, lat=(), lon=(), leaf_size: int = 16):
+        """
+        :param lat: Latitudes of points
+        :param lon: Longitudes of points
+        :param leaf_size: Approximate number of points in tree leaves
+        """
+
+        if leaf_size < 2:
+            raise ValueError("Leaf size must be at least 2")
+
+        self.__leaf_size = leaf_size
+        self.__coords = to_unit_sphere(lat, lon).reshape(-1, 3)
+        self.__id_of = arange(len(self.__coords))
+        self.__build()
+
+    def __len__(self) -> int:
+        return len(self.__id_of)
+
+    def __build(self):
+        """
+        Build the tree over all current points (compacting ids to positions).
+        """
+
+        coords = self.__coords[self.__id_of]
+        m = len(coords)
+
+        self.__coords = coords
+        self.__id_of = arange(m)
+        self.__position_of = arange(m)
+        self.__tree_size = m
+        self.__depth = max(0, ceil(log2(m / self.__leaf_size))) if m else 0
+
+        leaves = 2 ** self.__depth
+        order = arange(m)
+        split_axis = zeros(leaves, dtype=int64)
+        split_value = full(leaves, inf)
+        bounds = [0, m]
+
+        for level in range(self.__depth):
+            next_bounds = [0]
+
+            for i in range(2 ** level):
+                a, b = bounds[i], bounds[i + 1]
+                mid = (a + b) // 2
+                node = 2 ** level + i
+
+                if b - a > 1:
+                    segment = coords[order[a:b]]
+                    axis = int(argmax(segment.max(axis=0) - segment.min(axis=0)))
+                    order[a:b] = order[a:b][argpartition(segment[:, axis], mid - a)]
+                    split_axis[node] = axis
+                    split_value[node] = coords[order[mid], axis]
+
+                next_bounds.extend([mid, b])
+
+            bounds = next_bounds
+
+        # Leaves hold ceil or floor of m / leaves points, all of them non-empty if m > 0
+        self.__order = order
+        self.__leaf_bounds = asarray(bounds, dtype=int64)
+        self.__split_axis = split_axis
+        self.__split_value = split_value
+
+        lo = full((2 * leaves, 3), inf)
+        hi = full((2 * leaves, 3), -inf)
+
+        if m:
+            ordered = coords[order]
+            lo[leaves:] = minimum.reduceat(ordered, self.__leaf_bounds[:-1], axis=0)
+            hi[leaves:] = maximum.reduceat(ordered, self.__leaf_bounds[:-1], axis=0)
+
+        for level in reversed(range(self.__depth)):
+            nodes = arange(2 ** level, 2 ** (level + 1))
+            lo[nodes] = minimum(lo[2 * nodes], lo[2 * nodes + 1])
+            hi[nodes] = maximum(hi[2 * nodes], hi[2 * nodes + 1])
+
+        self.__lo, self.__hi = lo, hi
+
+    def __rebuild_if_needed(self, queries: int = 1):
+        buffered = len(self.__coords) - self.__tree_size
+        removed = len(self.__coords) - len(self)
+
+        # Buffered points are compared with every query
+        if buffered > 64 + self.__tree_size // 8 or buffered * queries > 2 ** 22 or removed > len(self):
+            self.__build()
+
+    def append(self, lat, lon):
+        """
+        Add points to the end.
+        """
+
+        coords = to_unit_sphere(lat, lon).reshape(-1, 3)
+        ids = arange(len(self.__coords), len(self.__coords) + len(coords))
+
+        self.__coords = concatenate([self.__coords, coords])
+        self.__position_of = concatenate([self.__position_of, arange(len(self), len(self) + len(coords))])
+        self.__id_of = concatenate([self.__id_of, ids])
+        self.__rebuild_if_needed()
+
+    def delete(self, positions):
+        """
+        Remove points at positions, following points move back.
+        """
+
+        positions = unique(atleast_1d(asarray(positions, dtype=int64)))
+
+        if len(positions) and (positions[0] < 0 or positions[-1] >= len(self)):
+            raise IndexError("Position out of range")
+
+        self.__position_of[self.__id_of[positions]] = -1
+        self.__id_of = delete(self.__id_of, positions)
+        self.__position_of[self.__id_of] = arange(len(self.__id_of))
+        self.__rebuild_if_needed()
+
+    def move(self, position: int, lat: float, lon: float):
+        """
+        Change coordinates of a point.
+        """
+
+        if not 0 <= position < len(self):
+            raise IndexError("Position out of range")
+
+        new_id = len(self.__coords)
+
+        self.__coords = concatenate([self.__coords, to_unit_sphere(lat, lon).reshape(1, 3)])
+        self.__position_of[self.__id_of[position]] = -1
+        self.__position_of = concatenate([self.__position_of, [position]])
+        self.__id_of[position] = new_id
+        self.__rebuild_if_needed()
+
+    def __leaves_in_range(self, points: ndarray, chords: ndarray) -> (ndarray, ndarray):
+        """
+        Tree points in leaves whose boxes intersect query balls.
+
+        :returns: Tuple (query of every candidate, id of every candidate), ordered by query
+        """
+
+        queries = arange(len(points))
+        nodes = ones(len(points), dtype=int64)
+
+        for level in range(self.__depth + 1):
+            p = points[queries]
+            gap = maximum(self.__lo[nodes] - p, 0.0) + maximum(p - self.__hi[nodes], 0.0)
+            keep = (gap * gap).sum(axis=1) <= chords[queries] ** 2
+            queries, nodes = queries[keep], nodes[keep]
+
+            if level < self.__depth:
+                queries = repeat(queries, 2)
+                nodes = stack([2 * nodes, 2 * nodes + 1], axis=1).ravel()
+
+        leaves = nodes - 2 ** self.__depth
+
+        return self.__leaf_points(queries, self.__leaf_bounds[leaves], self.__leaf_bounds[leaves + 1])
+
+    def __leaf_points(self, queries: ndarray, starts: ndarray, ends: ndarray) -> (ndarray, ndarray):
+        counts = ends - starts
+        slots = arange(int(counts.sum())) + repeat(starts - (cumsum(counts) - counts), counts)
+
+        return repeat(queries, counts), self.__order[slots]
+
+    def __candidates(self, points: ndarray, queries: ndarray, ids: ndarray) -> (ndarray, ndarray, ndarray):
+        """
+        Add buffered points to candidates, drop removed ones, compute chord distances.
+        """
+
+        buffered = arange(self.__tree_size, len(self.__coords))
+
+        if len(buffered):
+            queries = concatenate([queries, repeat(arange(len(points)), len(buffered))])
+            ids = concatenate([ids, broadcast_to(buffered, (len(points), len(buffered))).ravel()])
+
+        alive = self.__position_of[ids] >= 0
+        queries, ids = queries[alive], ids[alive]
+        difference = points[queries] - self.__coords[ids]
+
+        return queries, ids, sqrt(einsum("ij,ij->i", difference, difference))
+
+    def __sorted_within(self, points: ndarray, chords: ndarray) -> (ndarray, ndarray, ndarray):
+        queries, ids = self.__leaves_in_range(points, chords)
+        queries, ids, found = self.__candidates(points, queries, ids)
+
+        within = found <= chords[queries]
+        queries, ids, found = queries[within], ids[within], found[within]
+        order = _by_query_and_distance(queries, found)
+
+        return queries[order], ids[order], found[order]
+
+    def __points(self, lat, lon) -> ndarray:
+        points = to_unit_sphere(atleast_1d(lat), atleast_1d(lon)).reshape(-1, 3)
+        self.__rebuild_if_needed(len(points))
+
+        return points
+
+    def query_radius(self, lat, lon, radius, return_distance: bool = False):
+        """
+        Points within radius of every query point.
+
+        :param lat: Latitudes of query points
+        :param lon: Longitudes of query points
+        :param radius: Radius in km (single value or one for every query point)
+        :param return_distance: Return distances too
+        :returns: List of position arrays (sorted by distance) for every query
+            point, tuple (positions, distances) if return_distance
+        """
+
+        points = self.__points(lat, lon)
+        chords = _to_chord(broadcast_to(radius, (len(points),)))
+
+        queries, ids, found = self.__sorted_within(points, chords)
+        offsets = _groups(queries, len(points))
+        positions = self.__position_of[ids]
+        distances = _to_distance(found)
+
+        result = [positions[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+
+        if return_distance:
+            return result, [distances[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+
+        return result
+
+    def query(self, lat, lon, k: int = 1) -> (ndarray, ndarray):
+        """
+        Nearest points of every query point.
+
+        :param lat: Latitudes of query points
+        :param lon: Longitudes of query points
+        :param k: Number of neighbours (all points if there are fewer)
+        :returns: Tuple (distances in km, positions), both of shape (queries, k)
+            and sorted by distance
+        """
+
+        points = self.__points(lat, lon)
+        k = min(k, len(self))
+
+        if k <= 0:
+            return empty((len(points), 0)), empty((len(points), 0), dtype=int64)
+
+        chords = self.__initial_radius(points, k)
+        queries, ids, found = self.__sorted_within(points, chords * (1.0 + 1e-9) + 1e-12)
+
+        offsets = _groups(queries, len(points))
+        slots = (offsets[:-1, None] + arange(k)[None, :]).ravel()
+
+        return _to_distance(found[slots]).reshape(-1, k), self.__position_of[ids[slots]].reshape(-1, k)
+
+    def __initial_radius(self, points: ndarray, k: int) -> ndarray:
+        """
+        Upper bounds of distances to k-th nearest points (chord distances).
+
+        Every query point descends to the deepest tree node holding at least
+        k points, the k-th nearest of them (and of buffered points) bounds
+        the distance to the k-th nearest point of the whole index.
+        """
+
+        nodes = ones(len(points), dtype=int64)
+        level = 0
+
+        while level < self.__depth and self.__tree_size // 2 ** (level + 1) >= k:
+            axis = self.__split_axis[nodes]
+            right = points[arange(len(points)), axis] >= self.__split_value[nodes]
+            nodes = 2 * nodes + right
+            level += 1
+
+        # Leaves under the node are consecutive
+        span = 2 ** (self.__depth - level)
+        first_leaves = nodes * span - 2 ** self.__depth
+        queries, ids = self.__leaf_points(
+            arange(len(points)), self.__leaf_bounds[first_leaves], self.__leaf_bounds[first_leaves + span]
+        )
+        queries, ids, found = self.__candidates(points, queries, ids)
+
+        order = _by_query_and_distance(queries, found)
+        queries, found = queries[order], found[order]
+        offsets = _groups(queries, len(points))
+
+        # Removed points may leave fewer than k candidates, then any point will do
+        chords = full(len(points), 2.0)
+        enough = offsets[1:] - offsets[:-1] >= k
+        chords[enough] = found[offsets[:-1][enough] + k - 1]
+
+        return chords
@@ -0,0 +1,402 @@
+import json
+import struct
+from datetime import datetime
+
+from numpy import (
+    array, asarray, ascontiguousarray, concatenate, cumsum, dtype, frombuffer, fromfile, full, inf, isfinite,
+    memmap, uint8, zeros
+)
+
+from cvrp.data import DEFAULT_SPEED, Network, Place, Vehicle
+from cvrp.heuristics import from_vehicle_routes, to_vehicle_routes
+
+# File layout: magic, format version and header size (little-endian uint32),
+# JSON header describing arrays (dtype, shape and offset from data start)
+# and metadata, then raw arrays. Data start and every array are aligned to
+# ALIGNMENT bytes, so that arrays can be used directly from a memory-mapped file.
+# Version 2 added service times, time windows, shift lengths and speed.
+
+MAGIC = b"CVRPDATA"
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+
+_PREFIX = struct.Struct("<8sII")
+
+
+def _aligned(position: int) -> int:
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def _encode_names(names: [str]) -> (array, array):
+    encoded = [name.encode("utf-8") for name in names]
+    offsets = zeros(len(encoded) + 1, dtype="<i8")
+    cumsum([len(e) for e in encoded], out=offsets[1:])
+
+    return frombuffer(b"".join(encoded), dtype=uint8), offsets
+
+
+def _solution_metadata(solution) -> dict:
+    metadata = {"cost": float(solution.obj_total_cost())}
+
+    for key in ("status", "bound", "lower_bound"):
+        value = getattr(solution, key, None)
+
+        if isinstance(value, (str, int, float)):
+            metadata[key] = value
+
+    return metadata
+
+
+def network_columns(network: Network, routes: dict = None) -> dict:
+    """
+    Columnar representation of the network (and routes) as stored in files.
+
+    Places are stored depot first, names as UTF-8 data with offsets, routes
+    as client indices of all vehicles concatenated with offsets per vehicle.
+    Missing deadlines and unlimited shifts are stored as inf.
+    """
+
+    places = network.all_places
+    place_name_data, place_name_offsets = _encode_names([p.name for p in places])
+    vehicle_name_data, vehicle_name_offsets = _encode_names([v.name for v in network.vehicles])
+
+    arrays = {
+        "place_latitude": asarray(network.latitudes, dtype="<f8"),
+        "place_longitude": asarray(network.longitudes, dtype="<f8"),
+        "place_demand": array([p.demand for p in places], dtype="<f8"),
+        "place_service_time": array([p.service_time for p in places], dtype="<f8"),
+        "place_ready_time": array([p.ready_time for p in places], dtype="<f8"),
+        "place_due_time": array([p.due_time for p in places], dtype="<f8"),
+        "place_name_data": place_name_data,
+        "place_name_offsets": place_name_offsets,
+        "vehicle_capacity": asarray(network.vehicle_capacities, dtype="<f8"),
+        "vehicle_shift_length": array([v.shift_length for v in network.vehicles], dtype="<f8"),
+        "vehicle_name_data": vehicle_name_data,
+        "vehicle_name_offsets": vehicle_name_offsets,
+        "network_speed": array([network.speed], dtype="<f8"),
+    }
+
+    if routes is not None:
+        index_routes = from_vehicle_routes(network, routes)
+        offsets = zeros(len(index_routes) + 1, dtype="<i8")
+        cumsum([len(route) for route in index_routes], out=offsets[1:])
+
+        arrays["route_stops"] = concatenate([zeros(0, dtype="<i8")] + [
+            array(route, dtype="<i8") for route in index_routes
+        ])
+        arrays["route_offsets"] = offsets
+
+    return arrays
+
+
+def save(path: str, network: Network, solution=None, metadata: dict = None):
+    """
+    Save network (and optionally its solution) into a binary file.
+
+    :param path: File path
+    :param network: Network
+    :param solution: Solved model or pipeline Solution, its routes, cost and
+        status are stored with the network
+    :param metadata: Extra JSON-serializable metadata
+    """
+
+    arrays = network_columns(network, solution.vehicle_routes() if solution is not None else None)
+
+    stored_metadata = {"saved": datetime.now().isoformat()}
+
+    if solution is not None:
+        stored_metadata.update(_solution_metadata(solution))
+
+    stored_metadata.update(metadata or {})
+
+    descriptions, position = {}, 0
+
+    for name, values in arrays.items():
+        position = _aligned(position)
+        descriptions[name] = {"dtype": values.dtype.str, "shape": list(values.shape), "offset": position}
+        position += values.nbytes
+
+    header = json.dumps({"arrays": descriptions, "metadata": stored_metadata}).encode("utf-8")
+    data_start = _aligned(_PREFIX.size + len(header))
+
+    with open(path, "wb") as file:
+        file.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+        file.write(header)
+
+        for name, values in arrays.items():
+            file.seek(data_start + descriptions[name]["offset"])
+            file.write(ascontiguousarray(values).data)
+
+
+class NetworkFile:
+    """
+    Network file opened for reading. Arrays are memory-mapped (or read at
+    once), Place and Vehicle objects are only created by network().
+    """
+
+    def __init__(self, path: str, mmap: bool = True):
+        with open(path, "rb") as file:
+            prefix = file.read(_PREFIX.size)
+
+            if len(prefix) < _PREFIX.size:
+                raise ValueError("Not a network file")
+
+            magic, version, header_size = _PREFIX.unpack(prefix)
+
+            if magic != MAGIC:
+                raise ValueError("Not a network file")
+
+            if version > FORMAT_VERSION:
+                raise ValueError(f"Unsupported network file version: {version}")
+
+            header = json.loads(file.read(header_size).decode("utf-8"))
+
+        self.path = path
+        self.version = version
+        self.metadata = header["metadata"]
+        self.__descriptions = header["arrays"]
+        self.__data_start = _aligned(_PREFIX.size + header_size)
+        self.__buffer = memmap(path, dtype=uint8, mode="r") if mmap else fromfile(path, dtype=uint8)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.__descriptions
+
+    def array(self, name: str):
+        description = self.__descriptions[name]
+        values_type = dtype(description["dtype"])
+        count = 1
+
+        for size in description["shape"]:
+            count *= size
+
+        start = self.__data_start + description["offset"]
+        data = self.__buffer[start:start + count * values_type.itemsize]
+
+        return data.view(values_type).reshape(description["shape"])
+
+    @property
+    def latitudes(self):
+        return self.array("place_latitude")
+
+    @property
+    def longitudes(self):
+        return self.array("place_longitude")
+
+    @property
+    def demands(self):
+        """
+        Place demands (depot first).
+        """
+
+        return self.array("place_demand")
+
+    @property
+    def capacities(self):
+        return self.array("vehicle_capacity")
+
+    def __optional(self, name: str, default: float, size: int):
+        """
+        Array added in a later format version, filled with default for older files.
+        """
+
+        return self.array(name) if name in self else full(size, default)
+
+    @property
+    def service_times(self):
+        return self.__optional("place_service_time", 0.0, len(self.latitudes))
+
+    @property
+    def ready_times(self):
+        return self.__optional("place_ready_time", 0.0, len(self.latitudes))
+
+    @property
+    def due_times(self):
+        return self.__optional("place_due_time", inf, len(self.latitudes))
+
+    @property
+    def shift_lengths(self):
+        return self.__optional("vehicle_shift_length", inf, len(self.capacities))
+
+    @property
+    def has_time_constraints(self) -> bool:
+        """
+        Same as Network.has_time_constraints, without creating the network.
+        """
+
+        return bool(
+            (self.service_times > 0.0).any() or (self.ready_times > 0.0).any() or
+            isfinite(self.due_times).any() or isfinite(self.shift_lengths).any()
+        )
+
+    @property
+    def speed(self) -> float:
+        return float(self.array("network_speed")[0]) if "network_speed" in self else DEFAULT_SPEED
+
+    def __names(self, prefix: str) -> [str]:
+        data = self.array(f"{prefix}_name_data").tobytes()
+        offsets = self.array(f"{prefix}_name_offsets").tolist()
+
+        return [data[a:b].decode("utf-8") for a, b in zip(offsets[:-1], offsets[1:])]
+
+    @property
+    def place_names(self) -> [str]:
+        return self.__names("place")
+
+    @property
+    def vehicle_names(self) -> [str]:
+        return self.__names("vehicle")
+
+    def network(self) -> Network:
+        network = Network()
+        names = self.place_names
+        lat, lon, demands = self.latitudes.tolist(), self.longitudes.tolist(), self.demands.tolist()
+        service, ready, due = self.service_times.tolist(), self.ready_times.tolist(), self.due_times.tolist()
+
+        network.speed = self.speed
+        network.depot = Place(names[0], lat[0], lon[0], 0.0, service[0], ready[0], due[0])
+        network.add_clients([
+            Place(*values)
+            for values in zip(names[1:], lat[1:], lon[1:], demands[1:], service[1:], ready[1:], due[1:])
+        ])
+        network.add_vehicles([
+            Vehicle(*values)
+            for values in zip(self.vehicle_names, self.capacities.tolist(), self.shift_lengths.tolist())
+        ])
+
+        return network
+
+    def routes(self) -> [[int]]:
+        """
+        Stored solution as index routes (None if file has no solution).
+        """
+
+        if "route_stops" not in self:
+            return None
+
+        stops = self.array("route_stops").tolist()
+        offsets = self.array("route_offsets").tolist()
+
+        return [stops[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+
+    def vehicle_routes(self, network: Network) -> dict:
+        """
+        Stored solution in CVRPModel.vehicle_routes format (None if file has no solution).
+
+        :param network: Network returned by network()
+        """
+
+        routes = self.routes()
+
+        return to_vehicle_routes(network, routes) if routes is not None else None
+
+
+def load(path: str, mmap: bool = True) -> NetworkFile:
+    """
+    Open network file.
+
+    :param path: File path
+    :param mmap: Memory-map arrays instead of reading the whole file
+    """
+
+    return NetworkFile(path, mmap)
+
+
+def load_network(path: str) -> Network:
+    return load(path).network()
+
+
+def _finite(value: float) -> float:
+    # JSON has no infinity, missing limits are exported as null
+    return value if isfinite(value) else None
+
+
+def _place_json(place: Place) -> dict:
+    return {
+        "name": place.name,
+        "latitude": place.latitude,
+        "longitude": place.longitude,
+        "demand": place.demand,
+        "service_time": place.service_time,
+        "ready_time": place.ready_time,
+        "due_time": _finite(place.due_time),
+    }
+
+
+def routes_json(vehicle_routes: dict) -> dict:
+    """
+    Routes as lists of visited clients (slug names) of every vehicle.
+    """
+
+    return {
+        vehicle: [place_to for _, place_to in route[:-1]]
+        for vehicle, route in vehicle_routes.items()
+    }
+
+
+def network_json(network: Network, solution=None, metadata: dict = None) -> dict:
+    """
+    Network (and optionally its solution) as JSON data (see export_json).
+    """
+
+    depot = _place_json(network.depot)
+    del depot["demand"]
+
+    data = {
+        "version": FORMAT_VERSION,
+        "metadata": dict(metadata or {}),
+        "speed": network.speed,
+        "depot": depot,
+        "clients": [_place_json(c) for c in network.clients],
+        "vehicles": [
+            {"name": v.name, "max_capacity": v.max_capacity, "shift_length": _finite(v.shift_length)}
+            for v in network.vehicles
+        ],
+    }
+
+    if solution is not None:
+        data["metadata"].update(_solution_metadata(solution))
+        data["routes"] = routes_json(solution.vehicle_routes())
+
+    return data
+
+
+def _place_from_json(data: dict, demand: bool = True) -> Place:
+    return Place(
+        str(data["name"]), float(data["latitude"]), float(data["longitude"]),
+        demand=float(data["demand"]) if demand else 0.0,
+        service_time=float(data.get("service_time") or 0.0),
+        ready_time=float(data.get("ready_time") or 0.0),
+        due_time=data.get("due_time"),
+    )
+
+
+def network_from_json(data: dict) -> Network:
+    """
+    Network from JSON data as written by export_json (routes are ignored,
+    optional time fields and speed may be left out).
+
+    :raises ValueError: Data is not a valid network
+    """
+
+    try:
+        network = Network()
+        network.speed = float(data.get("speed") or DEFAULT_SPEED)
+        network.depot = _place_from_json(data["depot"], demand=False)
+        network.add_clients([_place_from_json(c) for c in data["clients"]])
+        network.add_vehicles([
+            Vehicle(str(v["name"]), float(v["max_capacity"]), v.get("shift_length"))
+            for v in data["vehicles"]
+        ])
+    except (KeyError, TypeError, AttributeError) as exc:
+        raise ValueError(f"Invalid network data: {exc!r}")
+
+    return network
+
+
+def export_json(path: str, network: Network, solution=None, metadata: dict = None):
+    """
+    Export network (and optionally its solution) as JSON.
+    """
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(network_json(network, solution, metadata), file, ensure_ascii=False, indent=2)
@@ -0,0 +1,212 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import inf
+from multiprocessing import get_context
+
+from numpy import array
+
+from cvrp.data import Network, Vehicle
+from cvrp.exceptions import InsufficientVehiclesException
+from cvrp.heuristics import (
+    EPSILON, local_search, nearest_neighbours, network_time_windows, ruin_and_recreate, savings_routes,
+    to_vehicle_routes, total_length
+)
+from cvrp.multistart import SharedArrays, attach_arrays, row_views
+
+# Points of a sweep are solved in chains of increasing vehicle count with the
+# same capacity. A solution with k vehicles stays feasible with k + 1 (the
+# extra vehicle has an empty route), so every point after the first starts
+# from the solution of the previous one and is improved by ruin-and-recreate
+# iterations, which may move clients into the empty routes. Costs along a
+# chain never increase. Chains run in parallel, distances and candidate
+# lists are computed once and shared with workers.
+
+
+class SweepPoint:
+    """
+    Fleet of equal vehicles evaluated by fleet_sweep.
+
+    :ivar vehicles: Number of vehicles
+    :ivar capacity: Capacity of every vehicle
+    :ivar cost: Total distance (None if no feasible solution was found)
+    :ivar routes: Routes in CVRPModel.vehicle_routes format over fleet_network vehicles
+    :ivar warm_started: Solution started from the previous point of the chain
+    :ivar solve_time: Seconds of solving in the worker
+    """
+
+    def __init__(self, vehicles: int, capacity: float, cost: float = None, routes: dict = None,
+                 warm_started: bool = False, solve_time: float = 0.0):
+        self.vehicles = vehicles
+        self.capacity = capacity
+        self.cost = cost
+        self.routes = routes
+        self.warm_started = warm_started
+        self.solve_time = solve_time
+
+    @property
+    def feasible(self) -> bool:
+        return self.cost is not None
+
+    @property
+    def total_capacity(self) -> float:
+        return self.vehicles * self.capacity
+
+    def dominates(self, other: "SweepPoint") -> bool:
+        """
+        Not more vehicles, capacity nor cost than other, and less of one of them.
+        """
+
+        mine = (self.vehicles, self.capacity, self.cost)
+        others = (other.vehicles, other.capacity, other.cost)
+
+        return all(a <= b + EPSILON for a, b in zip(mine, others)) and any(
+            a < b - EPSILON for a, b in zip(mine, others)
+        )
+
+    def __repr__(self):
+        return f"SweepPoint(vehicles={self.vehicles}, capacity={self.capacity}, cost={self.cost})"
+
+
+def fleet_network(network: Network, vehicles: int, capacity: float, shift_length: float = inf) -> Network:
+    """
+    Network with the places of the given one and a fleet of equal vehicles.
+    """
+
+    fleet = Network()
+    fleet.speed = network.speed
+    fleet.depot = network.depot
+    fleet.add_clients(network.clients)
+    fleet.add_vehicles([Vehicle(f"Vehicle {k + 1}", capacity, shift_length) for k in range(vehicles)])
+
+    return fleet
+
+
+def pareto_front(points: [SweepPoint]) -> [SweepPoint]:
+    """
+    Feasible points not dominated by other points (see SweepPoint.dominates),
+    ordered by vehicles and capacity.
+    """
+
+    feasible = [p for p in points if p.feasible]
+    front = [p for p in feasible if not any(q.dominates(p) for q in feasible)]
+
+    return sorted(front, key=lambda p: (p.vehicles, p.capacity))
+
+
+# Worker process state set by _init_worker
+_worker = {}
+
+
+def _init_worker(specs: dict, network: Network, shift_length: float):
+    arrays, blocks = attach_arrays(specs)
+    _worker["blocks"] = blocks
+    _worker["dist"] = arrays["dist"]
+    _worker["dist_rows"] = row_views(arrays["dist"])
+    _worker["neighbours"] = arrays["neighbours"].tolist()
+    _worker["network"] = network
+    _worker["shift_length"] = shift_length
+
+
+def _solve_chain(capacity: float, counts: [int], iterations: int, seed: int) -> [SweepPoint]:
+    network, shift_length = _worker["network"], _worker["shift_length"]
+    dist, neighbours = _worker["dist_rows"], _worker["neighbours"]
+    demands = [0.0] + [c.demand for c in network.clients]
+    total_demand = sum(demands)
+    ruin_size = max(2, min(30, (len(dist) - 1) // 10))
+    rng = random.Random(seed)
+    points, previous = [], None
+
+    for count in counts:
+        start = time.perf_counter()
+        fleet = fleet_network(network, count, capacity, shift_length)
+        times = network_time_windows(fleet, _worker["dist"])
+        capacities = [capacity] * count
+        point = SweepPoint(count, capacity)
+
+        if count * capacity + EPSILON >= total_demand and capacity + EPSILON >= max(demands):
+            if previous is None:
+                try:
+                    routes = savings_routes(dist, demands, capacities, neighbours, times)
+                    routes = local_search(dist, demands, capacities, routes, neighbours, times=times)
+                except InsufficientVehiclesException:
+                    routes = None
+            else:
+                routes = previous + [[] for _ in range(count - len(previous))]
+                point.warm_started = True
+
+            if routes is not None:
+                cost = total_length(dist, routes)
+
+                for _ in range(iterations if previous is not None else iterations // 2):
+                    try:
+                        candidate = ruin_and_recreate(rng, dist, demands, capacities, routes, neighbours, ruin_size,
+                                                      times)
+                    except InsufficientVehiclesException:
+                        continue
+
+                    candidate = local_search(dist, demands, capacities, candidate, neighbours, max_passes=5,
+                                             times=times)
+                    candidate_cost = total_length(dist, candidate)
+
+                    if candidate_cost < cost - EPSILON:
+                        routes, cost = candidate, candidate_cost
+
+                point.cost, point.routes = cost, to_vehicle_routes(fleet, routes)
+                previous = routes
+
+        point.solve_time = time.perf_counter() - start
+        points.append(point)
+
+    return points
+
+
+def fleet_sweep(network: Network, vehicle_counts: [int], capacities: [float], shift_length: float = inf,
+                iterations: int = 50, workers: int = None, seed: int = 0) -> [SweepPoint]:
+    """
+    Evaluate fleets of equal vehicles for all combinations of vehicle counts and capacities.
+
+    Vehicle counts of every capacity are solved as warm-started chains (see
+    above), split into as many chains as needed to keep all workers busy.
+    Every point is solved heuristically (savings construction or previous
+    point, then ruin-and-recreate with local search).
+
+    :param network: Network (its vehicles are ignored)
+    :param vehicle_counts: Numbers of vehicles
+    :param capacities: Vehicle capacities
+    :param shift_length: Shift length of all vehicles
+    :param iterations: Ruin-and-recreate iterations of every point
+    :param workers: Number of worker processes (all cores if None)
+    :param seed: Random seed
+    :returns: Points ordered by capacity and vehicle count (see pareto_front)
+    """
+
+    counts = sorted(set(int(c) for c in vehicle_counts if c > 0))
+    capacities = sorted(set(float(c) for c in capacities if c > 0))
+
+    if not counts or not capacities or not network.clients:
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    segments = max(1, min(len(counts), -(-workers // len(capacities))))
+    size = -(-len(counts) // segments)
+    chains = [(capacity, counts[i:i + size]) for capacity in capacities for i in range(0, len(counts), size)]
+
+    dist = network.distance_matrix()
+    neighbours = array(nearest_neighbours(dist), dtype=int)
+
+    context = get_context("spawn")
+
+    with SharedArrays(dist=dist, neighbours=neighbours) as shared:
+        with ProcessPoolExecutor(
+                max_workers=min(workers, len(chains)), mp_context=context,
+                initializer=_init_worker, initargs=(shared.specs, network, shift_length)
+        ) as executor:
+            futures = [
+                executor.submit(_solve_chain, capacity, segment, iterations, seed + k)
+                for k, (capacity, segment) in enumerate(chains)
+            ]
+            results = [future.result() for future in futures]
+
+    return [point for chain in results for point in chain]
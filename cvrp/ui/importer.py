@@ -0,0 +1,99 @@
+from PyQt5.QtCore import *
+from PyQt5.QtWidgets import *
+
+from cvrp.importers import load_places, load_vehicles
+
+FILE_FILTER = "Data files (*.csv *.geojson *.json *.parquet);;All files (*)"
+
+# Progress dialog range (fraction of rows read is scaled to it)
+PROGRESS_STEPS = 1000
+
+
+class ImportSignals(QObject):
+    finished = pyqtSignal(list, list)
+    failed = pyqtSignal(str)
+
+
+class ImportRunnable(QRunnable):
+    """
+    Parses file on a worker thread, parsed items are passed back through
+    signals, so that they are inserted into network on the UI thread.
+    """
+
+    def __init__(self, path, loader, progress_bar, existing: [str] = ()):
+        super().__init__()
+        self.path = path
+        self.loader = loader
+        self.existing = existing
+        self.bar = progress_bar
+        self.signals = ImportSignals()
+        self.cancelled = False
+
+    def set_progress(self, fraction: float):
+        value = int(fraction * PROGRESS_STEPS)
+        QMetaObject.invokeMethod(self.bar, "setValue", Qt.QueuedConnection, Q_ARG(int, value))
+
+    def run(self):
+        try:
+            items, errors = self.loader(
+                self.path, progress=self.set_progress, should_stop=lambda: self.cancelled, existing=self.existing
+            )
+        except (OSError, ValueError) as exc:
+            self.signals.failed.emit(str(exc))
+            return
+
+        if not self.cancelled:
+            self.signals.finished.emit(items, errors)
+
+
+def start_import(parent: QWidget, kind: str, on_items: callable, existing: [str] = ()):
+    """
+    Ask for a file and import places or vehicles from it in background.
+
+    :param parent: Parent widget
+    :param kind: "places" or "vehicles"
+    :param on_items: Called on the UI thread with the list of imported items
+    :param existing: Slug names of items already in the network (imported names must differ)
+    """
+
+    path, _ = QFileDialog.getOpenFileName(parent, f"Import {kind}", "", FILE_FILTER)
+
+    if not path:
+        return
+
+    dialog = QProgressDialog(f"Importing {kind}...", "Cancel", 0, PROGRESS_STEPS, parent)
+    dialog.setWindowTitle("Import")
+    dialog.setWindowModality(Qt.WindowModal)
+    dialog.show()
+
+    runnable = ImportRunnable(path, load_places if kind == "places" else load_vehicles, dialog, existing)
+
+    def on_cancel():
+        runnable.cancelled = True
+
+    def on_finished(items, errors):
+        dialog.close()
+        on_items(items)
+
+        if errors:
+            msg = QMessageBox(parent)
+            msg.setIcon(QMessageBox.Warning)
+            msg.setWindowTitle("Import")
+            msg.setText(f"Imported {len(items)} {kind}, skipped {len(errors)} invalid rows.")
+            msg.setDetailedText("\n".join(errors[:1000]))
+            msg.exec_()
+
+    def on_failed(message):
+        dialog.close()
+
+        msg = QMessageBox(parent)
+        msg.setIcon(QMessageBox.Critical)
+        msg.setWindowTitle("Error")
+        msg.setText(message)
+        msg.exec_()
+
+    dialog.canceled.connect(on_cancel)
+    runnable.signals.finished.connect(on_finished)
+    runnable.signals.failed.connect(on_failed)
+
+    QThreadPool.globalInstance().start(runnable)
@@ -7,16 +7,21 @@ from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
 
 from cvrp.data import Network, Place, Vehicle
-from cvrp.exceptions import CVRPException
-from cvrp.model import CVRPModel
-from cvrp.report import generate_report
-from cvrp.solver import get_solvers, solve_model
+from cvrp.exceptions import CVRPException, SolveCancelledException
+from cvrp.journal import Checkpointer, Journal, network_fingerprint
+from cvrp.pipeline import solve_network
+from cvrp.progress import CancellationToken, SolveProgress
+from cvrp.report import write_report
+from cvrp.storage import export_json, load_network, save
+from cvrp.ui.importer import start_import
+from cvrp.ui.models import ItemRole, NetworkFilterProxyModel, PlaceTableModel, VehicleTableModel
 from cvrp.ui.places import PlaceFormWindow
+from cvrp.ui.scenarios import ScenarioWindow
 from cvrp.ui.vehicles import VehicleFormWindow
 
 
 class ListTabWidget(QWidget):
-    list_class = QListWidget
+    list_class = None
 
     def __init__(self, *args, **kwargs):
         self._network = kwargs.pop("network")
@@ -46,29 +51,45 @@ class ListTabWidget(QWidget):
         self.ab_remove.clicked.connect(self.__remove_item)
         self.ab_layout.addWidget(self.ab_remove)
 
+        self.ab_import = QPushButton("Import...")
+        self.ab_import.clicked.connect(self.__import_items)
+        self.ab_layout.addWidget(self.ab_import)
+
         self.ab_layout.addStretch()
 
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter by name")
+        self.ab_layout.addWidget(self.filter_input)
+
         # Items list #####################################
         self.items_list = self.list_class(network=self._network)
         self.layout.addWidget(self.items_list)
 
-        self.items_list.itemClicked.connect(self.update_action_buttons)
+        self.filter_input.textChanged.connect(self.items_list.proxy.set_filter)
+
+        self.items_list.selectionModel().currentRowChanged.connect(
+            lambda *_: self.update_action_buttons(self.items_list.current_item())
+        )
         self.update_action_buttons(None)
 
-        self.items_list.itemDoubleClicked.connect(self.__edit_item)
+        self.items_list.doubleClicked.connect(self.__edit_item)
 
     def __add_item(self):
         if hasattr(self, "on_item_add"):
             self.on_item_add()
 
+    def __import_items(self):
+        if hasattr(self, "on_items_import"):
+            self.on_items_import()
+
     def __edit_item(self):
-        item = self.items_list.currentItem()
+        item = self.items_list.current_item()
 
         if item is not None and hasattr(self, "on_item_edit"):
             self.on_item_edit(item=item)
 
     def __remove_item(self):
-        item = self.items_list.currentItem()
+        item = self.items_list.current_item()
 
         if item is not None and hasattr(self, "on_item_remove"):
             self.on_item_remove(item=item)
@@ -83,106 +104,123 @@ class ListTabWidget(QWidget):
         self.ab_edit.setDisabled(is_item_invalid)
 
 
-class PlaceListItem(QListWidgetItem):
-    def __init__(self, place, removable=True):
-        super().__init__(place.name)
-        self.place = place
-        self.removable = removable
-
+class NetworkTableView(QTableView):
+    model_class = None
 
-class PlaceList(QListWidget):
     def __init__(self, *args, **kwargs):
         self._network = kwargs.pop("network")
 
         super().__init__(*args, **kwargs)
-        self.setSelectionMode(QListWidget.SingleSelection)
-        self.update_places()
 
-    def update_places(self):
-        self.clear()
+        self.source = self.model_class(self._network, self)
+        self.proxy = NetworkFilterProxyModel(self.source, self)
+        self.setModel(self.proxy)
+
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        # Network order until user clicks a column header
+        self.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.setSortingEnabled(True)
+        self.verticalHeader().hide()
+        self.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 6)
+        self.horizontalHeader().setStretchLastSection(True)
+
+    def current_item(self):
+        index = self.currentIndex()
+
+        if not index.isValid() or not self.selectionModel().isRowSelected(index.row(), QModelIndex()):
+            return None
+
+        return self.proxy.data(index, ItemRole)
+
 
-        for place in self._network.all_places:
-            self.addItem(PlaceListItem(place))
+class PlaceList(NetworkTableView):
+    model_class = PlaceTableModel
 
 
 class PlacesTabWidget(ListTabWidget):
     list_class = PlaceList
 
-    def __on_editor_close(self):
-        self.items_list.update_places()
-        self.update_action_buttons(None)
+    def __on_editor_close(self, place):
+        self._network.update_place(place)
+        self.items_list.source.item_changed(place)
+        self.update_action_buttons(self.items_list.current_item())
 
     def on_item_add(self):
         new_index = len(self._network.clients) + 1
         new_place = Place(f"New Client ({new_index})", 0.0, 0.0)
         self._network.add_client(new_place)
+        self.items_list.source.items_added()
 
         form_window = PlaceFormWindow(self, place=new_place)
-        form_window.set_on_close(self.__on_editor_close)
+        form_window.set_on_close(lambda: self.__on_editor_close(new_place))
         form_window.show()
 
     def on_item_edit(self, item):
-        form_window = PlaceFormWindow(self, place=item.place, is_depot=(item.place == self._network.depot))
-        form_window.set_on_close(self.__on_editor_close)
+        form_window = PlaceFormWindow(self, place=item, is_depot=(item == self._network.depot))
+        form_window.set_on_close(lambda: self.__on_editor_close(item))
         form_window.show()
 
     def on_item_remove(self, item):
-        self._network.remove_client(item.place)
-        self.__on_editor_close()
+        self.items_list.source.remove_item(item)
+        self.items_list.clearSelection()
+        self.update_action_buttons(None)
+
+    def on_items_import(self):
+        start_import(self, "places", self.__on_imported, [p.slug_name for p in self._network.all_places])
+
+    def __on_imported(self, places):
+        count = len(self._network.clients)
+        self._network.add_clients(places)
+        self.items_list.source.items_added(len(self._network.clients) - count)
 
     def update_action_buttons(self, item):
         super().update_action_buttons(item)
 
         if self.is_selected_item_valid(item):
-            is_depot_selected = item.place == self._network.depot
+            is_depot_selected = item == self._network.depot
             self.ab_remove.setDisabled(is_depot_selected)
 
 
-class VehicleListItem(QListWidgetItem):
-    def __init__(self, vehicle):
-        super().__init__(vehicle.name)
-        self.vehicle = vehicle
-
-
-class VehicleList(QListWidget):
-    def __init__(self, *args, **kwargs):
-        self._network = kwargs.pop("network")
-
-        super().__init__(*args, **kwargs)
-        self.setSelectionMode(QListWidget.SingleSelection)
-        self.update_vehicles()
-
-    def update_vehicles(self):
-        self.clear()
-
-        for vehicle in self._network.vehicles:
-            self.addItem(VehicleListItem(vehicle))
+class VehicleList(NetworkTableView):
+    model_class = VehicleTableModel
 
 
 class VehiclesTabWidget(ListTabWidget):
     list_class = VehicleList
 
-    def __on_editor_close(self):
-        self.items_list.update_vehicles()
-        self.update_action_buttons(None)
+    def __on_editor_close(self, vehicle):
+        self.items_list.source.item_changed(vehicle)
+        self.update_action_buttons(self.items_list.current_item())
 
     def on_item_add(self):
         new_index = len(self._network.vehicles) + 1
         new_vehicle = Vehicle(f"New Vehicle ({new_index})", 1.0)
         self._network.add_vehicle(new_vehicle)
+        self.items_list.source.items_added()
 
         form_window = VehicleFormWindow(self, vehicle=new_vehicle)
-        form_window.set_on_close(self.__on_editor_close)
+        form_window.set_on_close(lambda: self.__on_editor_close(new_vehicle))
         form_window.show()
 
     def on_item_edit(self, item):
-        form_window = VehicleFormWindow(self, vehicle=item.vehicle)
-        form_window.set_on_close(self.__on_editor_close)
+        form_window = VehicleFormWindow(self, vehicle=item)
+        form_window.set_on_close(lambda: self.__on_editor_close(item))
         form_window.show()
 
     def on_item_remove(self, item):
-        self._network.remove_vehicle(item.vehicle)
-        self.__on_editor_close()
+        self.items_list.source.remove_item(item)
+        self.items_list.clearSelection()
+        self.update_action_buttons(None)
+
+    def on_items_import(self):
+        start_import(self, "vehicles", self.__on_imported, [v.slug_name for v in self._network.vehicles])
+
+    def __on_imported(self, vehicles):
+        count = len(self._network.vehicles)
+        self._network.add_vehicles(vehicles)
+        self.items_list.source.items_added(len(self._network.vehicles) - count)
 
 
 class MainTabWidget(QTabWidget):
@@ -198,39 +236,85 @@ class MainTabWidget(QTabWidget):
         self.addTab(self.vehicles_tab, "Vehicles")
 
 
+# Progress dialog range while the model is being built
+PROGRESS_STEPS = 100
+
+STAGE_LABELS = {
+    "build": "Building model...",
+    "heuristic": "Searching for an initial solution...",
+    "solve": "Searching for an optimal solution...",
+    "done": "Generating report...",
+}
+
+# Incumbents of GUI solves are journaled here, solving the same network again
+# (also after a crash) starts from the last one
+JOURNAL_PATH = os.path.join(os.path.expanduser("~"), ".cvrp-journal")
+
+
 class ModelSolveRunnable(QRunnable):
     def __init__(self, network, progress_bar):
         super().__init__()
         self.network = network
         self.bar = progress_bar
-        self.progress = 0
+        self.token = CancellationToken()
 
     def set_bar_status(self, value: int, label: str):
         QMetaObject.invokeMethod(self.bar, "setValue", Qt.QueuedConnection, Q_ARG(int, value))
         QMetaObject.invokeMethod(self.bar, "setLabelText", Qt.QueuedConnection, Q_ARG(str, label))
 
+    def on_progress(self, state: SolveProgress):
+        lines = [STAGE_LABELS[state.stage]]
+
+        if state.iteration is not None:
+            lines[0] += f" (pass {state.iteration})"
+
+        if state.incumbent is not None:
+            lines.append(f"Best solution: {state.incumbent:.2f} km")
+
+        if state.bound is not None:
+            lines.append(f"Lower bound: {state.bound:.2f} km")
+
+        if state.gap is not None:
+            lines.append(f"Gap: {state.gap:.2%}")
+
+        if state.stage == "solve":
+            # Time of solving is unknown, dialog shows busy indicator
+            QMetaObject.invokeMethod(self.bar, "setMaximum", Qt.QueuedConnection, Q_ARG(int, 0))
+
+        value = int(state.fraction * PROGRESS_STEPS) if state.fraction is not None else 0
+        self.set_bar_status(value, "\n".join(lines))
+
     def run(self):
         try:
-            self.set_bar_status(self.progress, "Building model...")
-            model = CVRPModel(self.network)
+            journal = Journal(JOURNAL_PATH)
+            journal.compact()
+            job = network_fingerprint(self.network)
+            checkpoint = Checkpointer(journal, job, job)
 
-            self.set_bar_status(1, "Searching for a solution...")
-            result = solve_model(model)
+            try:
+                solution = solve_network(
+                    self.network, progress=self.on_progress, token=self.token,
+                    initial_routes=journal.warm_start(job, self.network), checkpoint=checkpoint
+                )
+            finally:
+                checkpoint.flush()
 
-            self.set_bar_status(2, "Generating report...")
+            if solution.status in ("optimal", "reduced"):
+                journal.finish(job, solution.status, solution.routes, solution.cost, solution.bound)
 
-            report = generate_report(model, result)
-            file_name = "report-" + datetime.now().strftime('%Y-%m-%d_%H.%M.%S') + ".html"
-            home = os.path.expanduser("~")
+            self.set_bar_status(0, STAGE_LABELS["done"])
 
-            abs_file_path = os.path.join(home, file_name)
+            dir_name = "report-" + datetime.now().strftime('%Y-%m-%d_%H.%M.%S')
+            abs_dir_path = os.path.join(os.path.expanduser("~"), dir_name)
+            os.makedirs(abs_dir_path, exist_ok=True)
 
-            with open(abs_file_path, "w") as file:
-                file.write(report)
+            abs_file_path, *_ = write_report(solution, solution.result, os.path.join(abs_dir_path, "report.html"))
 
             webbrowser.open(abs_file_path)
 
             QThread.msleep(500)
+        except SolveCancelledException:
+            pass
         except CVRPException as exc:
             msg = QMessageBox()
             msg.setIcon(QMessageBox.Critical)
@@ -238,7 +322,7 @@ class ModelSolveRunnable(QRunnable):
             msg.setText(exc.message)
             msg.exec_()
         finally:
-            self.bar.close()
+            QMetaObject.invokeMethod(self.bar, "close", Qt.QueuedConnection)
 
 
 class MainWidget(QWidget):
@@ -248,12 +332,17 @@ class MainWidget(QWidget):
         try:
             self._network.check_solvability()
 
-            dialog = QProgressDialog("", "Cancel", 0, 3, self)
+            dialog = QProgressDialog("", "Cancel", 0, PROGRESS_STEPS, self)
             dialog.setWindowTitle("Solving Problem")
             dialog.setWindowModality(Qt.WindowModal)
+            dialog.setAutoClose(False)
+            dialog.setAutoReset(False)
             dialog.show()
 
             runnable = ModelSolveRunnable(self._network, dialog)
+
+            # Solving stops and the best solution found so far is reported
+            dialog.canceled.connect(runnable.token.cancel)
             QThreadPool.globalInstance().start(runnable)
 
         except CVRPException as exc:
@@ -280,6 +369,18 @@ class MainWidget(QWidget):
         self.solve.clicked.connect(self.on_click_solve)
         self.layout.addWidget(self.solve)
 
+        self.compare = QPushButton("Compare Scenarios...")
+        self.compare.clicked.connect(self.on_click_compare)
+        self.layout.addWidget(self.compare)
+
+    def on_click_compare(self):
+        # Scenarios are copies of the network as it is when the window opens
+        scenario_window = ScenarioWindow(self, network=self._network)
+        scenario_window.show()
+
+
+NETWORK_FILE_FILTER = "Network files (*.cvrp);;All files (*)"
+
 
 class MainWindow(QMainWindow):
     def __init__(self, network: Network = None, *args, **kwargs):
@@ -293,9 +394,58 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Routing Problem")
         self.setFixedSize(600, 400)
 
+        file_menu = self.menuBar().addMenu("File")
+        file_menu.addAction("Open...", self.on_open, "Ctrl+O")
+        file_menu.addAction("Save As...", self.on_save, "Ctrl+S")
+        file_menu.addAction("Export JSON...", self.on_export_json)
+
         self.main_widget = MainWidget(self, network=self._network)
         self.setCentralWidget(self.main_widget)
 
+    def show_error(self, message: str):
+        msg = QMessageBox(self)
+        msg.setIcon(QMessageBox.Critical)
+        msg.setWindowTitle("Error")
+        msg.setText(message)
+        msg.exec_()
+
+    def on_open(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Open network", "", NETWORK_FILE_FILTER)
+
+        if not path:
+            return
+
+        try:
+            self._network = load_network(path)
+        except (OSError, ValueError) as exc:
+            self.show_error(str(exc))
+            return
+
+        self.main_widget = MainWidget(self, network=self._network)
+        self.setCentralWidget(self.main_widget)
+
+    def on_save(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save network", "", NETWORK_FILE_FILTER)
+
+        if not path:
+            return
+
+        try:
+            save(path, self._network)
+        except OSError as exc:
+            self.show_error(str(exc))
+
+    def on_export_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export network", "", "JSON files (*.json)")
+
+        if not path:
+            return
+
+        try:
+            export_json(path, self._network)
+        except OSError as exc:
+            self.show_error(str(exc))
+
 
 def launch_ui(network: Network = None):
     if network is None:
@@ -303,16 +453,24 @@ def launch_ui(network: Network = None):
 
     app = QApplication(sys.argv)
     main = MainWindow(network=network)
-    try:
-        get_solvers()
-    except EnvironmentError:
-        msg = QMessageBox()
-        msg.setIcon(QMessageBox.Critical)
-        msg.setWindowTitle("Error")
-        msg.setText("No available solvers")
-        msg.exec_()
-        return
+
+    def check_solvers():
+        from cvrp.solver import get_solvers
+
+        try:
+            get_solvers()
+        except EnvironmentError:
+            msg = QMessageBox()
+            msg.setIcon(QMessageBox.Critical)
+            msg.setWindowTitle("Error")
+            msg.setText("No available solvers")
+            msg.exec_()
+            app.quit()
 
     main.show()
+
+    # Looking solvers up loads Pyomo, so it is done once the window is painted
+    QTimer.singleShot(0, check_solvers)
+
     sys.exit(app.exec())
 
@@ -0,0 +1,279 @@
+from numpy import arange, argsort, array, concatenate, delete, empty_like
+from PyQt5.QtCore import *
+
+from cvrp.data import Network, Place, Vehicle
+
+# Role returning raw column values
+SortRole = Qt.UserRole + 1
+
+# Role returning the Place/Vehicle displayed in the row
+ItemRole = Qt.UserRole + 2
+
+
+class NetworkTableModel(QAbstractTableModel):
+    """
+    Table model over a list stored in Network.
+
+    Rows are loaded lazily in batches of fetch_batch as the view scrolls,
+    changes of single items are reported as fine-grained row signals.
+    Sorting is done here on all values at once (with NumPy), rows are then
+    mapped through a permutation of network list positions.
+    """
+
+    columns = []
+    fetch_batch = 1000
+
+    def __init__(self, network: Network, parent=None):
+        super().__init__(parent)
+        self._network = network
+        self._loaded = min(self.fetch_batch, self.item_count())
+        self._order = None
+        self._inverse = None
+
+    def item_count(self) -> int:
+        raise NotImplementedError()
+
+    def _item(self, position: int):
+        raise NotImplementedError()
+
+    def _position_of(self, item) -> int:
+        raise NotImplementedError()
+
+    def _remove(self, item):
+        raise NotImplementedError()
+
+    def item_at(self, row: int):
+        return self._item(row if self._order is None else int(self._order[row]))
+
+    def row_of(self, item) -> int:
+        position = self._position_of(item)
+
+        if position < 0 or self._order is None:
+            return position
+
+        return int(self._inverse[position])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < self.item_count()
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+
+        count = min(self.fetch_batch, self.item_count() - self._loaded)
+
+        if count <= 0:
+            return
+
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def fetch_all(self):
+        """
+        Load all remaining rows at once (filtering and sorting need all of them).
+        """
+
+        if self.canFetchMore():
+            self.beginInsertRows(QModelIndex(), self._loaded, self.item_count() - 1)
+            self._loaded = self.item_count()
+            self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+
+        item = self.item_at(index.row())
+
+        if role == ItemRole:
+            return item
+
+        _, value, fmt = self.columns[index.column()]
+        raw = value(item)
+
+        if role == SortRole:
+            return raw
+
+        if role == Qt.DisplayRole:
+            return fmt.format(raw)
+
+        if role == Qt.TextAlignmentRole and index.column() > 0:
+            return Qt.AlignRight | Qt.AlignVCenter
+
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section][0]
+
+        return super().headerData(section, orientation, role)
+
+    def sort_items(self, column: int, order=Qt.AscendingOrder):
+        """
+        Sort rows by column values, column < 0 restores network order.
+        """
+
+        if column < 0 and self._order is None:
+            return
+
+        self.fetch_all()
+        self.layoutAboutToBeChanged.emit()
+
+        old_persistent = self.persistentIndexList()
+        old_items = [self.item_at(index.row()) for index in old_persistent]
+
+        if column < 0:
+            self._order = self._inverse = None
+        else:
+            _, value, _ = self.columns[column]
+            keys = [value(self._item(i)) for i in range(self.item_count())]
+
+            if keys and isinstance(keys[0], str):
+                keys = [key.lower() for key in keys]
+
+            self._order = argsort(array(keys), kind="stable")
+
+            if order == Qt.DescendingOrder:
+                self._order = self._order[::-1].copy()
+
+            self._inverse = empty_like(self._order)
+            self._inverse[self._order] = arange(len(self._order))
+
+        self.changePersistentIndexList(
+            old_persistent,
+            [self.index(self.row_of(item), index.column()) for item, index in zip(old_items, old_persistent)]
+        )
+        self.layoutChanged.emit()
+
+    def item_changed(self, item):
+        row = self.row_of(item)
+
+        if 0 <= row < self._loaded:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+
+    def items_added(self, count: int = 1):
+        """
+        Report items appended to the end of the network list.
+        """
+
+        if count <= 0:
+            return
+
+        # New items are shown at the end, regardless of sort order
+        if self._order is not None:
+            self._order = concatenate((self._order, arange(len(self._order), self.item_count())))
+            self._inverse = concatenate((self._inverse, arange(len(self._inverse), self.item_count())))
+
+        # Rows beyond the loaded part are picked up later by fetchMore
+        if self._loaded + count < self.item_count():
+            return
+
+        count = min(count, self.fetch_batch)
+
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def remove_item(self, item):
+        position = self._position_of(item)
+        row = self.row_of(item)
+
+        if row < 0:
+            return
+
+        if row < self._loaded:
+            self.beginRemoveRows(QModelIndex(), row, row)
+
+        self._remove(item)
+
+        if self._order is not None:
+            self._order = delete(self._order, row)
+            self._order[self._order > position] -= 1
+            self._inverse = empty_like(self._order)
+            self._inverse[self._order] = arange(len(self._order))
+
+        if row < self._loaded:
+            self._loaded -= 1
+            self.endRemoveRows()
+
+
+class PlaceTableModel(NetworkTableModel):
+    columns = [
+        ("Name", lambda p: p.name, "{}"),
+        ("Latitude", lambda p: p.latitude, "{:.4f}"),
+        ("Longitude", lambda p: p.longitude, "{:.4f}"),
+        ("Demand", lambda p: p.demand, "{:.2f}"),
+        ("Service Time", lambda p: p.service_time, "{:.0f}"),
+        ("Ready Time", lambda p: p.ready_time, "{:.0f}"),
+        ("Due Time", lambda p: p.due_time, "{:.0f}"),
+    ]
+
+    def item_count(self) -> int:
+        return len(self._network.clients) + 1
+
+    def _item(self, position: int) -> Place:
+        # Network.all_places builds a new list, so rows are resolved directly
+        return self._network.depot if position == 0 else self._network.clients[position - 1]
+
+    def _position_of(self, item: Place) -> int:
+        if item is self._network.depot:
+            return 0
+
+        try:
+            return self._network.clients.index(item) + 1
+        except ValueError:
+            return -1
+
+    def _remove(self, item: Place):
+        self._network.remove_client(item)
+
+
+class VehicleTableModel(NetworkTableModel):
+    columns = [
+        ("Name", lambda v: v.name, "{}"),
+        ("Max Capacity", lambda v: v.max_capacity, "{:.2f}"),
+        ("Shift Length", lambda v: v.shift_length, "{:.0f}"),
+    ]
+
+    def item_count(self) -> int:
+        return len(self._network.vehicles)
+
+    def _item(self, position: int) -> Vehicle:
+        return self._network.vehicles[position]
+
+    def _position_of(self, item: Vehicle) -> int:
+        try:
+            return self._network.vehicles.index(item)
+        except ValueError:
+            return -1
+
+    def _remove(self, item: Vehicle):
+        self._network.remove_vehicle(item)
+
+
+class NetworkFilterProxyModel(QSortFilterProxyModel):
+    """
+    Case-insensitive filtering by name, sorting is delegated to the source
+    model (sorting here would query every row through data()).
+    """
+
+    def __init__(self, source: NetworkTableModel, parent=None):
+        super().__init__(parent)
+        self.setSourceModel(source)
+        self.setFilterKeyColumn(0)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+    def set_filter(self, text: str):
+        if text:
+            self.sourceModel().fetch_all()
+
+        self.setFilterFixedString(text)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort_items(column, order)
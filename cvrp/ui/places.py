@@ -1,3 +1,5 @@
+from math import inf, isfinite
+
 from PyQt5.QtWidgets import *
 
 from cvrp.ui.mixins import OnCloseCallbackMixin
@@ -37,6 +39,17 @@ class PlaceFormWidget(QWidget):
             self.demand_input.setValue(self._place.demand)
             self.layout.addRow("Demand", self.demand_input)
 
+            self.service_input = self._time_input(self._place.service_time)
+            self.layout.addRow("Service Time [min]", self.service_input)
+
+        self.ready_input = self._time_input(self._place.ready_time)
+        self.layout.addRow("Opens at [min]" if self._is_depot else "Ready Time [min]", self.ready_input)
+
+        # Minimum value of the input means no deadline
+        self.due_input = self._time_input(self._place.due_time if isfinite(self._place.due_time) else 0.0)
+        self.due_input.setSpecialValueText("Closes never" if self._is_depot else "No deadline")
+        self.layout.addRow("Closes at [min]" if self._is_depot else "Due Time [min]", self.due_input)
+
         self.save_button = QPushButton("Save")
         self.save_button.clicked.connect(self.save_place)
         self.layout.addWidget(self.save_button)
@@ -47,8 +60,21 @@ class PlaceFormWidget(QWidget):
         self._place.longitude = self.lng_input.value()
         self._place.demand = 0.0 if self._is_depot else self.demand_input.value()
 
+        self._place.service_time = 0.0 if self._is_depot else self.service_input.value()
+        self._place.ready_time = self.ready_input.value()
+        self._place.due_time = self.due_input.value() if self.due_input.value() > 0.0 else inf
+
         self.window().close()
 
+    @staticmethod
+    def _time_input(value: float) -> QDoubleSpinBox:
+        time_input = QDoubleSpinBox()
+        time_input.setMaximum(100000.0)
+        time_input.setSingleStep(5.0)
+        time_input.setValue(value)
+
+        return time_input
+
 
 class PlaceFormWindow(OnCloseCallbackMixin, QMainWindow):
     def closeEvent(self, event):
@@ -62,7 +88,7 @@ class PlaceFormWindow(OnCloseCallbackMixin, QMainWindow):
         super().__init__(*args, **kwargs)
 
         self.setWindowTitle("Edit Place")
-        self.setFixedSize(300, 150)
+        self.setFixedSize(300, 250)
 
         self.main_widget = PlaceFormWidget(place=self._place, is_depot=self._is_depot)
         self.setCentralWidget(self.main_widget)
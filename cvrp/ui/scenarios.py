@@ -0,0 +1,206 @@
+import os
+import webbrowser
+from datetime import datetime
+
+from PyQt5.QtCore import *
+from PyQt5.QtWidgets import *
+
+from cvrp.data import Network
+from cvrp.pipeline import Solution
+from cvrp.report import write_report
+from cvrp.scenarios import Scenario, clone_network, extra_vehicle_scenario, scaled_demand_scenario, solve_scenarios
+from cvrp.ui.mixins import OnCloseCallbackMixin
+
+SCENARIO_COLUMNS = ["Scenario", "Total Distance [km]", "Routes Used", "Solve Time [s]", "Status"]
+
+
+class ScenarioSignals(QObject):
+    # Scenario shown in the GUI, its solved copy
+    solved = pyqtSignal(object, object)
+    finished = pyqtSignal()
+
+
+class ScenarioSolveRunnable(QRunnable):
+    """
+    Solves scenarios on a worker thread (which waits for the process pool),
+    every solved scenario is passed back through signals.
+
+    Copies of the scenarios are solved, results are taken over by the
+    scenarios shown in the GUI on its thread (see ScenarioWidget.on_solved).
+    """
+
+    def __init__(self, network: Network, scenarios: [Scenario]):
+        super().__init__()
+        self.network = network
+        self.scenarios = list(scenarios)
+        self.signals = ScenarioSignals()
+
+    def run(self):
+        copies = [Scenario(scenario.name, scenario.network) for scenario in self.scenarios]
+        original = {id(copy): scenario for copy, scenario in zip(copies, self.scenarios)}
+
+        try:
+            solve_scenarios(
+                self.network, copies, progress=lambda copy: self.signals.solved.emit(original[id(copy)], copy)
+            )
+        except Exception as exc:
+            # Process pool could not be started, unfinished scenarios fail with it
+            for copy in copies:
+                if not copy.solved and copy.error is None:
+                    copy.error = f"{type(exc).__name__}: {exc}"
+                    self.signals.solved.emit(original[id(copy)], copy)
+        finally:
+            self.signals.finished.emit()
+
+
+class ScenarioWidget(QWidget):
+    def __init__(self, *args, **kwargs):
+        self._network = kwargs.pop("network")
+
+        super().__init__(*args, **kwargs)
+
+        self.scenarios = [Scenario("Current network", clone_network(self._network))]
+
+        self.layout = QVBoxLayout()
+        self.setLayout(self.layout)
+
+        self.buttons = QWidget(self)
+        self.buttons_layout = QHBoxLayout()
+        self.buttons.setLayout(self.buttons_layout)
+        self.layout.addWidget(self.buttons)
+
+        self.add_vehicle_button = QPushButton("Add Vehicle")
+        self.add_vehicle_button.clicked.connect(self.on_add_vehicle)
+        self.buttons_layout.addWidget(self.add_vehicle_button)
+
+        self.change_demand_button = QPushButton("Change Demand...")
+        self.change_demand_button.clicked.connect(self.on_change_demand)
+        self.buttons_layout.addWidget(self.change_demand_button)
+
+        self.remove_button = QPushButton("Remove")
+        self.remove_button.clicked.connect(self.on_remove)
+        self.buttons_layout.addWidget(self.remove_button)
+
+        self.table = QTableWidget(0, len(SCENARIO_COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(SCENARIO_COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.layout.addWidget(self.table)
+
+        self.actions = QWidget(self)
+        self.actions_layout = QHBoxLayout()
+        self.actions.setLayout(self.actions_layout)
+        self.layout.addWidget(self.actions)
+
+        self.solve_button = QPushButton("Solve All")
+        self.solve_button.clicked.connect(self.on_solve)
+        self.actions_layout.addWidget(self.solve_button)
+
+        self.report_button = QPushButton("Show Report")
+        self.report_button.clicked.connect(self.on_report)
+        self.actions_layout.addWidget(self.report_button)
+
+        self.refresh()
+
+    def selected_scenario(self) -> Scenario:
+        rows = self.table.selectionModel().selectedRows()
+
+        return self.scenarios[rows[0].row()] if rows else None
+
+    def refresh(self):
+        self.table.setRowCount(len(self.scenarios))
+
+        for row, scenario in enumerate(self.scenarios):
+            if scenario.solved:
+                status = "Solved"
+            elif scenario.error is not None:
+                status = scenario.error
+            else:
+                status = "Not solved"
+
+            values = [
+                scenario.name,
+                f"{scenario.cost:.2f}" if scenario.cost is not None else "-",
+                str(scenario.routes_used) if scenario.routes_used is not None else "-",
+                f"{scenario.solve_time:.2f}" if scenario.solve_time is not None else "-",
+                status,
+            ]
+
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+
+    def on_add_vehicle(self):
+        self.scenarios.append(extra_vehicle_scenario(self._network))
+        self.refresh()
+
+    def on_change_demand(self):
+        clients = self._network.clients
+
+        if not clients:
+            return
+
+        names = [f"{i + 1}. {c.name}" for i, c in enumerate(clients)]
+        name, ok = QInputDialog.getItem(self, "Change Demand", "Client", names, 0, False)
+
+        if not ok:
+            return
+
+        factor, ok = QInputDialog.getDouble(self, "Change Demand", "Demand multiplier", 2.0, 0.0, 1000.0, 2)
+
+        if ok:
+            self.scenarios.append(scaled_demand_scenario(self._network, clients[names.index(name)], factor))
+            self.refresh()
+
+    def on_remove(self):
+        scenario = self.selected_scenario()
+
+        if scenario is not None:
+            self.scenarios.remove(scenario)
+            self.refresh()
+
+    def on_solve(self):
+        self.solve_button.setDisabled(True)
+        runnable = ScenarioSolveRunnable(self._network, self.scenarios)
+        runnable.signals.solved.connect(self.on_solved)
+        runnable.signals.finished.connect(lambda: self.solve_button.setDisabled(False))
+
+        QThreadPool.globalInstance().start(runnable)
+
+    def on_solved(self, scenario: Scenario, solved: Scenario):
+        scenario.copy_result(solved)
+        self.refresh()
+
+    def on_report(self):
+        scenario = self.selected_scenario()
+
+        if scenario is None or not scenario.solved:
+            return
+
+        solution = Solution(scenario.network, scenario.routes, scenario.cost, "heuristic")
+
+        dir_name = "report-" + datetime.now().strftime('%Y-%m-%d_%H.%M.%S')
+        abs_dir_path = os.path.join(os.path.expanduser("~"), dir_name)
+        os.makedirs(abs_dir_path, exist_ok=True)
+
+        abs_file_path, *_ = write_report(solution, None, os.path.join(abs_dir_path, "report.html"))
+
+        webbrowser.open(abs_file_path)
+
+
+class ScenarioWindow(OnCloseCallbackMixin, QMainWindow):
+    def closeEvent(self, event):
+        self.on_close()
+        super().closeEvent(event)
+
+    def __init__(self, *args, **kwargs):
+        self._network = kwargs.pop("network")
+
+        super().__init__(*args, **kwargs)
+
+        self.setWindowTitle("Compare Scenarios")
+        self.resize(700, 350)
+
+        self.main_widget = ScenarioWidget(network=self._network)
+        self.setCentralWidget(self.main_widget)
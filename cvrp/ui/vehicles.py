@@ -1,3 +1,5 @@
+from math import inf, isfinite
+
 from PyQt5.QtWidgets import *
 
 from cvrp.ui.mixins import OnCloseCallbackMixin
@@ -22,6 +24,16 @@ class VehicleFormWidget(QWidget):
         self.max_capacity_input.setValue(self._vehicle.max_capacity)
         self.layout.addRow("Max Capacity", self.max_capacity_input)
 
+        # Minimum value of the input means unlimited shift
+        self.shift_length_input = QDoubleSpinBox()
+        self.shift_length_input.setMaximum(100000.0)
+        self.shift_length_input.setSingleStep(30.0)
+        self.shift_length_input.setSpecialValueText("Unlimited")
+        self.shift_length_input.setValue(
+            self._vehicle.shift_length if isfinite(self._vehicle.shift_length) else 0.0
+        )
+        self.layout.addRow("Shift Length [min]", self.shift_length_input)
+
         self.save_button = QPushButton("Save")
         self.save_button.clicked.connect(self.save_vehicle)
         self.layout.addWidget(self.save_button)
@@ -29,6 +41,7 @@ class VehicleFormWidget(QWidget):
     def save_vehicle(self):
         self._vehicle.name = self.name_input.text()
         self._vehicle.max_capacity = self.max_capacity_input.value()
+        self._vehicle.shift_length = self.shift_length_input.value() if self.shift_length_input.value() > 0.0 else inf
 
         self.window().close()
 
@@ -44,7 +57,7 @@ class VehicleFormWindow(OnCloseCallbackMixin, QMainWindow):
         super().__init__(*args, **kwargs)
 
         self.setWindowTitle("Edit Vehicle")
-        self.setFixedSize(300, 150)
+        self.setFixedSize(300, 180)
 
         self.main_widget = VehicleFormWidget(vehicle=self._vehicle)
         self.setCentralWidget(self.main_widget)
@@ -0,0 +1,264 @@
+from numpy import arange, array, bincount, concatenate, cumsum, flatnonzero, int64, ndarray, ones, repeat, zeros
+
+from cvrp.data import Network
+from cvrp.geo import geo_dist_pairs
+from cvrp.heuristics import EPSILON, from_vehicle_routes, network_time_windows
+
+# Number of offending items listed in a single error message
+MAX_LISTED = 10
+
+
+class ValidationResult:
+    """
+    Outcome of a solution check.
+
+    :ivar errors: Descriptions of violated conditions (empty if solution is valid)
+    :ivar route_distances: Distance of every route (aligned with Network.vehicles)
+    :ivar route_loads: Load of every route (aligned with Network.vehicles)
+    """
+
+    def __init__(self, errors: [str], route_distances: ndarray, route_loads: ndarray):
+        self.errors = errors
+        self.route_distances = route_distances
+        self.route_loads = route_loads
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    @property
+    def total_distance(self) -> float:
+        return float(self.route_distances.sum())
+
+    @property
+    def total_load(self) -> float:
+        return float(self.route_loads.sum())
+
+    def __bool__(self):
+        return self.valid
+
+    def __repr__(self):
+        return f"ValidationResult(valid={self.valid}, total_distance={self.total_distance:.2f}, errors={self.errors})"
+
+
+def _listed(indices, name: callable = None) -> str:
+    items = [name(i) if name is not None else str(i) for i in indices[:MAX_LISTED]]
+    suffix = f" and {len(indices) - MAX_LISTED} more" if len(indices) > MAX_LISTED else ""
+
+    return ", ".join(items) + suffix
+
+
+def validate_arcs(place_from: ndarray, place_to: ndarray, route_of: ndarray, lat: ndarray, lon: ndarray,
+                  demands: ndarray, capacities: ndarray, place_name: callable = None,
+                  vehicle_name: callable = None) -> ValidationResult:
+    """
+    Check a solution given as arrays of arcs (ordered route after route).
+
+    Every route has to be a single path leaving the depot (place 0),
+    visiting clients only and returning to the depot, every client has to be
+    visited exactly once and route loads must not exceed vehicle capacities.
+
+    :param place_from: Start place index of every arc
+    :param place_to: End place index of every arc
+    :param route_of: Route (vehicle index) of every arc, non-decreasing
+    :param lat: Place latitudes (depot first)
+    :param lon: Place longitudes (depot first)
+    :param demands: Place demands (depot first)
+    :param capacities: Vehicle capacities
+    :param place_name: Returns name of place index for error messages (indices are used if None)
+    :param vehicle_name: Returns name of vehicle index for error messages (indices are used if None)
+    :returns: Validation result with distances and loads of routes
+    """
+
+    n, vehicles = len(lat), len(capacities)
+    errors = []
+
+    place_from, place_to = place_from.astype(int64), place_to.astype(int64)
+    route_of = route_of.astype(int64)
+
+    first = ones(len(route_of), dtype=bool)
+    first[1:] = route_of[1:] != route_of[:-1]
+    last = ones(len(route_of), dtype=bool)
+    last[:-1] = first[1:]
+
+    broken = flatnonzero(~first & (place_from != concatenate(([0], place_to[:-1]))))
+
+    if len(broken):
+        errors.append(f"Routes are not continuous: {_listed(route_of[broken], vehicle_name)}")
+
+    not_from_depot = flatnonzero(first & (place_from != 0))
+
+    if len(not_from_depot):
+        errors.append(f"Routes do not start at the depot: {_listed(route_of[not_from_depot], vehicle_name)}")
+
+    not_to_depot = flatnonzero(last & (place_to != 0))
+
+    if len(not_to_depot):
+        errors.append(f"Routes do not end at the depot: {_listed(route_of[not_to_depot], vehicle_name)}")
+
+    stops = place_to[~last]
+    stop_routes = route_of[~last]
+
+    depot_visits = flatnonzero(stops == 0)
+
+    if len(depot_visits):
+        errors.append(f"Routes return to the depot early (subtours): {_listed(stop_routes[depot_visits], vehicle_name)}")
+
+    visits = bincount(stops, minlength=n)
+
+    missing = flatnonzero(visits[1:] == 0) + 1
+
+    if len(missing):
+        errors.append(f"Clients not visited: {_listed(missing, place_name)}")
+
+    repeated = flatnonzero(visits[1:] > 1) + 1
+
+    if len(repeated):
+        errors.append(f"Clients visited more than once: {_listed(repeated, place_name)}")
+
+    loads = bincount(stop_routes, weights=demands[stops], minlength=vehicles)
+    overloaded = flatnonzero(loads > capacities + EPSILON)
+
+    if len(overloaded):
+        errors.append(f"Vehicles over capacity: {_listed(overloaded, vehicle_name)}")
+
+    lengths = geo_dist_pairs(lat[place_from], lon[place_from], lat[place_to], lon[place_to])
+    distances = bincount(route_of, weights=lengths, minlength=vehicles)
+
+    return ValidationResult(errors, distances, loads)
+
+
+def _place_arrays(network: Network) -> (ndarray, ndarray, ndarray):
+    demands = array([p.demand for p in network.all_places], dtype=float)
+    demands[0] = 0.0
+
+    return network.latitudes, network.longitudes, demands
+
+
+def _names(network: Network) -> (callable, callable):
+    return lambda i: network.all_places[i].name, lambda k: network.vehicles[k].name
+
+
+def _time_errors(network: Network, routes: [[int]]) -> [str]:
+    """
+    Time windows and shift lengths violated by well-formed index routes
+    (services start as early as possible).
+    """
+
+    times = network_time_windows(network)
+
+    if times is None:
+        return []
+
+    late, over_shift = [], []
+
+    for k, route in enumerate(routes):
+        if not route:
+            continue
+
+        earliest, _ = times.schedule(route, k)
+        late.extend(u for u, start in zip(route, earliest[1:]) if start > times.due[u] + EPSILON)
+
+        if earliest[-1] > times.returns[k] + EPSILON:
+            over_shift.append(k)
+
+    place_name, vehicle_name = _names(network)
+    errors = []
+
+    if late:
+        errors.append(f"Clients served after their time windows: {_listed(late, place_name)}")
+
+    if over_shift:
+        errors.append(f"Vehicles returning after their shifts: {_listed(over_shift, vehicle_name)}")
+
+    return errors
+
+
+def validate_routes(network: Network, routes: [[int]]) -> ValidationResult:
+    """
+    Check index routes (as used by heuristics, aligned with Network.vehicles).
+    """
+
+    lengths = array([len(route) for route in routes], dtype=int64)
+    clients = array([u for route in routes for u in route], dtype=int64)
+    used = lengths > 0
+
+    # Every used route with k clients takes k + 2 slots (depot, clients, depot)
+    slots = (lengths + 2) * used
+    offsets = cumsum(slots) - slots
+    sequence = zeros(int(slots.sum()), dtype=int64)
+
+    client_routes = repeat(arange(len(routes)), lengths)
+    client_positions = arange(len(clients)) - repeat(cumsum(lengths) - lengths, lengths)
+    sequence[offsets[client_routes] + 1 + client_positions] = clients
+
+    # Arcs connect consecutive slots of the same route
+    arc_starts = ones(len(sequence), dtype=bool)
+    arc_starts[(offsets + slots - 1)[used]] = False
+    arc_starts = flatnonzero(arc_starts)
+
+    place_from, place_to = sequence[arc_starts], sequence[arc_starts + 1]
+    route_of = repeat(arange(len(routes)), (lengths + 1) * used)
+
+    lat, lon, demands = _place_arrays(network)
+
+    result = validate_arcs(
+        place_from, place_to, route_of, lat, lon, demands, network.vehicle_capacities,
+        *_names(network)
+    )
+
+    if result.valid:
+        result.errors = _time_errors(network, routes)
+
+    return result
+
+
+def validate(network: Network, vehicle_routes: dict) -> ValidationResult:
+    """
+    Check solution in CVRPModel.vehicle_routes format and evaluate its cost.
+
+    Time windows and shifts are checked for solutions valid otherwise.
+
+    :param network: Network
+    :param vehicle_routes: Ordered arcs (from slug, to slug) of every vehicle
+    :returns: Validation result with distances and loads of routes
+    """
+
+    places = network.all_places
+    index = {p.slug_name: i for i, p in enumerate(places)}
+    vehicle_index = {v.slug_name: k for k, v in enumerate(network.vehicles)}
+    errors = []
+
+    unknown_vehicles = [slug for slug in vehicle_routes if slug not in vehicle_index]
+
+    if unknown_vehicles:
+        errors.append(f"Unknown vehicles: {_listed(unknown_vehicles)}")
+
+    arcs = [
+        (vehicle_index[slug], route)
+        for slug, route in vehicle_routes.items() if slug in vehicle_index and route
+    ]
+    arcs.sort(key=lambda item: item[0])
+
+    unknown_places = {
+        slug for _, route in arcs for arc in route for slug in arc if slug not in index
+    }
+
+    if unknown_places:
+        errors.append(f"Unknown places: {_listed(sorted(unknown_places))}")
+        arcs = []
+
+    route_of = repeat(array([k for k, _ in arcs], dtype=int64), [len(route) for _, route in arcs])
+    flat = array([index[slug] for _, route in arcs for arc in route for slug in arc], dtype=int64)
+
+    lat, lon, demands = _place_arrays(network)
+    result = validate_arcs(
+        flat[0::2], flat[1::2], route_of, lat, lon, demands, network.vehicle_capacities,
+        *_names(network)
+    )
+    result.errors = errors + result.errors
+
+    if result.valid:
+        result.errors = _time_errors(network, from_vehicle_routes(network, vehicle_routes))
+
+    return result
@@ -61,3 +61,37 @@ def network(num_clients=10, num_vehicles=4):
         ))
 
     return net
+
+
+@pytest.fixture
+def time_window_network(num_clients=30, num_vehicles=8):
+    rnd = random.Random(7)
+    net = Network()
+
+    net.depot = Place(
+        name="Central Depot",
+        lat=52.0,
+        lon=21.0
+    )
+
+    for i in range(num_clients):
+        ready_time = rnd.uniform(0, 360)
+
+        net.add_client(Place(
+            name=f"Client {i}",
+            lat=52.0 + rnd.uniform(-0.3, 0.3),
+            lon=21.0 + rnd.uniform(-0.3, 0.3),
+            demand=rnd.randint(1, 10),
+            service_time=10,
+            ready_time=ready_time,
+            due_time=ready_time + 60
+        ))
+
+    for i in range(num_vehicles):
+        net.add_vehicle(Vehicle(
+            name=f"Vehicle {i}",
+            max_capacity=40,
+            shift_length=540
+        ))
+
+    return net
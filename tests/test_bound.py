@@ -0,0 +1,15 @@
+from cvrp.bound import RelaxedCVRPModel
+
+
+def test_relaxed_model(network):
+    model = RelaxedCVRPModel(network)
+    n = len(network.all_places)
+
+    assert len(model.x) == n * n
+    assert len(model.con_cuts) == 0
+
+    clients = [c.slug_name for c in network.clients]
+    model.add_cut(clients[:2], 1)
+    model.add_cut(clients, len(clients) - 2)
+
+    assert len(model.con_cuts) == 2
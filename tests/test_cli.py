@@ -0,0 +1,99 @@
+import json
+import subprocess
+import sys
+
+from cvrp.cli import main
+from cvrp.storage import save
+
+
+def test_info(network, tmp_path, capsys):
+    path = str(tmp_path / "network.cvrp")
+    save(path, network)
+
+    assert main(["info", path]) == 0
+    assert f"Clients: {len(network.clients)}" in capsys.readouterr().out
+
+
+def test_export_json(network, tmp_path):
+    path = str(tmp_path / "network.cvrp")
+    output = tmp_path / "network.json"
+    save(path, network)
+
+    assert main(["export-json", path, str(output)]) == 0
+    assert len(json.loads(output.read_text(encoding="utf-8"))["vehicles"]) == len(network.vehicles)
+
+
+def test_invalid_file(tmp_path, capsys):
+    path = tmp_path / "invalid.cvrp"
+    path.write_bytes(b"invalid")
+
+    assert main(["info", str(path)]) == 1
+    assert "Error" in capsys.readouterr().err
+
+
+def test_heavy_dependencies_are_lazy():
+    code = (
+        "import sys, cvrp, cvrp.cli, cvrp.data, cvrp.pipeline, cvrp.report, cvrp.storage\n"
+        "print(','.join(m for m in ('pyomo', 'matplotlib') if m in sys.modules))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert output.stdout.strip() == ""
+
+
+def test_generate(tmp_path, capsys):
+    path = str(tmp_path / "generated.cvrp")
+
+    assert main(["generate", path, "--clients", "25", "--placement", "clustered", "--seed", "3"]) == 0
+    assert "Clients: 25" in capsys.readouterr().out
+
+    assert main(["info", path]) == 0
+    output = capsys.readouterr().out
+
+    assert "Clients: 25" in output
+    assert "'seed': 3" in output
+
+
+def test_batch_resume(tmp_path, capsys):
+    from cvrp.generate import generate
+    from cvrp.heuristics import solve_heuristic
+    from cvrp.journal import Journal, network_fingerprint
+
+    paths = [str(tmp_path / f"network-{i}.cvrp") for i in range(2)]
+    networks = [generate(20, seed=i) for i in range(2)]
+
+    for path, network in zip(paths, networks):
+        save(path, network)
+
+    # First file was interrupted after a checkpoint
+    journal_path = str(tmp_path / "batch.journal")
+    routes = solve_heuristic(networks[0])
+    Journal(journal_path).checkpoint(
+        str(tmp_path / "network-0.cvrp"), routes, 1000.0, fingerprint=network_fingerprint(networks[0])
+    )
+
+    args = ["batch", *paths, "--journal", journal_path, "--output-dir", str(tmp_path / "solved"), "--method", "hgs",
+            "--time-limit", "1", "--seed", "1"]
+
+    assert main(args) == 0
+    output = capsys.readouterr().out
+
+    assert "network-0.cvrp: resuming from 1000.00 km" in output
+    assert output.count("heuristic,") == 2
+    assert (tmp_path / "solved" / "network-1.cvrp").exists()
+
+    assert main(args) == 0
+    assert capsys.readouterr().out.count("finished before") == 2
+
+
+def test_sweep(tmp_path, capsys):
+    from cvrp.generate import generate
+
+    path = str(tmp_path / "network.cvrp")
+    save(path, generate(20, seed=2))
+
+    assert main(["sweep", path, "--vehicles", "1", "4", "--iterations", "5", "--workers", "1"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+
+    assert len(lines) == 6
+    assert any(line.endswith("*") for line in lines[1:5])
@@ -0,0 +1,75 @@
+import pytest
+
+from cvrp.colgen import (
+    RoutePool, SetPartitioningModel, column_generation, initial_pool, price_routes, vehicle_types
+)
+from cvrp.exceptions import TimeConstraintsUnsupportedException
+from cvrp.heuristics import network_arrays, route_length
+
+
+def test_route_pool_keeps_cheapest_sequence(network):
+    dist, demands, _ = network_arrays(network)
+    pool = RoutePool(dist, demands)
+
+    assert pool.add([1, 2, 3])
+    assert not pool.add([3, 2, 1])
+    assert len(pool) == 1
+
+    cost, load, route = pool.routes[0]
+
+    assert cost == route_length(dist, [1, 2, 3])
+    assert load == demands[1] + demands[2] + demands[3]
+
+
+def test_price_routes_without_duals(network):
+    dist, demands, capacities = network_arrays(network)
+    duals = [0.0] * len(dist)
+
+    columns, complete = price_routes(dist.tolist(), demands.tolist(), capacities.max(), duals)
+
+    assert columns == []
+    assert complete
+
+
+def test_price_routes_finds_negative_columns(network):
+    dist, demands, capacities = network_arrays(network)
+    duals = [0.0] + [2 * dist.max()] * (len(dist) - 1)
+
+    columns, _ = price_routes(dist.tolist(), demands.tolist(), capacities.min(), duals, max_columns=5)
+
+    assert 0 < len(columns) <= 5
+
+    for reduced_cost, route in columns:
+        assert reduced_cost < 0
+        assert len(set(route)) == len(route)
+        assert sum(demands[i] for i in route) <= capacities.min()
+
+
+def test_set_partitioning_model_routes(network):
+    dist, demands, capacities = network_arrays(network)
+    pool = initial_pool(network, dist, demands, capacities)
+    model = SetPartitioningModel(network, pool)
+
+    assert len(model.types) == len(vehicle_types(network))
+    assert len(model.clients) == len(network.clients)
+
+    for r, t in model.fits:
+        model.y[r, t].value = 0
+
+    r, t = next((r, t) for r, t in model.fits if model.pool_routes[r][2] == (1,))
+    model.y[r, t].value = 1
+
+    vehicle_routes = model.vehicle_routes()
+    used = [v for v in network.vehicles if vehicle_routes[v.slug_name]]
+
+    assert len(used) == 1
+    assert used[0].max_capacity == model.types_data[t][0]
+    assert vehicle_routes[used[0].slug_name] == [
+        (network.depot.slug_name, network.clients[0].slug_name),
+        (network.clients[0].slug_name, network.depot.slug_name),
+    ]
+
+
+def test_column_generation_rejects_time_constraints(time_window_network):
+    with pytest.raises(TimeConstraintsUnsupportedException):
+        column_generation(time_window_network)
@@ -0,0 +1,94 @@
+from numpy import zeros
+
+from cvrp.cuts import add_cuts, comb_cuts, find_cuts, framed_capacity_cuts, separate_cuts
+from cvrp.model import CVRPModel
+
+
+def _arc_values(n, routes, value=1.0):
+    values = zeros((n, n))
+
+    for route in routes:
+        for a, b in zip(route[:-1], route[1:]):
+            values[a, b] += value
+
+    return values
+
+
+def test_separate_subtours():
+    values = _arc_values(6, [[0, 1, 2, 0], [3, 4, 5, 3]])
+    demands = zeros(6) + 1.0
+
+    cuts = separate_cuts(values, demands, capacity=10.0)
+
+    assert ([3, 4, 5], 2) in cuts
+    assert all(0 not in clients for clients, _ in cuts)
+
+
+def test_separate_capacity_cuts():
+    values = _arc_values(5, [[0, 1, 2, 3, 4, 0]])
+    demands = zeros(5) + 4.0
+
+    cuts = separate_cuts(values, demands, capacity=10.0)
+
+    # 16 units of demand need two vehicles, so at most two arcs between the clients
+    assert ([1, 2, 3, 4], 2) in cuts
+    assert separate_cuts(values, demands, capacity=16.0) == []
+
+
+def test_framed_capacity_cuts():
+    values = _arc_values(4, [[0, 1, 2, 3, 0]])
+    demands = zeros(4) + 6.0
+    demands[0] = 0.0
+
+    # No two clients fit into one vehicle, rounded demand would ask for two
+    assert ([[1, 2, 3]], 0) in framed_capacity_cuts(values, demands, capacity=10.0)
+
+    values = _arc_values(5, [[0, 1, 2, 3, 4, 0]])
+    demands = zeros(5) + 3.0
+    demands[0] = 0.0
+
+    # Path 1-2-3 fits into one vehicle and is a part of its own
+    assert ([[1, 2, 3, 4], [1, 2, 3]], 4) in framed_capacity_cuts(values, demands, capacity=10.0)
+
+    values = _arc_values(5, [[0, 1, 2, 3, 0], [0, 4, 0]])
+
+    assert framed_capacity_cuts(values, demands, capacity=10.0) == []
+
+
+def test_comb_cuts():
+    # Two triangles of half edges joined by three full edges
+    values = _arc_values(7, [[1, 2, 3, 1], [4, 5, 6, 4]], value=0.5)
+    values += _arc_values(7, [[1, 4], [2, 5], [3, 6]])
+
+    cuts = comb_cuts(values)
+
+    assert ([[1, 2, 3], [1, 4], [2, 5], [3, 6]], 4) in cuts
+    assert comb_cuts(_arc_values(7, [[0, 1, 2, 3, 0], [0, 4, 5, 6, 0]])) == []
+
+
+def test_find_cuts():
+    values = _arc_values(7, [[1, 2, 3, 1], [4, 5, 6, 4]], value=0.5)
+    values += _arc_values(7, [[1, 4], [2, 5], [3, 6]])
+    demands = zeros(7) + 1.0
+
+    cuts = find_cuts(values, demands, capacity=10.0)
+    violations = [sum(values[s][:, s].sum() for s in sets) - rhs for sets, rhs in cuts]
+
+    # Subtour of all clients is the most violated
+    assert cuts[0] == ([[1, 2, 3, 4, 5, 6]], 5)
+    assert violations == sorted(violations, reverse=True)
+    assert len(find_cuts(values, demands, capacity=10.0, max_cuts=1)) == 1
+    assert all(len(sets) == 1 for sets, _ in find_cuts(values, demands, capacity=10.0, framed=False, combs=False))
+
+
+def test_model_without_subtours(network):
+    model = CVRPModel(network, subtours=False)
+    n = len(network.all_places)
+
+    assert len(model.con_subtours) == 0
+    assert len(model.con_cuts) == 0
+    assert model.arc_values().shape == (n, n)
+
+    add_cuts(model, [([[1, 2], [3, 4, 5]], 3)])
+
+    assert len(model.con_cuts) == 1
@@ -0,0 +1,45 @@
+from numpy import bincount
+
+from cvrp.data import Network, Place, Vehicle
+from cvrp.decompose import cluster_clients, decompose, decomposed_solve
+from cvrp.heuristics import solve_heuristic
+from tests.test_heuristics import assert_feasible
+
+
+def test_cluster_clients_respects_capacities(network):
+    assignment = cluster_clients(network)
+
+    for k, vehicle in enumerate(network.vehicles):
+        load = network.client_demands[assignment == k].sum()
+
+        assert load <= vehicle.max_capacity
+
+
+def test_cluster_clients_falls_back_to_packing():
+    # Greedy assignment puts both small clients into one vehicle, then the second large one fits nowhere
+    network = Network()
+    network.depot = Place("Depot", 52.0, 21.0)
+    network.add_clients([
+        Place("Small A", 52.0, 21.1, 4), Place("Small B", 52.0, 21.1, 4),
+        Place("Large A", 52.1, 21.0, 6), Place("Large B", 52.1, 21.0, 6),
+    ])
+    network.add_vehicles([Vehicle("Vehicle A", 10), Vehicle("Vehicle B", 10)])
+
+    assignment = cluster_clients(network)
+
+    assert (bincount(assignment, network.client_demands, minlength=2) <= 10).all()
+
+
+def test_decompose_covers_all_clients(network):
+    networks = decompose(network, vehicles_per_cluster=2)
+    clients = [c for sub in networks for c in sub.clients]
+
+    assert sorted(map(id, clients)) == sorted(map(id, network.clients))
+    assert all(sub.depot is network.depot for sub in networks)
+
+
+def test_decomposed_solve(network):
+    vehicle_routes = decomposed_solve(network, solve=solve_heuristic, workers=1)
+
+    assert set(vehicle_routes) == {v.slug_name for v in network.vehicles}
+    assert_feasible(network, vehicle_routes)
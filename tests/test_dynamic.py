@@ -0,0 +1,85 @@
+import pytest
+
+from cvrp.data import Network, Place
+from cvrp.dynamic import update_plan
+from cvrp.exceptions import InsufficientVehiclesException
+from cvrp.heuristics import solve_heuristic
+from tests.test_heuristics import assert_feasible
+
+
+@pytest.mark.parametrize("regret", [True, False])
+def test_update_plan_added(network, regret):
+    plan = solve_heuristic(network)
+    added = [
+        Place("New order A", network.depot.latitude, network.depot.longitude + 0.1, 5),
+        Place("New order B", network.clients[0].latitude, network.clients[0].longitude, 5),
+    ]
+
+    plan = update_plan(network, plan, added=added, regret=regret)
+
+    assert all(client in network.clients for client in added)
+    assert_feasible(network, plan)
+
+
+def test_update_plan_cancelled(network):
+    plan = solve_heuristic(network)
+    cancelled = network.clients[:2]
+
+    plan = update_plan(network, plan, cancelled=cancelled)
+
+    assert all(client not in network.clients for client in cancelled)
+    assert_feasible(network, plan)
+
+
+def test_update_plan_inserts_unplanned_clients(network):
+    plan = {v.slug_name: [] for v in network.vehicles}
+
+    assert_feasible(network, update_plan(network, plan))
+
+
+def test_update_plan_over_capacity(network):
+    plan = solve_heuristic(network)
+    added = [Place("Large order", 0.0, 0.0, max(v.max_capacity for v in network.vehicles))]
+
+    clients = list(network.clients)
+    cancelled = clients[:1]
+
+    with pytest.raises(InsufficientVehiclesException):
+        update_plan(network, plan, added=added, cancelled=cancelled)
+
+    # Failed repair leaves the network as it was
+    assert network.clients == clients
+
+
+def test_update_plan_time_windows(time_window_network):
+    network = time_window_network
+    plan = solve_heuristic(network)
+    added = [
+        Place(f"New order {i}", 52.0 + 0.05 * i, 21.0 - 0.05 * i, 3, service_time=10, ready_time=60.0 * i,
+              due_time=60.0 * i + 90)
+        for i in range(4)
+    ]
+
+    plan = update_plan(network, plan, added=added, cancelled=network.clients[:3])
+
+    assert_feasible(network, plan)
+
+
+def test_update_plan_without_full_matrices(time_window_network, monkeypatch):
+    network = time_window_network
+    plan = solve_heuristic(network)
+    index = network.spatial_index
+
+    def full_matrix(*args, **kwargs):
+        raise AssertionError("Plan repair built a full matrix")
+
+    monkeypatch.setattr(Network, "distance_matrix", full_matrix)
+    monkeypatch.setattr(Network, "travel_time_matrix", full_matrix)
+
+    added = [Place("New order", 52.1, 21.1, 2, service_time=10, ready_time=120, due_time=300)]
+    plan = update_plan(network, plan, added=added, cancelled=network.clients[:1])
+
+    monkeypatch.undo()
+
+    assert network.spatial_index is index
+    assert_feasible(network, plan)
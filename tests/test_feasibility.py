@@ -0,0 +1,44 @@
+import pytest
+
+from cvrp.exceptions import *
+from cvrp.feasibility import (
+    check_feasibility, first_fit_decreasing, min_vehicles_fleet, min_vehicles_l1, min_vehicles_l2
+)
+
+
+def test_min_vehicles_l2():
+    assert min_vehicles_l1([6, 6, 6], 10) == 2
+    assert min_vehicles_l2([6, 6, 6], 10) == 3
+    assert min_vehicles_l2([4, 4, 4], 10) == 2
+    assert min_vehicles_l2([7, 3, 3, 3, 2], 10) == 2
+    assert min_vehicles_l2([3, 0, 2], 0) == 2
+
+
+def test_min_vehicles_fleet():
+    assert min_vehicles_fleet([10, 10, 10], [20, 5, 15]) == 2
+    assert min_vehicles_fleet([10, 10, 10], [5, 5]) == 3
+
+
+def test_first_fit_decreasing():
+    assert first_fit_decreasing([5, 5, 4, 6], [10, 10]) == 2
+    assert first_fit_decreasing([6, 6, 6], [10, 10]) is None
+
+
+def test_check_feasibility_insufficient_vehicles():
+    with pytest.raises(InsufficientVehiclesException):
+        check_feasibility([6, 6, 6], [10, 10])
+
+    with pytest.raises(InsufficientVehiclesException):
+        check_feasibility([30, 30, 30, 5], [35, 35, 20, 20])
+
+
+def test_check_feasibility_excess_vehicles():
+    # Heuristics leave extra vehicles unused, only the exact model rejects them (see pipeline.solve_network)
+    assert check_feasibility([5, 5], [10, 10, 10]) == (1, 1)
+
+
+def test_network_solvable(network):
+    lower, upper = check_feasibility(network.client_demands, network.vehicle_capacities)
+
+    assert network.is_solvable()
+    assert lower <= upper <= len(network.vehicles)
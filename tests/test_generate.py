@@ -0,0 +1,66 @@
+import pytest
+from numpy import hypot
+
+from cvrp.generate import DEMAND_DISTRIBUTIONS, generate, generate_arrays
+
+
+def test_generate_is_reproducible():
+    a = generate(50, placement="mixed", depot="random", capacity_spread=0.2, seed=7)
+    b = generate(50, placement="mixed", depot="random", capacity_spread=0.2, seed=7)
+    c = generate(50, placement="mixed", depot="random", capacity_spread=0.2, seed=8)
+
+    assert (a.latitudes == b.latitudes).all() and (a.longitudes == b.longitudes).all()
+    assert (a.vehicle_capacities == b.vehicle_capacities).all()
+    assert (a.latitudes != c.latitudes).any()
+
+
+@pytest.mark.parametrize("demand", list(DEMAND_DISTRIBUTIONS))
+def test_generated_network_is_solvable(demand):
+    network = generate(200, placement="clustered", demand=demand, capacity_spread=0.3, seed=1)
+
+    assert len(network.clients) == 200
+    assert network.depot.demand == 0.0
+    assert (network.client_demands > 0).all()
+    assert network.is_solvable()
+
+
+@pytest.mark.parametrize("clients", [1, 2, 3])
+def test_small_network_is_solvable(clients):
+    network = generate(clients, capacity_spread=0.5, seed=4)
+
+    assert len(network.vehicles) <= clients
+    assert network.is_solvable()
+
+
+def test_placements():
+    size = 100.0
+    corner = generate_arrays(500, depot="corner", size=size, seed=2)
+    uniform = generate_arrays(500, placement="uniform", size=size, seed=2)
+    clustered = generate_arrays(500, placement="clustered", clusters=3, cluster_spread=2.0, size=size, seed=2)
+
+    assert (corner["x"][0], corner["y"][0]) == (0.0, 0.0)
+    assert ((uniform["x"] >= 0) & (uniform["x"] <= size) & (uniform["y"] >= 0) & (uniform["y"] <= size)).all()
+
+    def mean_nearest(arrays):
+        x, y = arrays["x"][1:], arrays["y"][1:]
+        dist = hypot(x[:, None] - x, y[:, None] - y)
+        dist[range(len(x)), range(len(x))] = float("inf")
+
+        return dist.min(axis=1).mean()
+
+    assert mean_nearest(clustered) < mean_nearest(uniform) / 2
+
+
+def test_route_size_sets_capacity():
+    arrays = generate_arrays(1000, demand="unit", route_size=20, seed=3)
+
+    assert (arrays["capacities"] == 20).all()
+    assert arrays["capacities"].sum() >= 1000
+
+
+def test_invalid_options():
+    with pytest.raises(ValueError):
+        generate_arrays(10, placement="spiral")
+
+    with pytest.raises(ValueError):
+        generate_arrays(10, capacity_spread=1.0)
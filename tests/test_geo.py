@@ -1,5 +1,5 @@
 import pytest
-from cvrp.geo import geo_dist
+from cvrp.geo import geo_dist, geo_dist_matrix
 
 
 def test_geo_dist():
@@ -9,3 +9,15 @@ def test_geo_dist():
     dist = geo_dist(*loc_a, *loc_b)
 
     assert dist == pytest.approx(938.74, 3)
+
+
+def test_geo_dist_matrix():
+    lat = [50.0559, 58.3838, 52.0]
+    lon = [5.4253, 3.0412, 20.0]
+
+    dist = geo_dist_matrix(lat, lon)
+
+    assert dist.shape == (3, 3)
+    assert dist[0, 1] == pytest.approx(geo_dist(lat[0], lon[0], lat[1], lon[1]))
+    assert dist[1, 0] == pytest.approx(dist[0, 1])
+    assert dist.diagonal() == pytest.approx(0.0)
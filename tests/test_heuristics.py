@@ -0,0 +1,72 @@
+from cvrp.heuristics import (
+    from_vehicle_routes, network_arrays, nearest_neighbours, network_time_windows, savings_routes, solve_heuristic,
+    to_vehicle_routes, local_search, total_length
+)
+from cvrp.validate import validate
+
+
+def assert_feasible(network, vehicle_routes):
+    result = validate(network, vehicle_routes)
+
+    assert result.valid, result.errors
+
+
+def test_vehicle_routes_conversion(network):
+    routes = [[1, 2], [3], [], list(range(4, len(network.all_places)))]
+    vehicle_routes = to_vehicle_routes(network, routes)
+
+    assert vehicle_routes[network.vehicles[2].slug_name] == []
+    assert vehicle_routes[network.vehicles[1].slug_name] == [
+        (network.depot.slug_name, network.clients[2].slug_name),
+        (network.clients[2].slug_name, network.depot.slug_name),
+    ]
+    assert from_vehicle_routes(network, vehicle_routes) == routes
+
+
+def test_nearest_neighbours(network):
+    dist, _, _ = network_arrays(network)
+    neighbours = nearest_neighbours(dist, k=3)
+
+    for i, candidates in enumerate(neighbours):
+        assert len(candidates) == 3
+        assert i not in candidates and 0 not in candidates
+        assert [dist[i][j] for j in candidates] == sorted(dist[i][j] for j in candidates)
+
+
+def test_local_search_does_not_worsen(network):
+    dist, demands, capacities = network_arrays(network)
+    routes = savings_routes(dist, demands, capacities)
+    improved = local_search(dist, demands, capacities, routes)
+
+    assert total_length(dist, improved) <= total_length(dist, routes) + 1e-9
+    assert_feasible(network, to_vehicle_routes(network, improved))
+
+
+def test_solve_heuristic(network):
+    assert_feasible(network, solve_heuristic(network))
+
+
+def test_solve_heuristic_time_windows(time_window_network):
+    network = time_window_network
+    dist, demands, capacities = network_arrays(network)
+    routes = local_search(dist, demands, capacities, savings_routes(dist, demands, capacities))
+
+    # Windows are binding, routes ignoring them are late
+    assert not validate(network, to_vehicle_routes(network, routes)).valid
+    assert_feasible(network, solve_heuristic(network))
+
+
+def test_insertion_check_matches_schedule(time_window_network):
+    network = time_window_network
+    times = network_time_windows(network)
+    routes = from_vehicle_routes(network, solve_heuristic(network))
+    u = routes[0].pop(0)
+
+    for k, route in enumerate(routes):
+        earliest, latest = times.schedule(route, k)
+        stops = [0] + route + [0]
+
+        for pos in range(len(stops) - 1):
+            fits = times.path_fits(earliest[pos], stops[pos], [u], stops[pos + 1], latest[pos + 1])
+
+            assert fits == times.feasible(route[:pos] + [u] + route[pos:], k)
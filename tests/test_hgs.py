@@ -0,0 +1,132 @@
+import random
+from itertools import product
+
+from pytest import approx
+
+from cvrp.data import Vehicle
+from cvrp.generate import generate
+from cvrp.heuristics import (
+    from_vehicle_routes, network_arrays, network_time_windows, solve_heuristic, total_length
+)
+from cvrp.hgs import hybrid_genetic_search, order_crossover, split, split_time_windows
+from cvrp.pipeline import Solution
+from cvrp.report import generate_report
+from tests.test_heuristics import assert_feasible
+
+
+def _best_split(dist, demands, tour, capacity, max_routes=None):
+    """
+    Cheapest split by enumerating all cut positions.
+    """
+
+    best = None
+
+    for cuts in product((False, True), repeat=len(tour) - 1):
+        routes, route = [], [tour[0]]
+
+        for cut, u in zip(cuts, tour[1:]):
+            if cut:
+                routes.append(route)
+                route = []
+
+            route.append(u)
+
+        routes.append(route)
+
+        if max_routes is not None and len(routes) > max_routes:
+            continue
+
+        if any(sum(demands[u] for u in route) > capacity for route in routes):
+            continue
+
+        cost = total_length(dist, routes)
+        best = cost if best is None else min(best, cost)
+
+    return best
+
+
+def test_split_is_optimal():
+    rng = random.Random(1)
+
+    for _ in range(50):
+        n = rng.randint(1, 8)
+        dist = [[0.0 if i == j else rng.uniform(1, 10) for j in range(n + 1)] for i in range(n + 1)]
+        demands = [0] + [rng.randint(1, 5) for _ in range(n)]
+        tour = rng.sample(range(1, n + 1), n)
+        capacity = rng.randint(5, 12)
+
+        assert total_length(dist, split(dist, demands, tour, capacity)) == approx(
+            _best_split(dist, demands, tour, capacity)
+        )
+
+        for max_routes in (1, 2, 3):
+            routes = split(dist, demands, tour, capacity, max_routes)
+            best = _best_split(dist, demands, tour, capacity, max_routes)
+
+            assert routes is None if best is None else total_length(dist, routes) == approx(best)
+
+
+def test_split_time_windows(time_window_network):
+    network = time_window_network
+    dist, demands, _ = network_arrays(network)
+    routes = from_vehicle_routes(network, solve_heuristic(network))
+    tour = [u for route in routes for u in route]
+    times = network_time_windows(network, dist)
+    parts = split_time_windows(dist.tolist(), demands, tour, 40, times)
+
+    assert [u for route in parts for u in route] == tour
+    assert all(times.feasible(route) for route in parts)
+    assert total_length(dist, parts) <= total_length(dist, routes) + 1e-6
+
+
+def test_order_crossover():
+    rng = random.Random(2)
+    a, b = list(range(1, 21)), rng.sample(range(1, 21), 20)
+
+    for _ in range(20):
+        child = order_crossover(rng, a, b)
+
+        assert sorted(child) == a
+
+
+def test_hybrid_genetic_search():
+    network = generate(40, placement="clustered", seed=4)
+    dist, _, _ = network_arrays(network)
+    states = []
+
+    vehicle_routes = hybrid_genetic_search(
+        network, population_size=10, generation_size=10, max_iterations=60, seed=1, progress=states.append
+    )
+
+    assert_feasible(network, vehicle_routes)
+
+    cost = total_length(dist, from_vehicle_routes(network, vehicle_routes))
+    heuristic_cost = total_length(dist, from_vehicle_routes(network, solve_heuristic(network)))
+
+    assert cost <= heuristic_cost + 1e-6
+    assert states[-1].incumbent == approx(cost)
+    assert all(a.incumbent > b.incumbent for a, b in zip(states, states[1:]))
+
+    html = generate_report(Solution(network, vehicle_routes, cost, "heuristic"), None)
+
+    assert "Solution has been found by heuristics." in html
+
+
+def test_hybrid_genetic_search_time_windows(time_window_network):
+    vehicle_routes = hybrid_genetic_search(
+        time_window_network, population_size=5, generation_size=5, max_iterations=20, seed=1
+    )
+
+    assert_feasible(time_window_network, vehicle_routes)
+
+
+def test_hybrid_genetic_search_excess_vehicles():
+    network = generate(3, seed=5)
+
+    for k in range(3):
+        network.add_vehicle(Vehicle(f"Spare {k}", network.vehicle_capacities.max()))
+
+    vehicle_routes = hybrid_genetic_search(network, population_size=5, generation_size=5, max_iterations=20, seed=1)
+
+    assert_feasible(network, vehicle_routes)
+    assert sum(1 for arcs in vehicle_routes.values() if arcs) <= 3
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from cvrp.importers import load_places, load_vehicles
+
+
+def test_load_places_csv(tmp_path):
+    path = tmp_path / "places.csv"
+    path.write_text(
+        "name,lat,lon,demand\n"
+        "Client A,52.1,20.5,10\n"
+        "Client B,95.0,20.5,10\n"
+        ",52.1,20.5,abc\n"
+        "Client C,-33.9,151.2,\n"
+    )
+
+    fractions = []
+    places, errors = load_places(str(path), chunk_size=2, progress=fractions.append)
+
+    assert [p.name for p in places] == ["Client A", "Client C"]
+    assert places[1].longitude == pytest.approx(151.2)
+    assert places[1].demand == 0.0
+    assert errors == ["Row 2: invalid latitude", "Row 3: missing name, invalid demand"]
+    assert fractions == [0.5, 1.0]
+
+
+def test_load_places_time_windows(tmp_path):
+    path = tmp_path / "places.csv"
+    path.write_text(
+        "name,lat,lon,demand,service_time,ready_time,due_time\n"
+        "Client A,52.1,20.5,10,15,60,120\n"
+        "Client B,52.1,20.5,10,,,\n"
+        "Client C,52.1,20.5,10,-5,120,60\n"
+    )
+
+    places, errors = load_places(str(path))
+
+    assert [(p.service_time, p.ready_time, p.due_time) for p in places] == [(15, 60, 120), (0, 0, float("inf"))]
+    assert errors == ["Row 3: invalid service time, invalid due time"]
+
+
+def test_load_places_geojson(tmp_path):
+    path = tmp_path / "places.geojson"
+    path.write_text(json.dumps({
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [20.5, 52.1]},
+             "properties": {"name": "Client A", "demand": 5}},
+            {"type": "Feature", "geometry": None, "properties": {"name": "Client B"}},
+        ]
+    }))
+
+    places, errors = load_places(str(path))
+
+    assert len(places) == 1
+    assert (places[0].latitude, places[0].longitude, places[0].demand) == (52.1, 20.5, 5.0)
+    assert errors == ["Row 2: invalid latitude, invalid longitude"]
+
+
+def test_load_places_malformed_geojson(tmp_path):
+    path = tmp_path / "places.geojson"
+    path.write_text(json.dumps({
+        "type": "FeatureCollection",
+        "features": ["Client A", {"type": "Feature", "geometry": {"coordinates": 5}}]
+    }))
+
+    with pytest.raises(ValueError):
+        load_places(str(path))
+
+
+def test_load_duplicate_names(tmp_path):
+    path = tmp_path / "places.csv"
+    path.write_text(
+        "name,lat,lon,demand\n"
+        "Client A,52.1,20.5,10\n"
+        "client-a,52.2,20.6,10\n"
+    )
+
+    with pytest.raises(ValueError, match="Row 2: duplicate name"):
+        load_places(str(path), chunk_size=1)
+
+    path.write_text("name,max_capacity\nTruck,10\n")
+
+    with pytest.raises(ValueError, match="Row 1: duplicate name"):
+        load_vehicles(str(path), existing=["truck"])
+
+
+def test_load_vehicles_csv(tmp_path):
+    path = tmp_path / "vehicles.csv"
+    path.write_text("name,capacity\nVan 1,30\nVan 2,-1\n")
+
+    vehicles, errors = load_vehicles(str(path))
+
+    assert [(v.name, v.max_capacity) for v in vehicles] == [("Van 1", 30.0)]
+    assert errors == ["Row 2: invalid capacity"]
+
+
+def test_load_stops_when_requested(tmp_path):
+    path = tmp_path / "places.csv"
+    path.write_text("name,lat,lon,demand\n" + "".join(f"C{i},1,1,1\n" for i in range(10)))
+
+    places, _ = load_places(str(path), chunk_size=3, should_stop=lambda: True)
+
+    assert places == []
+
+
+def test_unsupported_file_type(tmp_path):
+    with pytest.raises(ValueError):
+        load_places(str(tmp_path / "places.xlsx"))
+
+
+def test_add_clients_batch(network, client_place):
+    count = len(network.clients)
+
+    network.add_clients([network.clients[0], network.depot, client_place, client_place])
+
+    assert len(network.clients) == count + 1
@@ -0,0 +1,78 @@
+from cvrp.generate import generate
+from cvrp.heuristics import solve_heuristic
+from cvrp.hgs import hybrid_genetic_search
+from cvrp.journal import Checkpointer, Journal, network_fingerprint
+from cvrp.validate import validate
+
+
+def test_journal_round_trip(network, tmp_path):
+    path = str(tmp_path / "solve.journal")
+    routes = solve_heuristic(network)
+    fingerprint = network_fingerprint(network)
+
+    journal = Journal(path)
+    journal.checkpoint("a", routes, 100.0, fingerprint=fingerprint)
+    journal.checkpoint("a", routes, 90.0, 50.0)
+    journal.finish("b", "failed", message="No solution")
+
+    # Crash in the middle of writing a record
+    with open(path, "a") as file:
+        file.write('{"job": "a", "event": "optim')
+
+    journal = Journal(path)
+    a, b = journal.state("a"), journal.state("b")
+
+    assert (a.status, a.cost, a.bound, a.fingerprint, a.finished) == ("running", 90.0, 50.0, fingerprint, False)
+    assert a.routes == routes
+    assert (b.status, b.message, b.finished) == ("failed", "No solution", True)
+    assert journal.state("c") is None
+
+    journal.compact()
+
+    with open(path) as file:
+        assert len(file.readlines()) == 2
+
+    assert Journal(path).state("a").routes == routes
+
+
+def test_warm_start(network, tmp_path):
+    journal = Journal(str(tmp_path / "solve.journal"))
+    routes = solve_heuristic(network)
+    journal.checkpoint("job", routes, 1.0, fingerprint=network_fingerprint(network))
+
+    assert journal.warm_start("job", network) == routes
+
+    network.clients[0].demand += 1
+
+    assert journal.warm_start("job", network) is None
+
+
+def test_checkpointer_interval(tmp_path):
+    journal = Journal(str(tmp_path / "solve.journal"))
+    checkpoint = Checkpointer(journal, "job", interval=3600)
+
+    checkpoint({}, 3.0)
+    checkpoint({}, 2.0)
+    checkpoint({}, 1.0)
+
+    assert journal.state("job").cost == 3.0
+
+    checkpoint.flush()
+
+    assert journal.state("job").cost == 1.0
+
+
+def test_hgs_warm_start():
+    network = generate(30, seed=5)
+    checkpoints = []
+    initial = solve_heuristic(network)
+    initial_cost = validate(network, initial).total_distance
+
+    routes = hybrid_genetic_search(
+        network, population_size=5, generation_size=5, max_iterations=10, seed=1, initial=initial,
+        checkpoint=lambda *values: checkpoints.append(values)
+    )
+    cost = validate(network, routes).total_distance
+
+    assert cost <= initial_cost + 1e-6
+    assert checkpoints[-1][0] == routes
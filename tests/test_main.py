@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAUNCH = """
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+from cvrp.ui.main import launch_ui
+
+exec_ = QApplication.exec
+
+
+def exec_and_quit():
+    QTimer.singleShot(0, QApplication.quit)
+    return exec_()
+
+
+QApplication.exec = staticmethod(exec_and_quit)
+launch_ui()
+"""
+
+
+def test_launch_ui():
+    # Separate process, launch_ui owns the QApplication and exits the interpreter
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    result = subprocess.run([sys.executable, "-c", LAUNCH], cwd=ROOT, env=env, capture_output=True, text=True,
+                            timeout=120)
+
+    assert result.returncode == 0, result.stderr
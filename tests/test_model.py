@@ -9,3 +9,12 @@ def test_compose_cvrp_model(network):
     model = CVRPModel(network)
     assert isinstance(model, CVRPModel), \
         "compose_cvrp_model should return instance of CVRPModel"
+
+
+def test_compose_time_window_constraints(time_window_network):
+    del time_window_network.clients[6:]
+    model = CVRPModel(time_window_network)
+    clients, vehicles = len(model.clients), len(model.vehicles)
+
+    assert len(model.con_arrival) == (clients + 1) * clients - clients
+    assert len(model.con_shift) == clients * vehicles
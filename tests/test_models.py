@@ -0,0 +1,94 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from PyQt5.QtCore import QCoreApplication, QModelIndex, Qt
+
+from cvrp.data import Place, Vehicle
+from cvrp.ui.models import ItemRole, NetworkFilterProxyModel, PlaceTableModel, SortRole, VehicleTableModel
+
+
+@pytest.fixture(scope="module", autouse=True)
+def application():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def test_place_model_rows(network):
+    model = PlaceTableModel(network)
+
+    assert model.rowCount() == len(network.clients) + 1
+    assert model.rowCount(model.index(0, 0)) == 0
+    assert model.columnCount() == len(PlaceTableModel.columns)
+    assert model.headerData(3, Qt.Horizontal) == "Demand"
+
+    client = network.clients[0]
+    index = model.index(1, 3)
+
+    assert model.data(model.index(0, 0), ItemRole) is network.depot
+    assert model.data(model.index(1, 0)) == client.name
+    assert model.data(index) == f"{client.demand:.2f}"
+    assert model.data(index, SortRole) == client.demand
+    assert model.data(model.index(model.rowCount(), 0)) is None
+
+
+def test_item_changed_round_trip(network):
+    model = VehicleTableModel(network)
+    vehicle = network.vehicles[2]
+    changed = []
+    model.dataChanged.connect(lambda first, last: changed.append((first.row(), last.row(), last.column())))
+
+    vehicle.max_capacity = 123.456
+    model.item_changed(vehicle)
+
+    assert changed == [(2, 2, len(VehicleTableModel.columns) - 1)]
+    assert model.data(model.index(2, 1)) == "123.46"
+    assert model.data(model.index(2, 1), SortRole) == 123.456
+
+
+def test_fetch_more(network, monkeypatch):
+    monkeypatch.setattr(PlaceTableModel, "fetch_batch", 4)
+    model = PlaceTableModel(network)
+
+    assert model.rowCount() == 4
+    assert model.canFetchMore()
+
+    model.fetchMore(QModelIndex())
+    model.fetch_all()
+
+    assert model.rowCount() == len(network.clients) + 1
+    assert not model.canFetchMore()
+
+
+def test_sort_add_remove(network):
+    model = VehicleTableModel(network)
+    model.sort_items(1, Qt.DescendingOrder)
+
+    capacities = [model.data(model.index(row, 1), SortRole) for row in range(model.rowCount())]
+    assert capacities == sorted(capacities, reverse=True)
+
+    vehicle = Vehicle("Added", max_capacity=1000)
+    network.add_vehicle(vehicle)
+    model.items_added()
+
+    assert model.row_of(vehicle) == model.rowCount() - 1
+
+    removed = model.item_at(0)
+    model.remove_item(removed)
+
+    assert removed not in network.vehicles
+    assert model.rowCount() == len(network.vehicles)
+    assert {model.item_at(row) for row in range(model.rowCount())} == set(network.vehicles)
+
+    model.sort_items(-1)
+
+    assert [model.item_at(row) for row in range(model.rowCount())] == network.vehicles
+
+
+def test_filter_by_name(network):
+    network.add_client(Place("Warehouse North", 52.0, 21.0, 5))
+    proxy = NetworkFilterProxyModel(PlaceTableModel(network))
+
+    proxy.set_filter("warehouse north")
+
+    assert proxy.rowCount() == 1
+    assert proxy.data(proxy.index(0, 0)) == "Warehouse North"
@@ -0,0 +1,48 @@
+from numpy import arange
+
+from cvrp.heuristics import from_vehicle_routes, network_arrays, solve_heuristic, total_length
+from cvrp.multistart import SharedArrays, attach_arrays, multi_start, row_views
+from tests.test_heuristics import assert_feasible
+
+
+def test_shared_arrays():
+    values = arange(12, dtype=float).reshape(3, 4)
+
+    with SharedArrays(values=values) as shared:
+        arrays, blocks = attach_arrays(shared.specs)
+
+        assert (arrays["values"] == values).all()
+
+        arrays["values"][0, 0] = -1.0
+        attached, other_blocks = attach_arrays(shared.specs)
+
+        assert attached["values"][0, 0] == -1.0
+
+        del arrays, attached
+
+        for block in blocks + other_blocks:
+            block.close()
+
+
+def test_multi_start(network):
+    dist, _, _ = network_arrays(network)
+    vehicle_routes = multi_start(network, starts=2, workers=2, iterations=10, share_every=5)
+
+    assert set(vehicle_routes) == {v.slug_name for v in network.vehicles}
+    assert_feasible(network, vehicle_routes)
+
+    cost = total_length(dist, from_vehicle_routes(network, vehicle_routes))
+    heuristic_cost = total_length(dist, from_vehicle_routes(network, solve_heuristic(network)))
+
+    assert cost <= heuristic_cost + 1e-6
+
+
+def test_row_views_share_memory():
+    values = arange(6, dtype=float).reshape(2, 3)
+    rows = row_views(values)
+
+    assert rows[1][2] == 5.0 and isinstance(rows[1][2], float)
+
+    values[1, 2] = 7.0
+
+    assert rows[1][2] == 7.0
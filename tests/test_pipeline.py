@@ -0,0 +1,95 @@
+import pytest
+
+from cvrp.data import Vehicle
+from cvrp.exceptions import ExcessVehiclesException, SolveCancelledException
+from cvrp.pipeline import parse_log_line, solve_network
+from cvrp.progress import CancellationToken, SolveProgress
+from tests.test_heuristics import assert_feasible
+
+
+def test_parse_log_line():
+    glpk = "+   321: mip =   4.163858273e+03 >=   3.202401779e+03  23.1% (12; 0)"
+    cbc = "Cbc0010I After 100 nodes, 5 on tree, 1234 best solution, best possible 1000 (0.5 seconds)"
+    highs = "         0       0         0   0.00%   142.9635689     232.8318452       38.60%        0      0      3"
+    highs_start = " J       0       0         0   0.00%   -inf            232.8318452        Large        0      0"
+
+    assert parse_log_line(glpk) == (4163.858273, 3202.401779)
+    assert parse_log_line(cbc) == (1234.0, 1000.0)
+    assert parse_log_line(highs) == (232.8318452, 142.9635689)
+    assert parse_log_line(highs_start) == (232.8318452, None)
+    assert parse_log_line("Presolving model") is None
+
+
+def test_solve_progress_gap():
+    assert SolveProgress("solve", incumbent=200.0, bound=150.0).gap == pytest.approx(0.25)
+    assert SolveProgress("solve", incumbent=200.0).gap is None
+
+
+def test_cancellation_token():
+    token = CancellationToken()
+    token.raise_if_cancelled()
+    token.cancel()
+
+    assert token.cancelled
+
+    with pytest.raises(SolveCancelledException):
+        token.raise_if_cancelled()
+
+
+def test_solve_network_cancelled_returns_incumbent(network):
+    token = CancellationToken()
+    states = []
+
+    def on_progress(state):
+        states.append(state)
+
+        if state.stage == "build":
+            token.cancel()
+
+    solution = solve_network(network, progress=on_progress, token=token, poll_interval=0.05)
+
+    assert solution.status == "cancelled"
+    assert solution.result is None
+    assert solution.obj_total_cost() == pytest.approx(states[-1].incumbent)
+    assert any(state.stage == "heuristic" for state in states)
+    assert_feasible(network, solution.vehicle_routes())
+
+
+def test_solve_network_cancelled_before_solution(network):
+    token = CancellationToken()
+    token.cancel()
+
+    with pytest.raises(SolveCancelledException):
+        solve_network(network, token=token)
+
+
+def test_solve_network_excess_vehicles(network):
+    network.add_vehicles([Vehicle(f"Spare {k}", 100) for k in range(len(network.clients))])
+
+    assert network.is_solvable()
+
+    # Every vehicle of the exact model has to leave the depot, preprocessing drops the spare ones
+    with pytest.raises(ExcessVehiclesException):
+        solve_network(network, preprocess=False)
+
+
+def test_solve_network_checkpoints_and_warm_start(network):
+    token = CancellationToken()
+    checkpoints = []
+
+    def on_progress(state):
+        if state.stage == "build":
+            token.cancel()
+
+    first = solve_network(
+        network, progress=on_progress, token=token, poll_interval=0.05,
+        checkpoint=lambda *values: checkpoints.append(values)
+    )
+
+    assert checkpoints[-1][:2] == (first.routes, pytest.approx(first.cost))
+
+    token = CancellationToken()
+    second = solve_network(network, progress=on_progress, token=token, poll_interval=0.05, initial_routes=first.routes)
+
+    assert second.cost <= first.cost + 1e-6
+    assert_feasible(network, second.vehicle_routes())
@@ -0,0 +1,94 @@
+from pytest import approx
+
+from cvrp.data import Network, Place, Vehicle
+from cvrp.model import CVRPModel
+from cvrp.preprocess import fix_infeasible_arcs, infeasible_arcs, merge_colocated, reduce_network
+from cvrp.solver import solve_model
+from cvrp.validate import validate
+
+
+def _network(demands, capacities, same_place=()):
+    network = Network()
+    network.depot = Place("Depot", 52.0, 21.0)
+
+    for i, demand in enumerate(demands):
+        position = (52.1, 21.1) if i in same_place else (52.0 + 0.02 * (i % 4), 21.0 + 0.03 * (i // 4 + 1))
+        network.add_client(Place(f"Client {i}", *position, demand))
+
+    network.add_vehicles([Vehicle(f"Vehicle {k}", capacity) for k, capacity in enumerate(capacities)])
+
+    return network
+
+
+def test_merge_colocated():
+    clients = [
+        Place("A", 1.0, 1.0, 6), Place("B", 2.0, 2.0, 3), Place("C", 1.0, 1.0, 5),
+        Place("D", 1.0, 1.0, 4), Place("E", 1.0, 1.0, 1, ready_time=10),
+    ]
+
+    groups = [[c.name for c in group] for group in merge_colocated(clients, 10)]
+
+    assert groups == [["A", "D"], ["B"], ["C"], ["E"]]
+
+
+def test_reduce_network():
+    network = _network([3, 4, 2, 5, 6, 1], [10, 10, 20, 10], same_place=(1, 3, 5))
+    reduction = reduce_network(network)
+    reduced = reduction.network
+
+    assert reduction.merged_clients == 2
+    assert reduced.client_demands.sum() == network.client_demands.sum()
+    assert reduction.members == {"client-1": ["client-1", "client-3", "client-5"]}
+
+    # Packing needs 20 + 10 of capacity, the largest vehicles are kept
+    assert [v.name for v in reduced.vehicles] == ["Vehicle 0", "Vehicle 2"]
+    assert [v.name for v in reduction.dropped_vehicles] == ["Vehicle 1", "Vehicle 3"]
+    assert network.clients[0] in reduced.clients
+
+
+def test_reduce_network_keeps_packing():
+    # Merged demands 4, 4, 4 do not fit into two vehicles of 6, unmerged ones do
+    network = _network([2, 2, 4, 4], [6, 6], same_place=(0, 1))
+    reduction = reduce_network(network)
+
+    assert reduction.merged_clients == 0
+    assert not reduction.restricted
+    assert len(reduction.network.vehicles) == 2
+
+    assert reduce_network(_network([2, 2, 1, 1], [6, 6], same_place=(0, 1))).restricted
+
+
+def test_reduce_network_excess_vehicles():
+    # First-fit decreasing does not pack 4, 4, 3, 3, 3, 3 into two vehicles of 10, 4 + 3 + 3 twice does
+    network = _network([4, 4, 3, 3, 3, 3], [1, 10, 1, 10, 1, 1, 1])
+    reduction = reduce_network(network, merge=False)
+
+    assert len(reduction.network.vehicles) == len(network.clients)
+    assert [v.name for v in reduction.dropped_vehicles] == ["Vehicle 6"]
+
+
+def test_infeasible_arcs():
+    network = _network([3, 8, 9], [10, 20])
+    arcs = set(infeasible_arcs(network))
+
+    assert ("client-1", "client-2", "vehicle-0") in arcs
+    assert ("client-1", "client-2", "vehicle-1") not in arcs
+    assert ("client-0", "client-1", "vehicle-0") in arcs
+    assert ("client-0", "client-2", "vehicle-0") in arcs
+    assert ("depot", "depot", "vehicle-1") in arcs
+
+
+def test_solve_reduced_network():
+    network = _network([3, 4, 2, 5, 6, 1, 4], [10, 10, 20, 10], same_place=(1, 3))
+    reduction = reduce_network(network)
+    model = CVRPModel(reduction.network)
+
+    assert fix_infeasible_arcs(model) > 0
+
+    solve_model(model)
+    vehicle_routes = reduction.vehicle_routes(model.vehicle_routes())
+    result = validate(network, vehicle_routes)
+
+    assert result.valid, result.errors
+    assert result.total_distance == approx(model.obj_total_cost())
+    assert all(vehicle_routes[v.slug_name] == [] for v in reduction.dropped_vehicles)
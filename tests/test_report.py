@@ -0,0 +1,62 @@
+from pyhtml import table, tbody
+
+from cvrp.heuristics import solve_heuristic
+from cvrp.pipeline import Solution
+from cvrp.report import network_edge_segments, generate_network_vis, write_html, write_report, place_rows
+
+
+def test_edge_segments_all(network):
+    n = len(network.all_places)
+    segments = network_edge_segments(network, edges="all")
+
+    assert segments.shape == (n * (n - 1) // 2, 2, 2)
+
+
+def test_edge_segments_nearest(network):
+    n = len(network.all_places)
+    segments = network_edge_segments(network, edges="nearest", k_nearest=2)
+
+    assert n <= len(segments) <= 2 * n
+
+
+def test_edge_segments_none(network):
+    assert len(network_edge_segments(network, edges="none")) == 0
+
+
+def test_generate_network_vis(network):
+    image = generate_network_vis(network, {})
+
+    assert image.startswith(b"\x89PNG")
+
+
+def test_write_html_streams_rows(network, tmp_path):
+    path = tmp_path / "places.html"
+
+    write_html(str(path), table(tbody(place_rows)), network=network)
+
+    content = path.read_text(encoding="utf-8")
+
+    for place in network.all_places:
+        assert place.name in content
+
+
+def test_write_report_cancelled_solution(network, tmp_path):
+    solution = Solution(network, solve_heuristic(network), 123.0, "cancelled")
+
+    main, *pages = write_report(solution, None, str(tmp_path / "report.html"))
+    content = open(main, encoding="utf-8").read()
+
+    assert "cancelled" in content
+    assert "123.00 km" in content
+    assert any(page.endswith("-map.png") for page in pages)
+
+
+def test_write_report_lower_bound(network, tmp_path):
+    solution = Solution(network, solve_heuristic(network), 125.0, "heuristic", bound=100.0)
+
+    main, *_ = write_report(solution, None, str(tmp_path / "report.html"))
+    content = open(main, encoding="utf-8").read()
+
+    assert "100.00 km" in content
+    assert "20.00%" in content
+    assert "heuristics" in content
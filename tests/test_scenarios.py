@@ -0,0 +1,88 @@
+import pytest
+from pytest import approx
+
+from cvrp.generate import generate
+from cvrp.heuristics import solve_heuristic
+from cvrp.scenarios import (
+    Scenario, clone_network, extra_vehicle_scenario, scaled_demand_scenario, solve_scenarios
+)
+from cvrp.validate import validate
+
+
+def test_clone_network(time_window_network):
+    network = time_window_network
+    clone = clone_network(network)
+    clone.clients[0].demand += 5
+    clone.vehicles[0].max_capacity += 5
+
+    assert clone.clients[0].demand == network.clients[0].demand + 5
+    assert clone.vehicles[0].max_capacity == network.vehicles[0].max_capacity + 5
+    assert [c.due_time for c in clone.clients] == [c.due_time for c in network.clients]
+    assert clone.has_time_constraints
+
+
+def test_solve_scenarios():
+    network = generate(40, seed=6)
+    moved = clone_network(network)
+    moved.clients[0].latitude += 0.1
+
+    scenarios = [
+        Scenario("Base", clone_network(network)),
+        extra_vehicle_scenario(network),
+        scaled_demand_scenario(network, network.clients[3], 2.0),
+        Scenario("Moved client", moved),
+        scaled_demand_scenario(network, network.clients[0], 1000.0),
+    ]
+    finished = []
+
+    solve_scenarios(network, scenarios, workers=2, progress=finished.append)
+
+    assert sorted(s.name for s in finished) == sorted(s.name for s in scenarios)
+    assert len(scenarios[1].network.vehicles) == len(network.vehicles) + 1
+    assert scenarios[2].network.clients[3].demand == 2 * network.clients[3].demand
+    assert scenarios[0].cost == approx(validate(network, solve_heuristic(network)).total_distance)
+
+    for scenario in scenarios[:4]:
+        result = validate(scenario.network, scenario.routes)
+
+        assert result.valid, result.errors
+        assert result.total_distance == approx(scenario.cost)
+        assert scenario.routes_used == sum(1 for route in scenario.routes.values() if route)
+        assert scenario.solve_time > 0
+
+    assert not scenarios[4].solved and scenarios[4].error
+
+
+def test_solve_scenarios_keeps_going_after_errors():
+    network = generate(20, seed=6)
+    broken = Scenario("Not picklable", clone_network(network))
+    broken.network.on_change = lambda: None
+    scenarios = [broken, Scenario("Base", clone_network(network))]
+
+    solve_scenarios(network, scenarios, workers=1)
+
+    assert not broken.solved and "pickle" in broken.error
+    assert scenarios[1].solved
+
+
+def test_scenario_runnable_reports_pool_errors(monkeypatch):
+    pytest.importorskip("PyQt5")
+
+    import cvrp.ui.scenarios
+
+    def failing_pool(*args, **kwargs):
+        raise OSError("No shared memory")
+
+    monkeypatch.setattr(cvrp.ui.scenarios, "solve_scenarios", failing_pool)
+
+    network = generate(5, seed=6)
+    scenario = Scenario("Base", clone_network(network))
+    runnable = cvrp.ui.scenarios.ScenarioSolveRunnable(network, [scenario])
+    solved, finished = [], []
+    runnable.signals.solved.connect(lambda original, copy: solved.append((original, copy)))
+    runnable.signals.finished.connect(lambda: finished.append(True))
+
+    runnable.run()
+
+    assert [(original, copy.error) for original, copy in solved] == [(scenario, "OSError: No shared memory")]
+    assert finished and scenario.error is None
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import urllib.error
+import urllib.request
+
+import cvrp.service
+from cvrp.generate import generate
+from cvrp.service import SolveService
+from cvrp.storage import network_json
+from cvrp.validate import validate
+
+
+def _request(address, method: str, path: str, data: dict = None) -> (int, object):
+    body = json.dumps(data).encode("utf-8") if data is not None else None
+    request = urllib.request.Request(f"http://{address[0]}:{address[1]}{path}", body, method=method)
+
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            text = response.read().decode("utf-8")
+            status = response.status
+    except urllib.error.HTTPError as exc:
+        text, status = exc.read().decode("utf-8"), exc.code
+
+    if path.endswith("/events"):
+        return status, [json.loads(line) for line in text.splitlines()]
+
+    return status, json.loads(text)
+
+
+def _run(test, **options):
+    async def main():
+        service = SolveService(**options)
+        address = await service.start()
+        loop = asyncio.get_event_loop()
+
+        def request(*args):
+            return loop.run_in_executor(None, _request, address, *args)
+
+        try:
+            await test(service, request)
+        finally:
+            await service.close()
+
+    asyncio.run(main())
+
+
+def test_solve_and_stream():
+    network = generate(30, seed=3)
+    data = {"network": network_json(network), "method": "hgs", "time_limit": 1, "seed": 1}
+
+    async def test(service, request):
+        status, job = await request("POST", "/jobs", data)
+
+        assert status == 202 and job["status"] in ("queued", "running")
+
+        # Identical requests share the job
+        status, same = await request("POST", "/jobs", data)
+
+        assert status == 200 and same["id"] == job["id"]
+
+        status, events = await request("GET", f"/jobs/{job['id']}/events")
+
+        assert status == 200
+        assert events[-1]["status"] == "done"
+        assert any(event["event"] == "progress" for event in events)
+
+        status, job = await request("GET", f"/jobs/{job['id']}")
+        result = job["result"]
+        routes = {
+            vehicle: list(zip(["central-depot"] + stops, stops + ["central-depot"])) if stops else []
+            for vehicle, stops in result["routes"].items()
+        }
+
+        assert status == 200 and result["status"] == "heuristic"
+        assert validate(network, routes).total_distance == result["cost"]
+        assert job["progress"]["incumbent"] == result["cost"]
+
+    _run(test)
+
+
+def test_queue_and_errors():
+    data = {"network": network_json(generate(100, seed=4)), "method": "hgs", "time_limit": 30}
+
+    async def test(service, request):
+        status, running = await request("POST", "/jobs", data)
+        status, queued = await request("POST", "/jobs", dict(data, seed=2))
+
+        assert (await request("POST", "/jobs", dict(data, seed=3)))[0] == 503
+
+        status, job = await request("DELETE", f"/jobs/{queued['id']}")
+
+        assert job["status"] == "cancelled"
+
+        status, job = await request("DELETE", f"/jobs/{running['id']}")
+        _, events = await request("GET", f"/jobs/{running['id']}/events")
+
+        assert events[-1]["status"] in ("done", "cancelled")
+
+        assert (await request("GET", "/jobs/unknown"))[0] == 404
+        assert (await request("POST", "/jobs", {"network": {"clients": []}}))[0] == 400
+        assert (await request("POST", "/jobs", dict(data, method="simplex")))[0] == 400
+
+        status, health = await request("GET", "/health")
+
+        assert status == 200 and health["workers"] == 1 and health["queued"] == 0
+
+    _run(test, workers=1, max_queue=1)
+
+
+def test_unexpected_error_keeps_worker(monkeypatch):
+    solve = cvrp.service.solve
+    calls = []
+
+    def failing_once(*args, **kwargs):
+        calls.append(args)
+
+        if len(calls) == 1:
+            raise RuntimeError("solver crashed")
+
+        return solve(*args, **kwargs)
+
+    monkeypatch.setattr(cvrp.service, "solve", failing_once)
+    data = {"network": network_json(generate(10, seed=5)), "method": "hgs", "time_limit": 0.5}
+
+    async def test(service, request):
+        _, failed = await request("POST", "/jobs", data)
+        _, events = await request("GET", f"/jobs/{failed['id']}/events")
+
+        assert events[-1]["status"] == "failed" and "solver crashed" in events[-1]["error"]
+
+        # The only worker takes the next job
+        _, job = await request("POST", "/jobs", dict(data, seed=1))
+        _, events = await request("GET", f"/jobs/{job['id']}/events")
+
+        assert events[-1]["status"] == "done"
+
+    _run(test, workers=1)
@@ -1,7 +1,16 @@
+import os
+import tempfile
+
 from pyomo.opt import check_optimal_termination
+from pytest import approx, importorskip, raises
 
+from cvrp.bound import lower_bound
+from cvrp.data import Network, Place, Vehicle
+from cvrp.exceptions import CVRPException
+from cvrp.heuristics import solve_heuristic
 from cvrp.model import CVRPModel
-from cvrp.solver import solve_model
+from cvrp.solver import get_solvers, solve_model
+from cvrp.validate import validate
 
 
 def test_solve_cvrp_optimal(network):
@@ -24,21 +33,12 @@ def test_solve_cvrp_sanity(network):
     model = CVRPModel(network)
     solve_model(model)
 
-    _depot = network.depot.slug_name
-
-    # Is every place visited?
-    all_places = [c.slug_name for c in network.all_places]
-    visited_places = [v[1] for v in model.x]
-
-    assert set(visited_places) == set(all_places), \
-        "Every place should be visited"
-
-    # Is vehicle capacity limit satisfied?
-    for vehicle in network.vehicles:
-        load = sum(p.demand for p in network.clients if p.slug_name in network.clients)
+    result = validate(network, model.vehicle_routes())
 
-        assert load <= vehicle.max_capacity, \
-            "Every vehicle should have load less or equal its max capacity"
+    assert result.valid, \
+        f"Solution should visit every place once and satisfy capacities: {result.errors}"
+    assert result.total_distance == approx(model.obj_total_cost()), \
+        "Total cost should equal length of routes"
 
 
 def test_cvrp_results(network):
@@ -55,3 +55,83 @@ def test_cvrp_results(network):
     for vehicle in network.vehicles:
         assert vehicle.slug_name in vehicle_vars, \
             f"Vehicle {vehicle} should be in vehicle_vars"
+
+
+def _small_network(network, clients=5, vehicles=2):
+    small = Network()
+    small.depot = network.depot
+    small.add_clients(network.clients[:clients])
+    small.add_vehicles(network.vehicles[:vehicles])
+
+    return small
+
+
+def test_lower_bound(network):
+    """
+    Checks if LP bound is not above costs of exact and heuristic solutions.
+    """
+
+    network = _small_network(network)
+    model = CVRPModel(network)
+    solve_model(model)
+
+    bound, _ = lower_bound(network)
+
+    assert 0 < bound <= model.obj_total_cost() + 1e-6
+    assert bound <= validate(network, solve_heuristic(network)).total_distance + 1e-6
+
+
+def test_in_process_solver_writes_no_files(network, tmp_path, monkeypatch):
+    """
+    Checks if in-process solver gets the model without temporary files.
+    """
+
+    importorskip("highspy")
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    model = CVRPModel(_small_network(network))
+    result = solve_model(model, ["appsi_highs"])
+
+    assert get_solvers(["appsi_highs"]) == ["appsi_highs"]
+    assert result.solver.name == "appsi_highs"
+    assert os.listdir(tmp_path) == []
+
+
+def test_infeasible_model_raises(network):
+    """
+    Checks if infeasible model raises CVRPException instead of solver errors.
+    """
+
+    small = Network()
+    small.depot = network.depot
+    small.add_clients([Place(f"Client {i}", network.depot.latitude + 0.01 * (i + 1), network.depot.longitude, 5)
+                       for i in range(2)])
+    small.add_vehicle(Vehicle("Vehicle", 6))
+
+    with raises(CVRPException):
+        solve_model(CVRPModel(small))
+
+
+def test_solve_time_windows():
+    """
+    Checks if solved model follows the order required by time windows.
+    """
+
+    network = Network()
+    network.depot = Place("Depot", 52.0, 21.0)
+    network.add_clients([
+        Place("Near", 52.0, 21.1, 1.0, service_time=5.0, ready_time=60.0, due_time=120.0),
+        Place("Middle", 52.0, 21.2, 1.0, service_time=5.0, ready_time=60.0, due_time=120.0),
+        Place("Far", 52.0, 21.3, 1.0, service_time=5.0, due_time=30.0),
+    ])
+    network.add_vehicle(Vehicle("Truck", 10.0, shift_length=240.0))
+
+    model = CVRPModel(network)
+    solve_model(model)
+
+    route = model.vehicle_routes()["truck"]
+    result = validate(network, model.vehicle_routes())
+
+    assert result.valid, result.errors
+    assert route[0] == ("depot", "far")
+    assert result.total_distance == approx(model.obj_total_cost())
@@ -0,0 +1,102 @@
+import numpy
+import pytest
+
+from cvrp.data import Place
+from cvrp.geo import geo_dist_matrix
+from cvrp.spatial import SpatialIndex
+
+
+def _brute_force(lat, lon, query_lat, query_lon, k):
+    dist = geo_dist_matrix(query_lat, query_lon, lat, lon)
+
+    return numpy.sort(dist, axis=1)[:, :k]
+
+
+@pytest.fixture
+def points():
+    rng = numpy.random.default_rng(7)
+
+    return rng.uniform(-60.0, 60.0, 2000), rng.uniform(-180.0, 180.0, 2000)
+
+
+def test_query_matches_brute_force(points):
+    lat, lon = points
+    index = SpatialIndex(lat, lon)
+    query_lat, query_lon = lat[:50] + 0.5, lon[:50] - 0.5
+
+    distances, positions = index.query(query_lat, query_lon, k=5)
+
+    assert distances == pytest.approx(_brute_force(lat, lon, query_lat, query_lon, 5), abs=1e-6)
+    assert distances == pytest.approx(
+        numpy.take_along_axis(geo_dist_matrix(query_lat, query_lon, lat, lon), positions, axis=1), abs=1e-6
+    )
+
+
+def test_query_radius(points):
+    lat, lon = points
+    index = SpatialIndex(lat, lon)
+
+    found, distances = index.query_radius(lat[:20], lon[:20], 800.0, return_distance=True)
+    dist = geo_dist_matrix(lat[:20], lon[:20], lat, lon)
+
+    for row, positions, row_distances in zip(dist, found, distances):
+        assert sorted(positions.tolist()) == numpy.flatnonzero(row <= 800.0).tolist()
+        assert list(row_distances) == sorted(row_distances)
+
+
+def test_incremental_updates(points):
+    lat, lon = list(points[0][:300]), list(points[1][:300])
+    index = SpatialIndex(lat, lon)
+    rng = numpy.random.default_rng(3)
+
+    for _ in range(100):
+        new_lat, new_lon = rng.uniform(-60.0, 60.0, 2), rng.uniform(-180.0, 180.0, 2)
+        index.append(new_lat, new_lon)
+        lat.extend(new_lat)
+        lon.extend(new_lon)
+
+        removed = int(rng.integers(len(lat)))
+        index.delete(removed)
+        del lat[removed], lon[removed]
+
+        moved = int(rng.integers(len(lat)))
+        lat[moved], lon[moved] = 10.0, 20.0
+        index.move(moved, 10.0, 20.0)
+
+    assert len(index) == len(lat)
+
+    distances, positions = index.query([10.0, -30.0], [20.0, 100.0], k=4)
+
+    assert distances == pytest.approx(_brute_force(lat, lon, [10.0, -30.0], [20.0, 100.0], 4), abs=1e-6)
+    assert positions[0][0] in [i for i, (a, b) in enumerate(zip(lat, lon)) if (a, b) == (10.0, 20.0)]
+
+
+def test_small_index():
+    index = SpatialIndex()
+
+    assert index.query(0.0, 0.0, k=3)[1].shape == (1, 0)
+
+    index.append([1.0], [2.0])
+    distances, positions = index.query([1.0, 5.0], [2.0, 5.0], k=3)
+
+    assert positions.tolist() == [[0], [0]]
+    assert distances[0, 0] == pytest.approx(0.0)
+
+
+def test_network_spatial_index(network):
+    depot = network.depot
+    assert network.nearest_places(depot.latitude, depot.longitude)[0] is depot
+
+    client = Place("Next to depot", depot.latitude + 0.001, depot.longitude)
+    network.add_client(client)
+    assert network.nearest_places(depot.latitude, depot.longitude, k=2)[1] is client
+
+    client.latitude = -depot.latitude
+    network.update_place(client)
+    assert client not in network.places_within(depot.latitude, depot.longitude, 1.0)
+
+    network.remove_client(client)
+    assert len(network.spatial_index) == len(network.all_places)
+    assert network.nearest_places(client.latitude, client.longitude, k=len(network.all_places)) == sorted(
+        network.all_places, key=lambda p: Place.distance(p, client)
+    )
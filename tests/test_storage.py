@@ -0,0 +1,114 @@
+import json
+
+import pytest
+from numpy import memmap
+
+from cvrp.heuristics import solve_heuristic
+from cvrp.journal import network_fingerprint
+from cvrp.pipeline import Solution
+from cvrp.storage import (
+    FORMAT_VERSION, MAGIC, export_json, load, load_network, network_from_json, network_json, save
+)
+
+
+def test_save_load_network(network, tmp_path):
+    path = str(tmp_path / "network.cvrp")
+    save(path, network)
+
+    loaded = load_network(path)
+
+    assert loaded.depot.name == network.depot.name
+    assert [c.name for c in loaded.clients] == [c.name for c in network.clients]
+    assert [c.demand for c in loaded.clients] == [c.demand for c in network.clients]
+    assert [v.max_capacity for v in loaded.vehicles] == [v.max_capacity for v in network.vehicles]
+    assert (loaded.latitudes == network.latitudes).all()
+    assert (loaded.longitudes == network.longitudes).all()
+
+
+def test_load_is_memory_mapped(network, tmp_path):
+    path = str(tmp_path / "network.cvrp")
+    save(path, network)
+
+    file = load(path)
+
+    assert file.version == FORMAT_VERSION
+    assert isinstance(file.latitudes.base, memmap)
+    assert file.latitudes.ctypes.data % 8 == 0
+    assert file.routes() is None
+
+
+def test_save_load_solution(network, tmp_path):
+    path = str(tmp_path / "solved.cvrp")
+    routes = solve_heuristic(network)
+    save(path, network, Solution(network, routes, 42.0, "cancelled"), metadata={"note": "test"})
+
+    file = load(path, mmap=False)
+    loaded = file.network()
+
+    assert file.vehicle_routes(loaded) == routes
+    assert file.metadata["cost"] == 42.0
+    assert file.metadata["status"] == "cancelled"
+    assert file.metadata["note"] == "test"
+
+
+def test_load_invalid_file(tmp_path):
+    path = tmp_path / "invalid.cvrp"
+    path.write_bytes(b"not a network")
+
+    with pytest.raises(ValueError):
+        load(str(path))
+
+    path.write_bytes(MAGIC + (FORMAT_VERSION + 1).to_bytes(4, "little") + bytes(4))
+
+    with pytest.raises(ValueError):
+        load(str(path))
+
+
+def test_export_json(network, tmp_path):
+    path = tmp_path / "network.json"
+    routes = solve_heuristic(network)
+    export_json(str(path), network, Solution(network, routes, 42.0, "optimal"))
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+
+    assert data["depot"]["name"] == network.depot.name
+    assert len(data["clients"]) == len(network.clients)
+    assert sorted(s for stops in data["routes"].values() for s in stops) == \
+        sorted(c.slug_name for c in network.clients)
+
+
+def test_save_load_time_windows(time_window_network, tmp_path):
+    network = time_window_network
+    network.speed = 40.0
+    network.clients[0].due_time = float("inf")
+    path = str(tmp_path / "network.cvrp")
+    save(path, network)
+
+    file = load(path)
+    loaded = file.network()
+
+    assert file.has_time_constraints
+    assert loaded.speed == 40.0
+    assert [(c.service_time, c.ready_time, c.due_time) for c in loaded.clients] == \
+        [(c.service_time, c.ready_time, c.due_time) for c in network.clients]
+    assert [v.shift_length for v in loaded.vehicles] == [v.shift_length for v in network.vehicles]
+
+    json_path = tmp_path / "network.json"
+    export_json(str(json_path), network)
+    data = json.loads(json_path.read_text(encoding="utf-8"))
+
+    assert data["speed"] == 40.0
+    assert data["clients"][0]["due_time"] is None
+    assert data["clients"][1]["due_time"] == network.clients[1].due_time
+    assert data["vehicles"][0]["shift_length"] == 540
+
+
+def test_network_json_round_trip(time_window_network):
+    network = time_window_network
+    network.speed = 40.0
+    loaded = network_from_json(json.loads(json.dumps(network_json(network))))
+
+    assert network_fingerprint(loaded) == network_fingerprint(network)
+
+    with pytest.raises(ValueError):
+        network_from_json({"depot": {"name": "Depot"}, "clients": [], "vehicles": []})
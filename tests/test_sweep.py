@@ -0,0 +1,42 @@
+from pytest import approx
+
+from cvrp.generate import generate
+from cvrp.sweep import SweepPoint, fleet_network, fleet_sweep, pareto_front
+from cvrp.validate import validate
+
+
+def test_pareto_front():
+    points = [
+        SweepPoint(2, 100, 500.0), SweepPoint(3, 100, 450.0), SweepPoint(4, 100, 450.0),
+        SweepPoint(2, 150, 520.0), SweepPoint(1, 100),
+    ]
+
+    assert [(p.vehicles, p.capacity) for p in pareto_front(points)] == [(2, 100), (3, 100)]
+
+
+def test_fleet_sweep():
+    network = generate(40, demand="small", seed=8)
+    total = network.client_demands.sum()
+    capacity = float(network.vehicle_capacities.max())
+    counts = list(range(1, 9))
+
+    points = fleet_sweep(network, counts, [capacity, capacity * 1.5], iterations=20, workers=3)
+
+    assert [(p.capacity, p.vehicles) for p in points] == [(c, k) for c in (capacity, capacity * 1.5) for k in counts]
+
+    for point in points:
+        assert point.total_capacity >= total or not point.feasible
+
+        if point.feasible:
+            result = validate(fleet_network(network, point.vehicles, point.capacity), point.routes)
+
+            assert result.valid, result.errors
+            assert result.total_distance == approx(point.cost)
+
+    # Warm-started chains never get worse with more vehicles
+    for a, b in zip(points, points[1:]):
+        if a.capacity == b.capacity and a.feasible and b.warm_started:
+            assert b.cost <= a.cost + 1e-6
+
+    assert points[-1].feasible and any(p.warm_started for p in points)
+    assert pareto_front(points)
@@ -0,0 +1,93 @@
+from pytest import approx
+
+from cvrp.heuristics import from_vehicle_routes, network_arrays, solve_heuristic, total_length
+from cvrp.validate import validate, validate_routes
+
+
+def test_validate_heuristic_solution(network):
+    vehicle_routes = solve_heuristic(network)
+    dist, demands, _ = network_arrays(network)
+    routes = from_vehicle_routes(network, vehicle_routes)
+
+    result = validate(network, vehicle_routes)
+
+    assert result.valid, result.errors
+    assert result.total_distance == approx(total_length(dist, routes))
+    assert result.total_load == approx(sum(demands))
+    assert list(result.route_loads) == approx([sum(demands[i] for i in route) for route in routes])
+
+
+def test_validate_routes_matches_validate(network):
+    vehicle_routes = solve_heuristic(network)
+    by_index = validate_routes(network, from_vehicle_routes(network, vehicle_routes))
+    by_slug = validate(network, vehicle_routes)
+
+    assert by_index.valid
+    assert list(by_index.route_distances) == approx(list(by_slug.route_distances))
+
+
+def test_validate_duplicate_and_missing_clients(network):
+    routes = from_vehicle_routes(network, solve_heuristic(network))
+    used = [route for route in routes if route]
+    duplicated, dropped = used[0][0], used[-1][-1]
+    used[-1].append(duplicated)
+    used[-1].remove(dropped)
+
+    errors = validate_routes(network, routes).errors
+
+    assert any(e.startswith("Clients visited more than once") for e in errors)
+    assert any(e.startswith("Clients not visited") and network.all_places[dropped].name in e for e in errors)
+
+
+def test_validate_broken_routes(network):
+    vehicle_routes = solve_heuristic(network)
+    slug = next(slug for slug, route in vehicle_routes.items() if route)
+    depot = network.depot.slug_name
+
+    unfinished = dict(vehicle_routes)
+    unfinished[slug] = vehicle_routes[slug][:-1]
+    assert any("do not end at the depot" in e for e in validate(network, unfinished).errors)
+
+    # Route returning to the depot in the middle
+    route = vehicle_routes[slug]
+    subtour = dict(vehicle_routes)
+    subtour[slug] = route[:1] + [(route[0][1], depot), (depot, route[1][0])] + route[1:]
+    result = validate(network, subtour)
+    assert any("subtours" in e for e in result.errors)
+    assert not any("not continuous" in e for e in result.errors)
+
+
+def test_validate_capacity(network):
+    routes = from_vehicle_routes(network, solve_heuristic(network))
+    merged = [[i for route in routes for i in route]] + [[] for _ in routes[1:]]
+
+    errors = validate_routes(network, merged).errors
+
+    assert errors == [f"Vehicles over capacity: {network.vehicles[0].name}"]
+
+
+def test_validate_unknown_names(network):
+    vehicle_routes = dict(solve_heuristic(network))
+    vehicle_routes["no-such-vehicle"] = []
+
+    assert validate(network, vehicle_routes).errors == ["Unknown vehicles: no-such-vehicle"]
+
+
+def test_validate_time_windows(time_window_network):
+    network = time_window_network
+    vehicle_routes = solve_heuristic(network)
+
+    assert validate(network, vehicle_routes).valid
+
+    vehicle, route = next((vehicle, route) for vehicle, route in vehicle_routes.items() if route)
+    late = network.get_place(route[0][1])
+    late.due_time = 0.0
+    network.get_vehicle(vehicle).shift_length = 1.0
+
+    result = validate(network, vehicle_routes)
+
+    assert result.errors == [
+        f"Clients served after their time windows: {late.name}",
+        f"Vehicles returning after their shifts: {network.get_vehicle(vehicle).name}",
+    ]
+    assert validate_routes(network, from_vehicle_routes(network, vehicle_routes)).errors == result.errors